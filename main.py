@@ -92,12 +92,15 @@ if _cli_db_pass:
 
 from source_code.crud.auth_api_routes import router as auth_router
 from source_code.crud.holding_api_routes import router as holding_router
+from source_code.crud.job_api_routes import router as job_router
 from source_code.crud.portfolio_api_routes import router as portfolio_router
 from source_code.crud.security_api_routes import router as security_router
 from source_code.crud.security_price_api_routes import router as security_price_router
 from source_code.crud.external_platform_api_routes import router as platform_router
 from source_code.crud.transaction_api_routes import router as transaction_router
 from source_code.crud.user_api_routes import router as user_router, router_api as user_api_router
+from source_code.crud.job_crud_operations import job_crud
+from source_code.utils import job_runner
 
 from contextlib import asynccontextmanager
 
@@ -106,11 +109,16 @@ async def _lifespan(app: FastAPI):
     # Startup
     resolved = str(_env_path) if '_env_path' in globals() and _env_path else 'none'
     print(f"[startup] RUNNING_ENV={os.getenv('RUNNING_ENV', '')} (selected env: {_SELECTED_ENV}, file: {resolved})")
+    try:
+        # Jobs still queued/running belonged to a previous process and will never finish
+        job_crud.fail_unfinished()
+    except Exception as e:
+        print(f"[startup] Could not reset unfinished jobs: {e}")
     try:
         yield
     finally:
-        # Shutdown (place for cleanup if needed in future)
-        pass
+        # Shutdown: stop accepting background work; queued jobs are dropped
+        job_runner.shutdown(wait=False)
 
 app = FastAPI(title="Portfolio Manager", lifespan=_lifespan)
 
@@ -148,6 +156,7 @@ app.include_router(platform_router)
 app.include_router(transaction_router)
 app.include_router(holding_router)
 app.include_router(security_price_router)
+app.include_router(job_router)
 
 # Mount static files for React frontend
 if os.path.exists("dist"):
@@ -1,6 +1,8 @@
 import os
+import queue
+import threading
 from contextlib import contextmanager
-from typing import List, Dict, Any, Union
+from typing import IO, Iterator, List, Dict, Any, Union
 import atexit
 
 import psycopg2
@@ -126,6 +128,189 @@ def execute_query(query: str, params: tuple = None) -> int:
         return 0
 
 
+def execute_returning(query: str, params: Union[tuple, dict] = None) -> List[Dict[str, Any]]:
+    """
+    Executes a DML statement with a RETURNING clause (e.g. ``INSERT ... SELECT ... RETURNING *``),
+    commits, and returns the returned rows as dictionaries.
+    Unlike execute_query, errors are raised so callers can surface them.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = dict_fetch_all(cur) if cur.description else []
+        conn.commit()
+    return rows
+
+
+def execute_values(query: str, values: List[tuple], template: str = None, fetch: bool = False) -> Union[int, List[Dict[str, Any]]]:
+    """
+    Executes a multi-row statement (e.g. ``INSERT ... VALUES %s``) for all `values`
+    in one round trip and commits once.
+    Returns the number of rows affected, or the RETURNING rows as dictionaries when fetch=True.
+    Unlike execute_query, errors are raised so callers can report the failed batch.
+    """
+    if not values:
+        return [] if fetch else 0
+    from psycopg2.extras import execute_values as _execute_values
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            # Single page so rowcount covers the whole batch; callers bound the batch size
+            rows = _execute_values(cur, query, values, template=template, page_size=len(values), fetch=fetch)
+            affected = cur.rowcount
+            columns = [col[0] for col in cur.description] if fetch and cur.description else []
+        conn.commit()
+    if fetch:
+        return [dict(zip(columns, row)) for row in rows]
+    return affected
+
+
+def copy_and_merge(staging_ddl: str, copy_sql: str, data: IO, merge_sql: str) -> int:
+    """
+    Bulk-loads `data` (a file-like object) into a staging table with COPY and merges it
+    into the target with `merge_sql`, all in one transaction.
+    `staging_ddl` creates the staging table (typically ``CREATE TEMP TABLE ... ON COMMIT DROP``)
+    and `copy_sql` is a ``COPY ... FROM STDIN`` statement for it.
+    Returns the number of rows affected by the merge; errors are raised.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(staging_ddl)
+            cur.copy_expert(copy_sql, data)
+            cur.execute(merge_sql)
+            affected = cur.rowcount
+        conn.commit()
+    return affected
+
+
+def execute_statements(statements: List[Union[str, tuple]], autocommit: bool = False) -> int:
+    """
+    Runs statements (SQL strings or (sql, params) tuples) in order in one transaction, so
+    schema changes such as partition moves apply all-or-nothing. With autocommit each statement
+    commits on its own, which ``... CONCURRENTLY`` statements require.
+    Returns the rowcount of the last statement; errors are raised.
+    """
+    with get_db_connection() as conn:
+        conn.autocommit = autocommit
+        try:
+            affected = 0
+            with conn.cursor() as cur:
+                for statement in statements:
+                    sql, params = statement if isinstance(statement, tuple) else (statement, None)
+                    cur.execute(sql, params)
+                    affected = cur.rowcount
+            if not autocommit:
+                conn.commit()
+            return affected
+        except Exception:
+            if not autocommit:
+                conn.rollback()
+            raise
+        finally:
+            conn.autocommit = False
+
+
+def fetch_batches(query: str, params: tuple = None, batch_size: int = 50_000) -> Iterator[List[tuple]]:
+    """
+    Yields the rows of `query` as lists of tuples of at most `batch_size` rows, read through a
+    server-side (named) cursor so only one batch is held in memory. The connection is held
+    until the generator is exhausted or closed; errors are raised.
+    """
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor(name="fetch_batches") as cur:
+                cur.itersize = batch_size
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+        finally:
+            conn.rollback()
+
+
+class _ChunkWriter:
+    """File-like target for COPY TO: batches rows into chunks and hands them to a bounded queue."""
+
+    def __init__(self, chunks: "queue.Queue", cancelled: threading.Event, chunk_size: int):
+        self._chunks = chunks
+        self._cancelled = cancelled
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def _put(self, item) -> None:
+        # Block while the consumer is behind; give up once it went away
+        while not self._cancelled.is_set():
+            try:
+                self._chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+        raise RuntimeError("CSV stream cancelled by the consumer")
+
+    def write(self, data) -> int:
+        self._buffer += data.encode("utf-8") if isinstance(data, str) else data
+        if len(self._buffer) >= self._chunk_size:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer = bytearray()
+
+
+_STREAM_END = object()
+
+
+def copy_to_stream(query: str, params: tuple = None, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Streams the result of `query` as CSV (with a header row) using
+    ``COPY (query) TO STDOUT WITH (FORMAT csv, HEADER)``.
+    COPY runs on a worker thread holding one pooled connection and passes chunks of about
+    `chunk_size` bytes through a small bounded queue, so memory stays constant however many
+    rows are exported. Closing the generator early cancels the COPY; errors are raised.
+    """
+    chunks: "queue.Queue" = queue.Queue(maxsize=8)
+    cancelled = threading.Event()
+
+    def run() -> None:
+        writer = _ChunkWriter(chunks, cancelled, chunk_size)
+        try:
+            with get_db_connection() as conn:
+                try:
+                    with conn.cursor() as cur:
+                        sql = cur.mogrify(query, params).decode("utf-8") if params else query
+                        cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", writer)
+                    conn.rollback()
+                except Exception:
+                    # An aborted COPY leaves the session mid-protocol; the pool discards closed connections
+                    conn.close()
+                    raise
+            writer.flush()
+            writer._put(_STREAM_END)
+        except Exception as e:
+            if not cancelled.is_set():
+                print(f"Error streaming COPY: {e}")
+                try:
+                    writer._put(e)
+                except RuntimeError:
+                    pass
+
+    worker = threading.Thread(target=run, name="copy-to-stream", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+
+
 # Example Usage
 if __name__ == "__main__":
     # Example 1: Fetching data as a list of dictionaries (default behavior)
@@ -0,0 +1,24 @@
+-- DDL for background jobs (long-running imports, downloads and recalculations)
+-- Rows are written by source_code/utils/job_runner.py; clients poll GET /api/jobs/{job_id}.
+
+CREATE TABLE IF NOT EXISTS job_dtl (
+    job_id BIGINT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    -- queued | running | succeeded | failed
+    status TEXT NOT NULL DEFAULT 'queued',
+    params JSONB,
+    progress JSONB,
+    result JSONB,
+    error TEXT,
+    created_ts TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    started_ts TIMESTAMP WITHOUT TIME ZONE,
+    finished_ts TIMESTAMP WITHOUT TIME ZONE,
+    last_updated_ts TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_dtl_status ON job_dtl (status);
+CREATE INDEX IF NOT EXISTS idx_job_dtl_created_ts ON job_dtl (created_ts DESC);
+
+COMMENT ON TABLE job_dtl IS 'Background jobs submitted through the API and executed by the in-process worker pool';
+COMMENT ON COLUMN job_dtl.progress IS 'Latest progress snapshot reported by the running job';
+COMMENT ON COLUMN job_dtl.result IS 'Summary returned by the job when it succeeded';
@@ -0,0 +1,26 @@
+-- DDL for checkpointed historical price backfills
+-- A backfill run is split into (ticker chunk, date window) units; each unit row records
+-- whether it finished so an interrupted run can be resumed with the same run_id.
+-- Rows are written by source_code/utils/price_backfill.py.
+
+CREATE TABLE IF NOT EXISTS price_backfill_unit_dtl (
+    run_id BIGINT NOT NULL,
+    unit_no INTEGER NOT NULL,
+    tickers TEXT[] NOT NULL,
+    from_date DATE NOT NULL,
+    to_date DATE NOT NULL,
+    -- pending | running | done | failed
+    status TEXT NOT NULL DEFAULT 'pending',
+    rows_saved INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_ts TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    finished_ts TIMESTAMP WITHOUT TIME ZONE,
+    last_updated_ts TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    PRIMARY KEY (run_id, unit_no)
+);
+
+CREATE INDEX IF NOT EXISTS idx_price_backfill_unit_dtl_status ON price_backfill_unit_dtl (run_id, status);
+
+COMMENT ON TABLE price_backfill_unit_dtl IS 'Per-unit checkpoints of bulk historical price backfills';
+COMMENT ON COLUMN price_backfill_unit_dtl.rows_saved IS 'Price rows upserted by the unit when it completed';
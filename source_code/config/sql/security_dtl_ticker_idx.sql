@@ -0,0 +1,3 @@
+-- Case-insensitive ticker lookups (e.g. GET /api/security-prices/series?tickers=...)
+-- resolve tickers with upper(ticker) = ANY(...); this expression index serves them.
+CREATE INDEX IF NOT EXISTS idx_security_dtl_upper_ticker ON security_dtl (upper(ticker));
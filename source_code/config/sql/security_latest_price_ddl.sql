@@ -0,0 +1,43 @@
+-- DDL for the latest price per security
+-- One row per security holding its newest security_price_dtl row (newest price_date; the most
+-- recently written source wins on the same date), so "current price" lookups are primary-key
+-- reads however much history accumulates. Kept current by every write path in
+-- source_code/crud/security_price_crud_operations.py (save, batch_upsert, update, delete) and
+-- by the COPY ingest in source_code/utils/price_frame_ingest.py.
+
+CREATE TABLE IF NOT EXISTS security_latest_price (
+    security_id BIGINT PRIMARY KEY,
+    security_price_id BIGINT NOT NULL,
+    price_source_id BIGINT NOT NULL,
+    price_date DATE NOT NULL,
+    price DOUBLE PRECISION NOT NULL,
+    open_px DOUBLE PRECISION,
+    close_px DOUBLE PRECISION,
+    high_px DOUBLE PRECISION,
+    low_px DOUBLE PRECISION,
+    adj_close_px DOUBLE PRECISION,
+    volume DOUBLE PRECISION,
+    market_cap DOUBLE PRECISION,
+    addl_notes TEXT,
+    price_currency TEXT DEFAULT 'USD'::text NOT NULL,
+    created_ts TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    last_updated_ts TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+-- Writers find the newest rows of the touched securities through this index
+CREATE INDEX IF NOT EXISTS idx_security_price_dtl_security_date
+    ON security_price_dtl (security_id, price_date DESC);
+
+-- Initial population (also a full rebuild: security_price_crud.refresh_latest())
+INSERT INTO security_latest_price (
+    security_price_id, security_id, price_source_id, price_date, price, open_px, close_px, high_px, low_px,
+    adj_close_px, volume, market_cap, addl_notes, price_currency, created_ts, last_updated_ts
+)
+SELECT DISTINCT ON (security_id)
+    security_price_id, security_id, price_source_id, price_date, price, open_px, close_px, high_px, low_px,
+    adj_close_px, volume, market_cap, addl_notes, price_currency, created_ts, last_updated_ts
+FROM security_price_dtl
+ORDER BY security_id, price_date DESC, last_updated_ts DESC
+ON CONFLICT (security_id) DO NOTHING;
+
+COMMENT ON TABLE security_latest_price IS 'Newest security_price_dtl row per security, maintained on upsert';
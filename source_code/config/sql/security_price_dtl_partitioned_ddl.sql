@@ -0,0 +1,40 @@
+-- DDL for security_price_dtl range-partitioned by price_date (fresh installs)
+-- Existing databases are converted online with: python -m source_code.utils.price_partitions migrate
+-- Upcoming partitions are pre-created with:       python -m source_code.utils.price_partitions ensure
+-- Old partitions are detached for archiving with: python -m source_code.utils.price_partitions detach --before <date>
+--
+-- The partition key must be part of every unique constraint, so the primary key is
+-- (security_price_id, price_date); the natural key unique_sec_price_by_source already includes it.
+
+CREATE TABLE IF NOT EXISTS security_price_dtl (
+    security_price_id BIGINT NOT NULL,
+    security_id BIGINT NOT NULL,
+    price_source_id BIGINT NOT NULL,
+    price_date DATE NOT NULL,
+    price DOUBLE PRECISION NOT NULL,
+    open_px DOUBLE PRECISION,
+    close_px DOUBLE PRECISION,
+    high_px DOUBLE PRECISION,
+    low_px DOUBLE PRECISION,
+    adj_close_px DOUBLE PRECISION,
+    volume DOUBLE PRECISION,
+    market_cap DOUBLE PRECISION,
+    price_currency TEXT DEFAULT 'USD'::text NOT NULL,
+    addl_notes TEXT,
+    created_ts TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    last_updated_ts TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    CONSTRAINT security_price_dtl_pkey PRIMARY KEY (security_price_id, price_date),
+    CONSTRAINT unique_sec_price_by_source UNIQUE (security_id, price_source_id, price_date)
+) PARTITION BY RANGE (price_date);
+
+CREATE INDEX IF NOT EXISTS idx_security_price_dtl_security_date
+    ON security_price_dtl (security_id, price_date DESC);
+
+-- Rows dated outside every range partition land here until ensure moves them out
+CREATE TABLE IF NOT EXISTS security_price_dtl_default PARTITION OF security_price_dtl DEFAULT;
+
+-- One partition per year (security_price_dtl_yYYYY) or month (security_price_dtl_mYYYYMM), e.g.
+CREATE TABLE IF NOT EXISTS security_price_dtl_y2025 PARTITION OF security_price_dtl
+    FOR VALUES FROM ('2025-01-01') TO ('2026-01-01');
+CREATE TABLE IF NOT EXISTS security_price_dtl_y2026 PARTITION OF security_price_dtl
+    FOR VALUES FROM ('2026-01-01') TO ('2027-01-01');
@@ -0,0 +1,8 @@
+-- Idempotent transaction imports: bulk/CSV imports store a SHA-256 content hash
+-- (see source_code/utils/transaction_content_hash.py) and skip rows whose hash exists.
+-- Manually entered transactions keep content_hash NULL, which the unique index allows.
+ALTER TABLE transaction_dtl ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_transaction_dtl_content_hash ON transaction_dtl (content_hash);
+
+COMMENT ON COLUMN transaction_dtl.content_hash IS 'SHA-256 of natural fields + occurrence ordinal within an import; NULL for manual entries';
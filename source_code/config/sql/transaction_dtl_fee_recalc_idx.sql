@@ -0,0 +1,4 @@
+-- Supports incremental fee recalculation (POST /api/transactions/recalculate-fees?changed_since=...)
+-- The chunked pass walks transaction_id ranges (primary key); this index lets the
+-- changed_since filter skip untouched rows without scanning the whole table.
+CREATE INDEX IF NOT EXISTS idx_transaction_dtl_last_updated_ts ON transaction_dtl (last_updated_ts);
@@ -0,0 +1,13 @@
+-- DDL for the fee recalculation watermark
+-- POST /api/transactions/recalculate-fees without changed_since only considers rows updated
+-- since the start of the last run that finished without failed chunks; the single row here
+-- holds that time. Written by TransactionCRUD.recalculate_fees_all
+-- (source_code/crud/transaction_crud_operations.py); ?full=true ignores it.
+
+CREATE TABLE IF NOT EXISTS transaction_fee_recalc_state (
+    state_id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (state_id = 1),
+    last_success_ts TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    last_updated_ts TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+COMMENT ON COLUMN transaction_fee_recalc_state.last_success_ts IS 'Start of the last clean recalculation; the next default run scans rows updated since';
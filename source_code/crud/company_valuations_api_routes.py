@@ -11,6 +11,7 @@ from pydantic import BaseModel
 
 from source_code.crud.company_valuations_crud_operations import company_valuation_crud
 from source_code.models.models import CompanyValuationDtl, CompanyValuationDtlInput
+from source_code.utils import columnar_io, csv_export
 
 router = APIRouter(prefix="/api/company-valuations", tags=["Company Valuations"])
 
@@ -24,6 +25,32 @@ def list_company_valuations(date: date | None = None):
     return company_valuation_crud.list_all()
 
 
+# CSV export endpoint
+@router.get("/export.csv")
+def export_company_valuations_csv(gzip: bool = False) -> Response:
+    """Stream all company valuations as CSV straight from COPY; gzip=true downloads company_valuations.csv.gz."""
+    return csv_export.stream_csv(
+        "SELECT company_valuation_id, as_of_date, price_source, company, sector_subsector, price, "
+        "price_change_amt, price_change_perc, last_matched_price, share_class, post_money_valuation, "
+        "price_per_share, amount_raised, created_ts, last_updated_ts "
+        "FROM public.company_valuations ORDER BY as_of_date DESC, company",
+        "company_valuations.csv", gzip,
+    )
+
+
+# Parquet / Arrow IPC export endpoints
+@router.get("/export.parquet")
+def export_company_valuations_parquet() -> Response:
+    """Stream all company valuations as a typed Parquet file (zstd, one row group per database batch)."""
+    return columnar_io.export_response("company_valuations", "parquet")
+
+
+@router.get("/export.arrow")
+def export_company_valuations_arrow() -> Response:
+    """Stream all company valuations as an Arrow IPC stream (one record batch per database batch)."""
+    return columnar_io.export_response("company_valuations", "arrow")
+
+
 @router.get("/{company_id}", response_model=CompanyValuationDtl)
 def get_company_valuation(company_id: int):
     """Get a specific company valuation by ID."""
@@ -66,50 +93,6 @@ def delete_company_valuation(company_id: int):
     return {"deleted": True}
 
 
-# CSV export endpoint
-@router.get("/export.csv")
-def export_company_valuations_csv() -> Response:
-    """Export company valuations to CSV."""
-    items = company_valuation_crud.list_all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    header = [
-        "company_valuation_id", "as_of_date", "price_source", "company", "sector_subsector",
-        "price", "price_change_amt", "price_change_perc", "last_matched_price",
-        "share_class", "post_money_valuation", "price_per_share", "amount_raised",
-        "created_ts", "last_updated_ts"
-    ]
-    writer.writerow(header)
-    
-    for company in items:
-        writer.writerow([
-            getattr(company, "company_valuation_id", ""),
-            getattr(company, "as_of_date", ""),
-            getattr(company, "price_source", ""),
-            getattr(company, "company", ""),
-            getattr(company, "sector_subsector", ""),
-            getattr(company, "price", ""),
-            getattr(company, "price_change_amt", ""),
-            getattr(company, "price_change_perc", ""),
-            getattr(company, "last_matched_price", ""),
-            getattr(company, "share_class", ""),
-            getattr(company, "post_money_valuation", ""),
-            getattr(company, "price_per_share", ""),
-            getattr(company, "amount_raised", ""),
-            getattr(company, "created_ts", ""),
-            getattr(company, "last_updated_ts", ""),
-        ])
-
-    csv_data = output.getvalue()
-    output.close()
-    return Response(
-        content=csv_data,
-        media_type="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="company_valuations.csv"'}
-    )
-
-
 # CSV upload endpoint
 @router.post("/bulk-csv", response_model=list[CompanyValuationDtl])
 async def upload_company_valuations_csv(file: UploadFile = File(...)):
@@ -189,6 +172,15 @@ async def upload_company_valuations_csv(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail=f"Failed to process CSV: {str(e)}")
 
 
+# Upload Parquet (e.g. a file from /export.parquet) and persist it in batches through save_many
+# Required columns: as_of_date, company; others fall back to the model defaults
+@router.post("/upload.parquet")
+def upload_company_valuations_parquet(file: UploadFile = File(...)) -> dict[str, int]:
+    """Import company valuations from a Parquet file; returns {"read", "saved"}."""
+    return columnar_io.parquet_upload(file, lambda f: columnar_io.save_parquet_records(
+        f, CompanyValuationDtlInput, {"as_of_date", "company"}, company_valuation_crud.save_many))
+
+
 # Data loader endpoints for ForgeGlobal CSV data
 class ForgeDataLoaderRequest(BaseModel):
     csv_file_path: str
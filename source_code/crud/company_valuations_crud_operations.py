@@ -71,7 +71,7 @@ class CompanyValuationCRUD(BaseCRUD[CompanyValuationDtl]):
             return self.get_security(existing_id)
         
         # Create new record
-        next_id = date_utils.get_timestamp_with_microseconds()
+        next_id = date_utils.get_timestamp_ids(1)[0]
         company = CompanyValuationDtl(
             company_valuation_id=next_id,
             as_of_date=item.as_of_date,
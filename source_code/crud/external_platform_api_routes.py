@@ -7,6 +7,7 @@ from fastapi.responses import Response
 
 from source_code.crud.external_platform_crud_operations import external_platform_crud
 from source_code.models.models import ExternalPlatformDtl, ExternalPlatformDtlInput, ALLOWED_PLATFORM_TYPES
+from source_code.utils import csv_export
 
 router = APIRouter(prefix="/api/external-platforms", tags=["External Platforms"])
 
@@ -75,26 +76,12 @@ def list_platforms():
 
 
 @router.get("/export.csv")
-def export_platforms_csv() -> Response:
-    items = external_platform_crud.list_all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-    header = ["external_platform_id", "name", "platform_type", "created_ts", "last_updated_ts"]
-    writer.writerow(header)
-    for p in items:
-        writer.writerow([
-            getattr(p, "external_platform_id", ""),
-            getattr(p, "name", ""),
-            getattr(p, "platform_type", ""),
-            getattr(p, "created_ts", ""),
-            getattr(p, "last_updated_ts", ""),
-        ])
-    csv_data = output.getvalue()
-    output.close()
-    return Response(
-        content=csv_data,
-        media_type="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="external_platforms.csv"'}
+def export_platforms_csv(gzip: bool = False) -> Response:
+    """Stream all external platforms as CSV straight from COPY; gzip=true downloads external_platforms.csv.gz."""
+    return csv_export.stream_csv(
+        "SELECT external_platform_id, name, platform_type, created_ts, last_updated_ts "
+        "FROM external_platform_dtl ORDER BY external_platform_id",
+        "external_platforms.csv", gzip,
     )
 
 
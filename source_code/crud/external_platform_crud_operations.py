@@ -23,7 +23,7 @@ class ExternalPlatformCRUD(BaseCRUD[ExternalPlatformDtl]):
 
     def save(self, item: ExternalPlatformDtlInput) -> ExternalPlatformDtl:
         self._validate_type(item.platform_type)
-        next_id = date_utils.get_timestamp_with_microseconds()
+        next_id = date_utils.get_timestamp_ids(1)[0]
         now = date_utils.get_current_date_time()
         platform = ExternalPlatformDtl(
             external_platform_id=next_id,
@@ -11,7 +11,7 @@ from datetime import date as _date
 
 from source_code.crud.holding_crud_operations import holding_crud
 from source_code.models.models import HoldingDtl, HoldingDtlInput
-from source_code.utils import domain_utils
+from source_code.utils import columnar_io, csv_export, domain_utils, job_runner
 
 router = APIRouter(prefix="/api/holdings", tags=["Holdings"])
 
@@ -22,6 +22,32 @@ def list_holdings():
     return holding_crud.list_holdings()
 
 
+# CSV export endpoint
+@router.get("/export.csv")
+def export_holdings_csv(gzip: bool = False) -> Response:
+    """Stream all holdings as CSV straight from COPY; gzip=true downloads holdings.csv.gz."""
+    return csv_export.stream_csv(
+        "SELECT holding_id, holding_dt, portfolio_id, security_id, quantity, price, avg_price, market_value, "
+        "security_price_dt, holding_cost_amt, unreal_gain_loss_amt, unreal_gain_loss_perc, created_ts, "
+        "last_updated_ts "
+        "FROM holding_dtl ORDER BY holding_id",
+        "holdings.csv", gzip,
+    )
+
+
+# Parquet / Arrow IPC export endpoints
+@router.get("/export.parquet")
+def export_holdings_parquet() -> Response:
+    """Stream all holdings as a typed Parquet file (zstd, one row group per database batch)."""
+    return columnar_io.export_response("holdings", "parquet")
+
+
+@router.get("/export.arrow")
+def export_holdings_arrow() -> Response:
+    """Stream all holdings as an Arrow IPC stream (one record batch per database batch)."""
+    return columnar_io.export_response("holdings", "arrow")
+
+
 @router.get("/{holding_id}", response_model=HoldingDtl)
 def get_holding(holding_id: int):
     h = holding_crud.get_security(holding_id)
@@ -113,41 +139,15 @@ async def upload_holdings_csv(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail=f"Failed to process CSV: {str(e)}")
 
 
-# CSV export endpoint
-@router.get("/export.csv")
-def export_holdings_csv() -> Response:
-    items = holding_crud.list_all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    header = ["holding_id", "holding_dt", "portfolio_id", "security_id", "quantity", "price", "avg_price", "market_value", "security_price_dt", "holding_cost_amt", "unreal_gain_loss_amt", "unreal_gain_loss_perc",
-              "created_ts", "last_updated_ts"]
-    writer.writerow(header)
-    for h in items:
-        writer.writerow([
-            getattr(h, "holding_id", ""),
-            getattr(h, "holding_dt", ""),
-            getattr(h, "portfolio_id", ""),
-            getattr(h, "security_id", ""),
-            getattr(h, "quantity", ""),
-            getattr(h, "price", ""),
-            getattr(h, "avg_price", ""),
-            getattr(h, "market_value", ""),
-            getattr(h, "security_price_dt", ""),
-            getattr(h, "holding_cost_amt", ""),
-            getattr(h, "unreal_gain_loss_amt", ""),
-            getattr(h, "unreal_gain_loss_perc", ""),
-            getattr(h, "created_ts", ""),
-            getattr(h, "last_updated_ts", ""),
-        ])
-
-    csv_data = output.getvalue()
-    output.close()
-    return Response(
-        content=csv_data,
-        media_type="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="holdings.csv"'}
-    )
+# Upload Parquet (e.g. a file from /export.parquet) and persist it in batches through save_many
+# Required columns: market_value, portfolio_id, price, quantity, security_id; others fall back to the model defaults
+@router.post("/upload.parquet")
+def upload_holdings_parquet(file: UploadFile = File(...)) -> dict[str, int]:
+    """Import holdings from a Parquet file; returns {"read", "saved"}."""
+    return columnar_io.parquet_upload(file, lambda f: columnar_io.save_parquet_records(
+        f, HoldingDtlInput, {"portfolio_id", "security_id", "quantity", "price", "market_value"},
+        holding_crud.save_many,
+    ))
 
 
 @router.put("/{holding_id}", response_model=HoldingDtl)
@@ -175,7 +175,15 @@ class RecalcRequest(BaseModel):
 
 
 @router.post("/recalculate")
-def recalc_holdings(req: RecalcRequest) -> dict:
+def recalc_holdings(req: RecalcRequest, response: Response, background: bool = False) -> dict:
+    if background:
+        job = job_runner.submit_job(
+            "holdings_recalculate",
+            lambda progress: {"date": req.date, **holding_crud.recalc_for_date(req.date, req.user_id)},
+            params=req.model_dump(),
+        )
+        response.status_code = 202
+        return job_runner.accepted(job)
     try:
         summary = holding_crud.recalc_for_date(req.date, getattr(req, 'user_id', None))
         return {"date": req.date, **summary}
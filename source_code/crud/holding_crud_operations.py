@@ -1,10 +1,12 @@
 # source_code/crud/holding_crud_operations.py
 from source_code.config import pg_db_conn_manager
 from source_code.crud.base import BaseCRUD
+from source_code.crud.security_price_crud_operations import security_price_crud
 from typing import List, Optional
 
 from source_code.models.models import HoldingDtl, HoldingDtlInput
 from source_code.utils import domain_utils as date_utils
+from source_code.utils.price_series_store import price_series_store
 
 
 # def list_holdings():
@@ -35,7 +37,7 @@ class HoldingCRUD(BaseCRUD[HoldingDtl]):
 
     # Save a single holding from input; generate id and timestamps
     def save(self, item: HoldingDtlInput) -> HoldingDtl:
-        next_holding_id = date_utils.get_timestamp_with_microseconds()
+        next_holding_id = date_utils.get_timestamp_ids(1)[0]
         now = date_utils.get_current_date_time()
         h = HoldingDtl(
             holding_id=next_holding_id,
@@ -220,15 +222,17 @@ class HoldingCRUD(BaseCRUD[HoldingDtl]):
         # Insert new holdings
         inserted = 0
         if holdings:
+            # Current prices are primary-key reads; only securities priced after target_date need their history
+            latest_prices = security_price_crud.get_latest_prices([sid for (_, sid, _, _) in holdings])
             for (pid, sid, qty, avg_cost) in holdings:
-                # Price on or before date (latest available)
-                price_rows = pg_db_conn_manager.fetch_data(
-                    "SELECT price, price_date FROM security_price_dtl WHERE security_id = %s AND price_date <= %s ORDER BY price_date DESC, security_price_id DESC LIMIT 1",
-                    (sid, target_date)
-                )
-                if price_rows:
-                    price = float(price_rows[0]["price"])
-                    sec_price_dt = price_rows[0]["price_date"]
+                current = latest_prices.get(sid)
+                if current is not None and current.price_date <= target_date:
+                    latest = (current.price_date, current.price)
+                else:
+                    # Price on or before date (latest available), from the cached price series
+                    latest = price_series_store.get(sid).as_of(target_date)
+                if latest:
+                    sec_price_dt, price = latest
                 else:
                     # Fallback: use last transaction price and its date if available
                     tx = get_last_tx(pid, sid)
@@ -243,7 +247,7 @@ class HoldingCRUD(BaseCRUD[HoldingDtl]):
                 unreal_gain_loss_amt = round(market_value - holding_cost_amt, 2)
                 unreal_gain_loss_perc = round(((unreal_gain_loss_amt / holding_cost_amt) * 100.0) if holding_cost_amt not in (0, 0.0) else 0.0, 4)
                 now = date_utils.get_current_date_time()
-                hid = date_utils.get_timestamp_with_microseconds()
+                hid = date_utils.get_timestamp_ids(1)[0]
                 pg_db_conn_manager.execute_query(
                     """
                     INSERT INTO holding_dtl (holding_id, holding_dt, portfolio_id, security_id, quantity, price, avg_price, market_value, security_price_dt, holding_cost_amt, unreal_gain_loss_amt, unreal_gain_loss_perc, created_ts, last_updated_ts)
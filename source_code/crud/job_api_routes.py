@@ -0,0 +1,23 @@
+# source_code/crud/job_api_routes.py
+from fastapi import APIRouter, HTTPException
+
+from source_code.crud.job_crud_operations import job_crud
+from source_code.models.models import JobDtl, JOB_STATUSES
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+
+@router.get("", response_model=list[JobDtl])
+@router.get("/", response_model=list[JobDtl])
+def list_jobs(status: str | None = None, job_type: str | None = None, limit: int = 50):
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {JOB_STATUSES}")
+    return job_crud.list_recent(limit=max(1, min(limit, 500)), status=status, job_type=job_type)
+
+
+@router.get("/{job_id}", response_model=JobDtl)
+def get_job(job_id: int):
+    job = job_crud.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,110 @@
+import json
+from typing import Any, List, Optional
+
+from source_code.config import pg_db_conn_manager
+from source_code.crud.base import BaseCRUD
+from source_code.models.models import JobDtl
+from source_code.utils import domain_utils as date_utils
+
+_JOB_COLUMNS = (
+    "job_id, job_type, status, params, progress, result, error, "
+    "created_ts, started_ts, finished_ts, last_updated_ts"
+)
+
+
+def _to_json(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return json.dumps(value, default=str)
+
+
+class JobCRUD(BaseCRUD[JobDtl]):
+    def __init__(self):
+        super().__init__(JobDtl)
+
+    def create(self, job_type: str, params: Optional[dict] = None) -> JobDtl:
+        now = date_utils.get_current_date_time()
+        job = JobDtl(
+            job_id=date_utils.get_timestamp_ids(1)[0],
+            job_type=job_type,
+            status="queued",
+            params=params,
+            created_ts=now,
+            last_updated_ts=now,
+        )
+        affected = pg_db_conn_manager.execute_query(
+            "INSERT INTO job_dtl (job_id, job_type, status, params, created_ts, last_updated_ts) "
+            "VALUES (%s, %s, %s, %s::jsonb, %s, %s)",
+            (job.job_id, job.job_type, job.status, _to_json(params), job.created_ts, job.last_updated_ts),
+        )
+        if affected == 0:
+            raise RuntimeError("Failed to save job")
+        return job
+
+    def get_job(self, pk: int) -> Optional[JobDtl]:
+        rows = pg_db_conn_manager.fetch_data(
+            f"SELECT {_JOB_COLUMNS} FROM job_dtl WHERE job_id = %s",
+            (pk,),
+        )
+        if not rows:
+            return None
+        return JobDtl(**rows[0])
+
+    def list_recent(self, limit: int = 50, status: Optional[str] = None, job_type: Optional[str] = None) -> List[JobDtl]:
+        conditions = []
+        params: list = []
+        if status is not None:
+            conditions.append("status = %s")
+            params.append(status)
+        if job_type is not None:
+            conditions.append("job_type = %s")
+            params.append(job_type)
+        where_clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        params.append(limit)
+        rows = pg_db_conn_manager.fetch_data(
+            f"SELECT {_JOB_COLUMNS} FROM job_dtl {where_clause} ORDER BY created_ts DESC LIMIT %s",
+            tuple(params),
+        )
+        return [JobDtl(**row) for row in rows]
+
+    def mark_running(self, pk: int) -> int:
+        now = date_utils.get_current_date_time()
+        return pg_db_conn_manager.execute_query(
+            "UPDATE job_dtl SET status = 'running', started_ts = %s, last_updated_ts = %s WHERE job_id = %s",
+            (now, now, pk),
+        )
+
+    def update_progress(self, pk: int, progress: dict) -> int:
+        return pg_db_conn_manager.execute_query(
+            "UPDATE job_dtl SET progress = %s::jsonb, last_updated_ts = %s WHERE job_id = %s",
+            (_to_json(progress), date_utils.get_current_date_time(), pk),
+        )
+
+    def mark_succeeded(self, pk: int, result: Any) -> int:
+        now = date_utils.get_current_date_time()
+        return pg_db_conn_manager.execute_query(
+            "UPDATE job_dtl SET status = 'succeeded', result = %s::jsonb, finished_ts = %s, last_updated_ts = %s "
+            "WHERE job_id = %s",
+            (_to_json(result), now, now, pk),
+        )
+
+    def mark_failed(self, pk: int, error: str) -> int:
+        now = date_utils.get_current_date_time()
+        return pg_db_conn_manager.execute_query(
+            "UPDATE job_dtl SET status = 'failed', error = %s, finished_ts = %s, last_updated_ts = %s "
+            "WHERE job_id = %s",
+            (error, now, now, pk),
+        )
+
+    def fail_unfinished(self, reason: str = "Interrupted by server restart") -> int:
+        """Mark queued/running jobs left over from a previous process as failed."""
+        now = date_utils.get_current_date_time()
+        return pg_db_conn_manager.execute_query(
+            "UPDATE job_dtl SET status = 'failed', error = %s, finished_ts = %s, last_updated_ts = %s "
+            "WHERE status IN ('queued', 'running')",
+            (reason, now, now),
+        )
+
+
+# Keep a singleton instance for importers (routes)
+job_crud = JobCRUD()
@@ -9,7 +9,7 @@ from fastapi.responses import Response
 
 from source_code.crud.portfolio_crud_operations import portfolio_crud
 from source_code.models.models import PortfolioDtl, PortfolioDtlInput
-from source_code.utils import domain_utils
+from source_code.utils import csv_export, domain_utils
 
 router = APIRouter(prefix="/api/portfolios", tags=["Portfolios"])
 
@@ -101,31 +101,12 @@ def list_portfolios():
 
 # CSV export endpoint
 @router.get("/export.csv")
-def export_portfolios_csv() -> Response:
-    items = portfolio_crud.list_all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    header = ["portfolio_id", "user_id", "name", "open_date", "close_date", "created_ts", "last_updated_ts"]
-    writer.writerow(header)
-    for p in items:
-        writer.writerow([
-            getattr(p, "portfolio_id", ""),
-            getattr(p, "user_id", ""),
-            getattr(p, "name", ""),
-            getattr(p, "open_date", ""),
-            getattr(p, "close_date", ""),
-            getattr(p, "created_ts", ""),
-            getattr(p, "last_updated_ts", ""),
-        ])
-
-    csv_data = output.getvalue()
-    output.close()
-
-    return Response(
-        content=csv_data,
-        media_type="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="portfolios.csv"'}
+def export_portfolios_csv(gzip: bool = False) -> Response:
+    """Stream all portfolios as CSV straight from COPY; gzip=true downloads portfolios.csv.gz."""
+    return csv_export.stream_csv(
+        "SELECT portfolio_id, user_id, name, open_date, close_date, created_ts, last_updated_ts "
+        "FROM portfolio_dtl ORDER BY portfolio_id",
+        "portfolios.csv", gzip,
     )
 
 
@@ -24,7 +24,7 @@ class PortfolioCRUD(BaseCRUD[PortfolioDtl]):
 
     # Save a single portfolio using input model (generate id + timestamps)
     def save(self, item: PortfolioDtlInput) -> PortfolioDtl:
-        next_portfolio_id = date_utils.get_timestamp_with_microseconds()
+        next_portfolio_id = date_utils.get_timestamp_ids(1)[0]
         pf = PortfolioDtl(
             portfolio_id=next_portfolio_id,
             user_id=item.user_id,
@@ -0,0 +1,59 @@
+from typing import List
+
+from source_code.config import pg_db_conn_manager
+from source_code.crud.base import BaseCRUD
+from source_code.models.models import PriceBackfillUnitDtl
+from source_code.utils import domain_utils as date_utils
+
+_UNIT_COLUMNS = (
+    "run_id, unit_no, tickers, from_date, to_date, status, rows_saved, attempts, error, "
+    "created_ts, finished_ts, last_updated_ts"
+)
+
+
+class PriceBackfillCRUD(BaseCRUD[PriceBackfillUnitDtl]):
+    def __init__(self):
+        super().__init__(PriceBackfillUnitDtl)
+
+    def create_units(self, units: List[PriceBackfillUnitDtl]) -> int:
+        now = date_utils.get_current_date_time()
+        return pg_db_conn_manager.execute_values(
+            "INSERT INTO price_backfill_unit_dtl "
+            "(run_id, unit_no, tickers, from_date, to_date, status, created_ts, last_updated_ts) VALUES %s "
+            "ON CONFLICT (run_id, unit_no) DO NOTHING",
+            [(u.run_id, u.unit_no, list(u.tickers), u.from_date, u.to_date, u.status, now, now) for u in units],
+        )
+
+    def list_units(self, run_id: int) -> List[PriceBackfillUnitDtl]:
+        rows = pg_db_conn_manager.fetch_data(
+            f"SELECT {_UNIT_COLUMNS} FROM price_backfill_unit_dtl WHERE run_id = %s ORDER BY unit_no",
+            (run_id,),
+        )
+        return [PriceBackfillUnitDtl(**row) for row in rows]
+
+    def mark_running(self, run_id: int, unit_no: int) -> int:
+        return pg_db_conn_manager.execute_query(
+            "UPDATE price_backfill_unit_dtl SET status = 'running', attempts = attempts + 1, error = NULL, "
+            "last_updated_ts = %s WHERE run_id = %s AND unit_no = %s",
+            (date_utils.get_current_date_time(), run_id, unit_no),
+        )
+
+    def mark_done(self, run_id: int, unit_no: int, rows_saved: int) -> int:
+        now = date_utils.get_current_date_time()
+        return pg_db_conn_manager.execute_query(
+            "UPDATE price_backfill_unit_dtl SET status = 'done', rows_saved = %s, finished_ts = %s, "
+            "last_updated_ts = %s WHERE run_id = %s AND unit_no = %s",
+            (rows_saved, now, now, run_id, unit_no),
+        )
+
+    def mark_failed(self, run_id: int, unit_no: int, error: str) -> int:
+        now = date_utils.get_current_date_time()
+        return pg_db_conn_manager.execute_query(
+            "UPDATE price_backfill_unit_dtl SET status = 'failed', error = %s, finished_ts = %s, "
+            "last_updated_ts = %s WHERE run_id = %s AND unit_no = %s",
+            (error, now, now, run_id, unit_no),
+        )
+
+
+# Keep a singleton instance for importers (routes)
+price_backfill_crud = PriceBackfillCRUD()
@@ -7,7 +7,7 @@ from fastapi.responses import Response
 
 from source_code.crud.security_crud_operations import security_crud
 from source_code.models.models import SecurityDtl, SecurityDtlInput
-from source_code.utils import security_data_by_yahooquery, domain_utils
+from source_code.utils import csv_export, security_data_by_yahooquery, domain_utils
 
 router = APIRouter(prefix="/api/securities", tags=["Securities"])
 
@@ -296,32 +296,12 @@ def list_securities():
 
 # CSV export endpoint
 @router.get("/export.csv")
-def export_securities_csv() -> Response:
-    items = security_crud.list_all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Define CSV header and rows
-    header = ["security_id", "ticker", "name", "company_name", "security_currency", "created_ts", "last_updated_ts"]
-    writer.writerow(header)
-    for s in items:
-        writer.writerow([
-            getattr(s, "security_id", ""),
-            getattr(s, "ticker", ""),
-            getattr(s, "name", ""),
-            getattr(s, "company_name", ""),
-            getattr(s, "security_currency", ""),
-            getattr(s, "created_ts", ""),
-            getattr(s, "last_updated_ts", ""),
-        ])
-
-    csv_data = output.getvalue()
-    output.close()
-
-    return Response(
-        content=csv_data,
-        media_type="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="securities.csv"'}
+def export_securities_csv(gzip: bool = False) -> Response:
+    """Stream all securities as CSV straight from COPY; gzip=true downloads securities.csv.gz."""
+    return csv_export.stream_csv(
+        "SELECT security_id, ticker, name, company_name, security_currency, created_ts, last_updated_ts "
+        "FROM security_dtl ORDER BY ticker, name, security_id",
+        "securities.csv", gzip,
     )
 
 
@@ -416,7 +396,7 @@ def save_company_data_from_tickers(tickers: list[str] = []):
     security_dtl_list = []
     for ticker, company_data in price_data.items():
         security_dtl = SecurityDtl(
-            security_id=domain_utils.get_timestamp_with_microseconds(),
+            security_id=domain_utils.get_timestamp_ids(1)[0],
             ticker=ticker,
             name=company_data["shortName"],
             company_name=company_data["longName"],
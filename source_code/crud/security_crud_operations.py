@@ -27,13 +27,16 @@ class SecurityCRUD(BaseCRUD[SecurityDtl]):
         return [SecurityDtl(**row) for row in rows]
 
     def list_all_public_with_missing_prices(self, from_date, to_date) -> List[SecurityDtl]:
-        sql = ("SELECT security_id, ticker, name, company_name, security_currency, is_private, created_ts, last_updated_ts "
-               "FROM security_dtl where is_private = False and security_id not in "
-               f"(select distinct security_id from security_price_dtl "
-               f"where price_date >= '{from_date}' and price_date <= '{to_date}') "
-               "ORDER BY ticker, name, security_id")
-        print(f"Final SQL: {sql}")
-        rows = pg_db_conn_manager.fetch_data(sql)
+        """Public securities without any price in the range (see price_coverage for per-session gaps)."""
+        rows = pg_db_conn_manager.fetch_data(
+            "SELECT s.security_id, s.ticker, s.name, s.company_name, s.security_currency, s.is_private, "
+            "s.created_ts, s.last_updated_ts "
+            "FROM security_dtl s WHERE s.is_private = False AND NOT EXISTS "
+            "(SELECT 1 FROM security_price_dtl p WHERE p.security_id = s.security_id "
+            "AND p.price_date BETWEEN %s AND %s) "
+            "ORDER BY s.ticker, s.name, s.security_id",
+            (from_date, to_date),
+        )
         return [SecurityDtl(**row) for row in rows]
 
     def list_all_by_ticker(self, ticker_list: list[str], public_only: Optional[bool] = True) -> List[SecurityDtl]:
@@ -59,7 +62,7 @@ class SecurityCRUD(BaseCRUD[SecurityDtl]):
         return [SecurityDtl(**row) for row in rows]
 
     def save(self, item: SecurityDtlInput) -> SecurityDtl:
-        next_security_id = domain_utils.get_timestamp_with_microseconds()
+        next_security_id = domain_utils.get_timestamp_ids(1)[0]
         sec_dtl = SecurityDtl(
             security_id=next_security_id,
             ticker=item.ticker,
@@ -8,8 +8,7 @@ from datetime import date
 from datetime import datetime, timedelta
 
 import pandas as pd
-import yfinance as yf
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi import UploadFile, File
 from fastapi.responses import Response
 from pydantic import BaseModel
@@ -17,8 +16,20 @@ from pydantic import BaseModel
 from source_code.crud.security_crud_operations import security_crud
 from source_code.crud.security_price_crud_operations import security_price_crud
 from source_code.models.models import SecurityPriceDtl, SecurityPriceDtlInput
-from source_code.utils import security_price_loader
-from source_code.utils.security_data_by_yfinance import get_historical_data_list
+from source_code.utils import (
+    call_governor,
+    columnar_io,
+    csv_export,
+    job_runner,
+    price_analytics,
+    price_backfill,
+    price_coverage,
+    price_frame_ingest,
+    price_partitions,
+    security_price_loader,
+)
+from source_code.utils.price_providers import get_provider
+from source_code.utils.trading_calendar import NYSE
 
 router = APIRouter(prefix="/api/security-prices", tags=["Security Prices"])
 
@@ -45,6 +56,96 @@ def list_security_prices(
     default_from_date = default_to_date - timedelta(days=7)
     return security_price_crud.list_by_date_range_and_ticker(default_from_date, default_to_date, None)
 
+@router.get("/series")
+def get_price_series(
+    tickers: str,
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+    fields: str = "price",
+    bucket: str | None = None,
+    points: int | None = None,
+) -> dict:
+    """
+    Price history for several tickers (comma separated) in one round trip.
+    Returns per-ticker columns: {"series": {TICKER: {"security_id", "dates", <fields>...}}, "missing": [...]}.
+    fields is a comma list of price, open_px, high_px, low_px, close_px, adj_close_px, volume.
+    bucket=week|month returns one OHLC-aggregated point per period; points=N returns at most N
+    LTTB-selected points per ticker (shaped on the first field), so long ranges stay chart-sized.
+    """
+    try:
+        return security_price_crud.series_by_tickers(
+            tickers.split(","), from_date, to_date, [f.strip() for f in fields.split(",") if f.strip()],
+            bucket.lower() if bucket else None, points,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/analytics")
+def get_price_analytics(
+    tickers: str,
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+    field: str = "price",
+    risk_free_rate: float = 0.0,
+    window: int | None = None,
+    include_series: bool = True,
+) -> dict:
+    """
+    Return and risk metrics per ticker (comma separated) computed server-side from the price store:
+    cumulative return, annualized volatility, max drawdown, Sharpe ratio, and optionally daily/log
+    return columns (include_series) and trailing `window`-session return and volatility.
+    risk_free_rate is annual, e.g. 0.04.
+    """
+    try:
+        return price_analytics.analyze_tickers(tickers.split(","), from_date, to_date, field, risk_free_rate,
+                                               window, include_series)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/latest")
+def get_latest_prices(tickers: str) -> dict:
+    """
+    Latest price per ticker (comma-separated), read by primary key from security_latest_price:
+    {"prices": {TICKER: {...}}, "missing": [...]}.
+    """
+    return security_price_crud.latest_by_tickers(tickers.split(","))
+
+@router.get("/partitions")
+def get_price_partitions() -> dict:
+    """price_date range partitions of security_price_dtl (empty when the table is not partitioned)."""
+    partitioned = price_partitions.is_partitioned()
+    return {"partitioned": partitioned, "partitions": price_partitions.list_partitions() if partitioned else []}
+
+@router.get("/provider-metrics")
+def get_provider_metrics() -> list[dict]:
+    """Rate-limit, retry and circuit-breaker metrics of every market-data provider used so far."""
+    return call_governor.all_metrics()
+
+# CSV export endpoint
+@router.get("/export.csv")
+def export_security_prices_csv(gzip: bool = False) -> Response:
+    """Stream all security prices as CSV straight from COPY; gzip=true downloads security_prices.csv.gz."""
+    return csv_export.stream_csv(
+        "SELECT security_price_id, security_id, price_source_id, price_date, price, open_px, close_px, high_px, "
+        "low_px, adj_close_px, volume, market_cap, addl_notes, price_currency, created_ts, last_updated_ts "
+        "FROM security_price_dtl ORDER BY security_id, price_date",
+        "security_prices.csv", gzip,
+    )
+
+
+# Parquet / Arrow IPC export endpoints
+@router.get("/export.parquet")
+def export_security_prices_parquet() -> Response:
+    """Stream all security prices as a typed Parquet file (zstd, one row group per database batch)."""
+    return columnar_io.export_response("security_prices", "parquet")
+
+
+@router.get("/export.arrow")
+def export_security_prices_arrow() -> Response:
+    """Stream all security prices as an Arrow IPC stream (one record batch per database batch)."""
+    return columnar_io.export_response("security_prices", "arrow")
+
+
 @router.get("/{security_price_id}", response_model=SecurityPriceDtl)
 def get_security_price(security_price_id: int):
     p = security_price_crud.get_security(security_price_id)
@@ -153,46 +254,15 @@ async def upload_security_prices_csv(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to process CSV: {str(e)}")
 
-# CSV export endpoint
-@router.get("/export.csv")
-def export_security_prices_csv() -> Response:
-    items = security_price_crud.list_all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    header = [
-        "security_price_id", "security_id", "price_source_id", "price_date", "price",
-        "open_px", "close_px", "high_px", "low_px", "adj_close_px", "volume",
-        "market_cap", "addl_notes", "price_currency", "created_ts", "last_updated_ts"
-    ]
-    writer.writerow(header)
-    for p in items:
-        writer.writerow([
-            getattr(p, "security_price_id", ""),
-            getattr(p, "security_id", ""),
-            getattr(p, "price_source_id", ""),
-            getattr(p, "price_date", ""),
-            getattr(p, "price", ""),
-            getattr(p, "open_px", ""),
-            getattr(p, "close_px", ""),
-            getattr(p, "high_px", ""),
-            getattr(p, "low_px", ""),
-            getattr(p, "adj_close_px", ""),
-            getattr(p, "volume", ""),
-            getattr(p, "market_cap", ""),
-            getattr(p, "addl_notes", ""),
-            getattr(p, "price_currency", ""),
-            getattr(p, "created_ts", ""),
-            getattr(p, "last_updated_ts", ""),
-        ])
-
-    csv_data = output.getvalue()
-    output.close()
-    return Response(
-        content=csv_data,
-        media_type="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="security_prices.csv"'}
-    )
+# Parquet upload -> COPY merge (no per-row models)
+# Accepted layouts: security_id, price_date, price|close_px, [...] (as exported) or Date, Ticker, Close, [...]
+@router.post("/upload.parquet")
+def upload_security_prices_parquet(file: UploadFile = File(...), price_source_id: int | None = None,
+                                   include_private: bool = False) -> dict:
+    return columnar_io.parquet_upload(file, lambda f: price_frame_ingest.ingest_price_parquet(
+        f, price_source_id=price_source_id or security_price_loader.DEFAULT_PRICE_SOURCE_ID,
+        include_private=include_private,
+    ))
 
 class DownloadPricesRequest(BaseModel):
     from_date: date | None = None
@@ -202,15 +272,120 @@ class DownloadPricesRequest(BaseModel):
     delete_after_download: bool = False
     incl_missing_securities_only: bool = False
     price_source_id: int | None = None
+    # Market-data provider name (defaults to PRICE_PROVIDER, i.e. yfinance)
+    provider: str | None = None
 
 @router.post("/download-date-range")
-def download_date_range(req: DownloadPricesRequest) -> dict:
+def download_date_range(req: DownloadPricesRequest, response: Response, background: bool = False) -> dict:
     """
     Download daily prices for securities (by ticker) for a date range from Yahoo Finance
-    and store them in security_price_dtl. Uses a fixed price_source_id (Yahoo Finance).
+    and store them in security_price_dtl under price_source_id (default Yahoo Finance).
     Defaults to last work day to today if no dates provided.
     Can filter by ticker list or download for all securities in database.
+    With background=true the download runs as a job and the response carries its job_id.
+    """
+    if background:
+        job = job_runner.submit_job("security_prices_download_date_range",
+                                    lambda progress: _download_date_range(req, progress),
+                                    params=req.model_dump())
+        response.status_code = 202
+        return job_runner.accepted(job)
+    return _download_date_range(req)
+
+
+class PriceBackfillRequest(BaseModel):
+    from_date: date | None = None
+    to_date: date | None = None
+    tickers: list[str] | None = None
+    # Resume an interrupted run instead of planning a new one
+    run_id: int | None = None
+    chunk_size: int = price_backfill.BACKFILL_CHUNK_SIZE
+    window_days: int = price_backfill.BACKFILL_WINDOW_DAYS
+    max_workers: int = price_backfill.BACKFILL_MAX_WORKERS
+    provider: str | None = None
+
+
+@router.post("/backfill")
+def backfill_prices(req: PriceBackfillRequest, response: Response, background: bool = False) -> dict:
     """
+    Backfill historical prices in checkpointed (ticker chunk, date window) units.
+    Pass run_id to resume a run; finished units are skipped and failed ones retried.
+    With background=true the backfill runs as a job and the response carries its job_id.
+    """
+    def run(progress=None) -> dict:
+        return price_backfill.run_backfill(req.from_date, req.to_date, req.tickers, run_id=req.run_id,
+                                           chunk_size=req.chunk_size, window_days=req.window_days,
+                                           max_workers=req.max_workers, provider=req.provider, progress=progress)
+
+    if background:
+        job = job_runner.submit_job("security_prices_backfill", run, params=req.model_dump())
+        response.status_code = 202
+        return job_runner.accepted(job)
+    try:
+        return run()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class PartitionMaintenanceRequest(BaseModel):
+    # Pre-create partitions through this many periods after the current one
+    ahead: int = price_partitions.PARTITIONS_AHEAD
+    # year | month; defaults to the granularity of the existing partitions
+    granularity: str | None = None
+    # Detach partitions ending on or before this date (for archiving)
+    detach_before: date | None = None
+
+@router.post("/partitions/maintain")
+def maintain_price_partitions(req: PartitionMaintenanceRequest) -> dict:
+    """Pre-create upcoming price_date partitions and optionally detach old ones for archiving."""
+    try:
+        result = price_partitions.ensure_partitions(req.ahead, req.granularity)
+        if req.detach_before is not None:
+            result.update(price_partitions.detach_partitions(req.detach_before))
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/partitions/migrate")
+def migrate_price_partitions(response: Response, granularity: str = price_partitions.PARTITION_GRANULARITY,
+                             background: bool = False) -> dict:
+    """
+    Convert security_price_dtl into price_date range partitions while it stays in use.
+    With background=true the migration runs as a job and the response carries its job_id.
+    """
+    if granularity not in price_partitions.GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Invalid granularity; expected one of: "
+                                                    + ", ".join(price_partitions.GRANULARITIES))
+
+    def run(progress=None) -> dict:
+        return price_partitions.migrate(granularity, progress=progress)
+
+    if background:
+        job = job_runner.submit_job("security_prices_partition_migration", run, params={"granularity": granularity})
+        response.status_code = 202
+        return job_runner.accepted(job)
+    try:
+        return run()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/backfill/{run_id}")
+def get_backfill_status(run_id: int) -> dict:
+    status = price_backfill.run_status(run_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Backfill run not found")
+    return status
+
+
+def _stage_progress(progress, stage: str):
+    """Wrap a job progress callback so provider/loader snapshots carry the job stage."""
+    if progress is None:
+        return None
+    return lambda snapshot: progress({"stage": stage, **snapshot})
+
+
+def _download_date_range(req: DownloadPricesRequest, progress=None) -> dict:
     # Set default date range: last work day to today
     today = datetime.now().date()
     if req.to_date is None:
@@ -219,13 +394,8 @@ def download_date_range(req: DownloadPricesRequest) -> dict:
         to_date = req.to_date
     
     if req.from_date is None:
-        # Get last work day (Monday if today is weekend, otherwise previous day if workday)
-        if today.weekday() == 0:  # Monday
-            from_date = today - timedelta(days=3)  # Previous Friday
-        elif today.weekday() == 6:  # Sunday  
-            from_date = today - timedelta(days=2)  # Previous Friday
-        else:
-            from_date = today - timedelta(days=1)  # Previous day
+        # Last trading session before today (skips weekends and exchange holidays)
+        from_date = NYSE.previous_session(today)
     else:
         from_date = req.from_date
 
@@ -233,13 +403,9 @@ def download_date_range(req: DownloadPricesRequest) -> dict:
     # dict of securities based on Ticker to get the security_id
     security_data_list = []
     if req.tickers is None:
-        # Get securities to process
-        if req.incl_missing_securities_only:
-            print("Getting all public securities that do not have any price between the selected date range.")
-            security_data_list = security_crud.list_all_public_with_missing_prices(from_date, to_date)
-        else:
-            print("Getting all public securities")
-            security_data_list = security_crud.list_all_public()
+        # Get securities to process; in missing-only mode their gaps are resolved per session below
+        print("Getting all public securities")
+        security_data_list = security_crud.list_all_public()
     else:
         # get security data for all tickers in the list
         # Preserve current behavior: restrict to public securities when tickers are provided
@@ -253,34 +419,34 @@ def download_date_range(req: DownloadPricesRequest) -> dict:
     # get price history for the selected date range
     from_date_str = from_date.isoformat()
     to_date_str = to_date.isoformat()
-    # data_list output will be a list of dictionaries with columns: ['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume', "Adj Close"]
-    data_list, cols_to_keep = get_historical_data_list(ticker_list, from_date_str, to_date_str)
-    # build a list of SecurityPriceDtlInput
-    # Prepare price input for batch processing
-    price_inputs = []
-    if data_list is None or len(data_list) == 0:
+    if req.tickers is None and req.incl_missing_securities_only:
+        # Fetch only the sessions that have no price yet
+        frame = _download_missing_sessions(security_data_list, from_date, to_date, req.provider,
+                                           _stage_progress(progress, "download"))
+        ticker_list = sorted(frame["Ticker"].unique()) if not frame.empty else []
+    else:
+        # Long frame with columns: ['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume', "Adj Close"]
+        frame = get_provider(req.provider).fetch_history(ticker_list, from_date_str, to_date_str,
+                                                         progress=_stage_progress(progress, "download"))
+    if frame.empty:
         return {"message": "No price data available for the selected date range"}
 
+    price_source_id = req.price_source_id or security_price_loader.DEFAULT_PRICE_SOURCE_ID
     if req.save_to_file:
-        # write data_list as csv to a file with current timestamp as filename
+        # write the downloaded frame as csv to a file with current timestamp as filename
         filename = f"security_price_data_{from_date.isoformat()}_{to_date.isoformat()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         print(f">>> Saving data to file {filename}")
-        with open(filename, "w") as f:
-            writer = csv.writer(f)
-            writer.writerow(cols_to_keep)
-            for row in data_list:
-                # write data from each row, which is a dictionary to the csv file based on the header info
-                # (iterate over the cols list and write in the order of cols
-                writer.writerow([row[col] for col in cols_to_keep])
-
-        # once downloaded, load prices to the database using the security_price_loader (similar to load_prices_from_file)
-        ret_data = security_price_loader.load_security_prices_from_file(filename)
+        frame.to_csv(filename, index=False, date_format="%Y-%m-%d")
 
+    # Map the frame straight onto security_price_dtl and load it with COPY
+    if progress is not None:
+        progress({"stage": "ingest", "rows": int(len(frame)), "tickers": int(frame["Ticker"].nunique())})
+    ret_data = price_frame_ingest.ingest_price_frame(frame, price_source_id=price_source_id)
+    if req.save_to_file:
+        ret_data["file"] = filename
         if req.delete_after_download:
             print(f">>> Deleting downloaded file {filename}")
             os.remove(filename)
-    else:
-        ret_data = security_price_loader.load_security_prices_from_list_of_dicts(data_list)
 
     # add input parameters to the returned data
     ret_data["from_date"] = from_date.isoformat()
@@ -291,131 +457,94 @@ def download_date_range(req: DownloadPricesRequest) -> dict:
 
 
 
-def download_prices_by_date(target_date: date) -> dict:
+def _download_missing_sessions(securities: list, from_date: date, to_date: date,
+                               provider: str | None = None, progress=None) -> pd.DataFrame:
     """
-    Download daily prices for all securities (by ticker) for a given date from Yahoo Finance
-    and store them in security_price_dtl. Uses a fixed price_source_id=401 (Yahoo Finance).
-    Skips securities without a ticker or when the price is unavailable for the date.
+    Download only the (ticker, session) pairs without a stored price. Missing sessions are
+    grouped into spans and tickers sharing a span are fetched together in one batched call.
+    Returns a long frame like the full-range download.
     """
-    securities = security_crud.list_all_public()
-    attempted = 0
-    saved = 0
-    skipped = 0
+    by_id = {s.security_id: s.ticker.upper().strip() for s in securities if s.ticker and s.ticker.strip()}
+    spans = price_coverage.missing_spans(list(by_id), from_date, to_date)
+    spans_by_ticker = {by_id[sid]: sid_spans for sid, sid_spans in spans.items()}
+    plan = price_coverage.plan_fetches(spans_by_ticker)
+    print(f"{len(spans_by_ticker)} of {len(by_id)} securities have missing sessions; {len(plan)} fetch group(s)")
+
+    price_provider = get_provider(provider)
+    frames = []
+    for done, (start, end, tickers) in enumerate(plan, start=1):
+        frames.append(price_provider.fetch_history(tickers, start.isoformat(), end.isoformat()))
+        if progress is not None:
+            progress({"groups_done": done, "groups_total": len(plan)})
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    frame = pd.concat(frames, ignore_index=True)
+    # Keep only rows for sessions that were missing (spans may be fetched with neighbouring days)
+    wanted = pd.DataFrame(price_coverage.missing_pairs(spans_by_ticker), columns=["Ticker", "session"])
+    frame["session"] = pd.to_datetime(frame["Date"]).dt.date
+    frame = frame.merge(wanted, on=["Ticker", "session"]).drop(columns="session")
+    return frame.drop_duplicates(subset=["Date", "Ticker"]).sort_values(["Date", "Ticker"], kind="stable")
+
+
+def download_prices_by_date(target_date: date, provider: str | None = None) -> dict:
+    """
+    Download daily prices for all public securities (by ticker) for a given date from the price
+    provider (Yahoo Finance by default) and store them in security_price_dtl under the Yahoo Finance price source.
+    Tickers are fetched in multi-ticker batches, the frame is reduced with vectorized
+    operations to each ticker's row for that exact date and everything is written with one
+    batch upsert. Skips securities without a ticker, without a row on the date (halted or not
+    yet listed) or without a positive close; dates that are not trading sessions store nothing.
+    """
+    if not NYSE.is_session(target_date):
+        return {"date": target_date.isoformat(), "attempted": 0, "saved": 0, "skipped": 0,
+                "errors": [f"{target_date.isoformat()} is not a trading session"]}
+    securities = [s for s in security_crud.list_all_public() if not getattr(s, "is_private", False)]
+    by_ticker = {(s.ticker or "").strip().upper(): s for s in securities if (s.ticker or "").strip()}
+    attempted = len(by_ticker)
     errors: list[str] = []
-    YAHOO_SOURCE_ID = 1759649078984028  # Yahoo Finance pricing source ID
-
-    # yfinance best practice: batch tickers when possible; but for simplicity and reliability here, iterate
-    for s in securities:
-        # Skip private securities
-        if getattr(s, "is_private", False):
-            skipped += 1
-            continue
-        ticker = (s.ticker or "").strip()
-        if not ticker:
-            skipped += 1
-            continue
-        attempted += 1
-        try:
-            tk = yf.Ticker(ticker)
-            # fetch a small date window around the target to accommodate timezone differences
-            start = target_date.strftime("%Y-%m-%d")
-            end_dt = target_date.toordinal() + 1  # +1 day
-            from datetime import date as _d, timedelta
-            end = (_d.fromordinal(end_dt)).strftime("%Y-%m-%d")
-            hist = tk.history(start=start, end=end, auto_adjust=False)
-            if hist is None or len(hist) == 0:
-                skipped += 1
-                continue
-            # Try to find a row matching date index; if not, take the last row (for some tickers intraday/UTC offsets)
-            close_price = None
-            # yfinance returns a pandas DataFrame; index may be Timestamp
-            try:
-                # exact date match
-                if target_date.strftime("%Y-%m-%d") in [str(idx)[:10] for idx in hist.index]:
-                    for idx, row in hist.iterrows():
-                        if str(idx)[:10] == target_date.strftime("%Y-%m-%d"):
-                            close_price = float(row.get("Close") or row.get("close"))
-                            break
-            except Exception:
-                close_price = None
-            if close_price is None:
-                # fallback to last row
-                last_row = hist.tail(1)
-                if last_row is not None and len(last_row) > 0:
-                    try:
-                        close_price = float(last_row["Close"][0])
-                    except Exception:
-                        try:
-                            close_price = float(last_row.iloc[0].get("Close") or last_row.iloc[0].get("close"))
-                        except Exception:
-                            close_price = None
-            if close_price is None or not (close_price > 0):
-                skipped += 1
+    YAHOO_SOURCE_ID = security_price_loader.DEFAULT_PRICE_SOURCE_ID  # Yahoo Finance pricing source ID
+
+    frame = get_provider(provider).fetch_history(list(by_ticker), target_date.isoformat(), target_date.isoformat(),
+                                                 auto_adjust=False)
+    price_inputs: list[SecurityPriceDtlInput] = []
+    if not frame.empty:
+        frame = frame.assign(price_date=pd.to_datetime(frame["Date"]).dt.date)
+        # Only the ticker's own row for the date; an earlier close is never stored under it
+        frame = frame[(frame["price_date"] == target_date) & (frame["Close"] > 0)]
+        latest = frame.drop_duplicates(subset="Ticker", keep="last")
+        cols = {"Open": "open_px", "High": "high_px", "Low": "low_px", "Close": "close_px",
+                "Adj Close": "adj_close_px", "Volume": "volume"}
+        latest = latest.rename(columns=cols).reindex(columns=["Ticker", *cols.values()])
+        latest = latest.astype({c: "float64" for c in cols.values()})
+        for rec in latest.to_dict("records"):
+            s = by_ticker.get(rec["Ticker"])
+            if s is None:
                 continue
+            values = {c: (None if pd.isna(rec[c]) else float(rec[c])) for c in cols.values()}
+            price_inputs.append(SecurityPriceDtlInput(
+                security_id=s.security_id,
+                price_source_id=YAHOO_SOURCE_ID,
+                price_date=target_date,
+                price=round(values["close_px"], 4),
+                market_cap=0.0,
+                addl_notes="Yahoo",
+                price_currency=(s.security_currency or "USD").upper(),
+                **values,
+            ))
 
-            # Save price with extended OHLC fields
-            try:
-                # Derive extended fields from matched row/last row similar to above
-                open_px = None
-                close_px = None
-                high_px = None
-                low_px = None
-                adj_close_px = None
-                volume = None
-                try:
-                    matched = False
-                    if target_date.strftime("%Y-%m-%d") in [str(idx)[:10] for idx in hist.index]:
-                        for idx, row in hist.iterrows():
-                            if str(idx)[:10] == target_date.strftime("%Y-%m-%d"):
-                                open_px = float(row.get("Open") or row.get("open") or 0)
-                                close_px = float(row.get("Close") or row.get("close") or 0)
-                                high_px = float(row.get("High") or row.get("high") or 0)
-                                low_px = float(row.get("Low") or row.get("low") or 0)
-                                adj_close_px = float(row.get("Adj Close") or row.get("Adj_Close") or row.get("adj_close") or 0)
-                                volume = float(row.get("Volume") or row.get("volume") or 0)
-                                matched = True
-                                break
-                    if not matched:
-                        lr = hist.tail(1)
-                        if lr is not None and len(lr) > 0:
-                            r = lr.iloc[0]
-                            open_px = float(r.get("Open") or r.get("open") or 0)
-                            close_px = float(r.get("Close") or r.get("close") or 0)
-                            high_px = float(r.get("High") or r.get("high") or 0)
-                            low_px = float(r.get("Low") or r.get("low") or 0)
-                            adj_close_px = float(r.get("Adj Close") or r.get("Adj_Close") or r.get("adj_close") or 0)
-                            volume = float(r.get("Volume") or r.get("volume") or 0)
-                except Exception:
-                    pass
-
-                spi = SecurityPriceDtlInput(
-                    security_id=s.security_id,
-                    price_source_id=YAHOO_SOURCE_ID,
-                    price_date=target_date,
-                    price=round(close_price, 4),
-                    open_px=open_px,
-                    close_px=close_px,
-                    high_px=high_px,
-                    low_px=low_px,
-                    adj_close_px=adj_close_px,
-                    volume=volume,
-                    market_cap=0.0,
-                    addl_notes="Yahoo",
-                    price_currency=(s.security_currency or "USD").upper(),
-                )
-                security_price_crud.save(spi)
-                saved += 1
-            except Exception as se:
-                errors.append(f"save {ticker}: {se}")
+    saved = 0
+    if price_inputs:
+        try:
+            saved = int(security_price_crud.batch_upsert(price_inputs).get("total", len(price_inputs)))
         except Exception as e:
-            errors.append(f"{ticker}: {e}")
-            skipped += 1
+            errors.append(f"batch upsert: {e}")
 
     return {
         "date": target_date.isoformat(),
         "attempted": int(attempted),
         "saved": int(saved),
-        "skipped": int(skipped),
+        "skipped": int(len(securities) - len(price_inputs)),
         "errors": errors,
     }
 
@@ -436,13 +565,23 @@ def delete_security_price(security_price_id: int):
     return {"deleted": True}
 
 @router.post("/load_prices_from_file")
-def load_prices_from_file(file: UploadFile = File(...)):
+def load_prices_from_file(response: Response, file: UploadFile = File(...), background: bool = False):
     """
     Load security prices from a CSV file, sent from the REST API request.
+    With background=true the load runs as a job and the response carries its job_id.
 
     Returns:
         dict: A dictionary indicating the success of the operation.
     """
+    if background:
+        path = job_runner.spool_upload(file.file, suffix=".csv")
+        job = job_runner.submit_job("security_prices_load_file",
+                                    lambda progress: security_price_loader.load_security_prices_from_file(
+                                        path, progress=progress),
+                                    params={"filename": file.filename},
+                                    cleanup=job_runner.remove_file(path))
+        response.status_code = 202
+        return job_runner.accepted(job)
     # save the file to local temp directory and call load_security_prices_from_file from security_price_loader utility
     try:
         temp_dir = tempfile.mkdtemp()
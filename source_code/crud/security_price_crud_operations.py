@@ -1,10 +1,43 @@
 # source_code/crud/security_price_crud_operations.py
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from source_code.config import pg_db_conn_manager
 from source_code.crud.base import BaseCRUD
 from source_code.models.models import SecurityPriceDtl, SecurityPriceDtlInput
 from source_code.utils import domain_utils as date_utils
+from source_code.utils import price_downsample
+from source_code.utils.price_series_store import price_series_store
+
+# security_latest_price (config/sql/security_latest_price_ddl.sql) keeps the newest row per security
+_PRICE_COLUMNS = (
+    "security_price_id, security_id, price_source_id, price_date, price, open_px, close_px, high_px, low_px, "
+    "adj_close_px, volume, market_cap, addl_notes, price_currency, created_ts, last_updated_ts"
+)
+_LATEST_UPDATE_SET = ",\n        ".join(
+    f"{c} = EXCLUDED.{c}" for c in _PRICE_COLUMNS.split(", ") if c != "security_id"
+)
+# Newest row of each touched security among its rows dated on/after the earliest written date;
+# the written rows are in that range, so this is the true latest without scanning full history.
+# The guard keeps a concurrent writer with older dates from moving the row backwards.
+_ADVANCE_LATEST_SQL = f"""
+    INSERT INTO security_latest_price ({_PRICE_COLUMNS})
+    SELECT DISTINCT ON (security_id) {_PRICE_COLUMNS}
+    FROM security_price_dtl
+    WHERE security_id = ANY(%s) AND price_date >= %s
+    ORDER BY security_id, price_date DESC, last_updated_ts DESC
+    ON CONFLICT (security_id) DO UPDATE SET
+        {_LATEST_UPDATE_SET}
+    WHERE EXCLUDED.price_date >= security_latest_price.price_date
+"""
+# Rebuild after updates/deletes, which may move the latest row back in time (all securities when ids is NULL)
+_REFRESH_LATEST_SQL = f"""
+    DELETE FROM security_latest_price WHERE %(ids)s::bigint[] IS NULL OR security_id = ANY(%(ids)s);
+    INSERT INTO security_latest_price ({_PRICE_COLUMNS})
+    SELECT DISTINCT ON (security_id) {_PRICE_COLUMNS}
+    FROM security_price_dtl
+    WHERE %(ids)s::bigint[] IS NULL OR security_id = ANY(%(ids)s)
+    ORDER BY security_id, price_date DESC, last_updated_ts DESC
+"""
 
 class SecurityPriceCRUD(BaseCRUD[SecurityPriceDtl]):
     def __init__(self):
@@ -66,8 +99,70 @@ class SecurityPriceCRUD(BaseCRUD[SecurityPriceDtl]):
         rows = pg_db_conn_manager.fetch_data(query, tuple(params))
         return [SecurityPriceDtl(**row) for row in rows]
 
-    def get_price_by_ticker_and_date(self, ticker: str, price_date) -> Optional[SecurityPriceDtl]:
-        """Get security price for a specific ticker and date"""
+    SERIES_FIELDS = ("price", "open_px", "high_px", "low_px", "close_px", "adj_close_px", "volume")
+
+    def series_by_tickers(self, tickers: List[str], from_date=None, to_date=None, fields: Optional[List[str]] = None,
+                          bucket: Optional[str] = None, points: Optional[int] = None) -> dict:
+        """
+        Price history for several tickers in one query, as a columnar payload:
+        {"series": {TICKER: {"security_id", "dates": [...], <field>: [...]}}, "missing": [tickers not found]}.
+        Tickers are resolved against security_dtl with = ANY(%s) so security_price_dtl is read
+        through its security_id index. One row per date (latest updated source wins).
+        bucket (week/month) aggregates OHLC per period and points caps each series with LTTB
+        (see price_downsample); downsampled entries carry source_points, the daily row count.
+        """
+        fields = list(fields or ["price"])
+        unknown = [f for f in fields if f not in self.SERIES_FIELDS]
+        if unknown:
+            raise ValueError("Invalid fields; expected any of: " + ", ".join(self.SERIES_FIELDS))
+        if bucket is not None and bucket not in price_downsample.BUCKETS:
+            raise ValueError("Invalid bucket; expected one of: " + ", ".join(price_downsample.BUCKETS))
+        if points is not None and points < price_downsample.MIN_POINTS:
+            raise ValueError(f"points must be at least {price_downsample.MIN_POINTS}")
+        wanted = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        if not wanted:
+            return {"series": {}, "missing": []}
+        conditions = ["p.security_id = s.security_id"]
+        params: list = [wanted]
+        if from_date is not None:
+            conditions.append("p.price_date >= %s")
+            params.append(from_date)
+        if to_date is not None:
+            conditions.append("p.price_date <= %s")
+            params.append(to_date)
+        query = (
+            f"SELECT DISTINCT ON (s.security_id, p.price_date) upper(s.ticker) AS ticker, s.security_id, p.price_date, "
+            f"{', '.join('p.' + f for f in fields)} "
+            "FROM (SELECT security_id, ticker FROM security_dtl WHERE upper(ticker) = ANY(%s)) s "
+            f"JOIN security_price_dtl p ON {' AND '.join(conditions)} "
+            "ORDER BY s.security_id, p.price_date, p.last_updated_ts DESC"
+        )
+        rows = pg_db_conn_manager.fetch_data(query, tuple(params))
+        series: dict = {}
+        for row in rows:
+            entry = series.setdefault(row["ticker"], {"security_id": row["security_id"], "dates": [], **{f: [] for f in fields}})
+            entry["dates"].append(row["price_date"])
+            for f in fields:
+                value = row.get(f)
+                entry[f].append(float(value) if value is not None else None)
+        if bucket or points:
+            for entry in series.values():
+                entry["source_points"] = len(entry["dates"])
+                dates, columns = price_downsample.downsample_columns(
+                    entry["dates"], {f: entry[f] for f in fields}, bucket, points)
+                entry.update(dates=dates, **columns)
+        return {"series": series, "missing": [t for t in wanted if t not in series]}
+
+    def get_price_by_ticker_and_date(self, ticker: str, price_date=None) -> Optional[SecurityPriceDtl]:
+        """Get security price for a specific ticker and date (the latest price when price_date is None)"""
+        if price_date is None:
+            rows = pg_db_conn_manager.fetch_data(
+                f"SELECT {', '.join('lp.' + c for c in _PRICE_COLUMNS.split(', '))} "
+                "FROM security_latest_price lp JOIN security_dtl s ON s.security_id = lp.security_id "
+                "WHERE s.ticker = %s LIMIT 1",
+                (ticker,)
+            )
+            return SecurityPriceDtl(**rows[0]) if rows else None
         rows = pg_db_conn_manager.fetch_data(
             "SELECT security_price_id, price_dtl.security_id, price_source_id, price_date,  "
             "price, open_px, close_px, high_px, low_px, adj_close_px, volume, market_cap, addl_notes, price_currency, price_dtl.created_ts, price_dtl.last_updated_ts "
@@ -81,9 +176,51 @@ class SecurityPriceCRUD(BaseCRUD[SecurityPriceDtl]):
             return None
         return SecurityPriceDtl(**rows[0])
 
+    def get_latest_prices(self, security_ids: List[int]) -> Dict[int, SecurityPriceDtl]:
+        """Latest price row per security (primary-key reads on security_latest_price)."""
+        ids = list(dict.fromkeys(int(i) for i in security_ids))
+        if not ids:
+            return {}
+        rows = pg_db_conn_manager.fetch_data(
+            f"SELECT {_PRICE_COLUMNS} FROM security_latest_price WHERE security_id = ANY(%s)",
+            (ids,),
+        )
+        return {row["security_id"]: SecurityPriceDtl(**row) for row in rows}
+
+    def latest_by_tickers(self, tickers: List[str]) -> dict:
+        """{"prices": {TICKER: SecurityPriceDtl}, "missing": [tickers without prices]} from security_latest_price."""
+        wanted = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        if not wanted:
+            return {"prices": {}, "missing": []}
+        rows = pg_db_conn_manager.fetch_data(
+            f"SELECT upper(s.ticker) AS ticker, {', '.join('lp.' + c for c in _PRICE_COLUMNS.split(', '))} "
+            "FROM security_latest_price lp JOIN security_dtl s ON s.security_id = lp.security_id "
+            "WHERE upper(s.ticker) = ANY(%s) ORDER BY lp.security_id",
+            (wanted,),
+        )
+        prices: dict = {}
+        for row in rows:
+            ticker = row.pop("ticker")
+            prices.setdefault(ticker, SecurityPriceDtl(**row))
+        return {"prices": prices, "missing": [t for t in wanted if t not in prices]}
+
+    def advance_latest(self, security_ids: List[int], since) -> int:
+        """Move security_latest_price forward after prices dated on/after `since` were written."""
+        ids = list(dict.fromkeys(int(i) for i in security_ids))
+        if not ids:
+            return 0
+        return pg_db_conn_manager.execute_query(_ADVANCE_LATEST_SQL, (ids, since))
+
+    def refresh_latest(self, security_ids: Optional[List[int]] = None) -> int:
+        """Recompute security_latest_price for the given securities (all when None)."""
+        ids = list(dict.fromkeys(int(i) for i in security_ids)) if security_ids is not None else None
+        return pg_db_conn_manager.execute_query(_REFRESH_LATEST_SQL, {"ids": ids})
+
     # Save single price (generate ID and timestamps) with natural-key upsert
     # Natural key: (security_id, price_source_id, price_date)
     # If a row already exists for this combination, update it instead of inserting a duplicate.
+    # The insert also conflicts on the natural key: security_price_id alone is not unique once
+    # the table is partitioned by price_date (see utils/price_partitions.py).
     def save(self, item: SecurityPriceDtlInput) -> SecurityPriceDtl:
         # Check if a price already exists for the same security/source/date
         existing_rows = pg_db_conn_manager.fetch_data(
@@ -126,9 +263,11 @@ class SecurityPriceCRUD(BaseCRUD[SecurityPriceDtl]):
             affected = pg_db_conn_manager.execute_query(update_sql, params)
             if affected == 0:
                 raise RuntimeError("Failed to update security price")
+            self.advance_latest([item.security_id], item.price_date)
+            price_series_store.apply_upserts([item])
             return self.get_security(existing_id)
         # Else insert new row
-        next_price_id = date_utils.get_timestamp_with_microseconds()
+        next_price_id = date_utils.get_timestamp_ids(1)[0]
         price = SecurityPriceDtl(
             security_price_id=next_price_id,
             security_id=item.security_id,
@@ -151,10 +290,7 @@ class SecurityPriceCRUD(BaseCRUD[SecurityPriceDtl]):
         INSERT INTO security_price_dtl (
             security_price_id, security_id, price_source_id, price_date, price, open_px, close_px, high_px, low_px, adj_close_px, volume, market_cap, addl_notes, price_currency, created_ts, last_updated_ts
         ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (security_price_id) DO UPDATE SET
-            security_id = EXCLUDED.security_id,
-            price_source_id = EXCLUDED.price_source_id,
-            price_date = EXCLUDED.price_date,
+        ON CONFLICT (security_id, price_source_id, price_date) DO UPDATE SET
             price = EXCLUDED.price,
             open_px = EXCLUDED.open_px,
             close_px = EXCLUDED.close_px,
@@ -188,6 +324,8 @@ class SecurityPriceCRUD(BaseCRUD[SecurityPriceDtl]):
         affected = pg_db_conn_manager.execute_query(insert_sql, params)
         if affected == 0:
             raise RuntimeError("Failed to save security price")
+        self.advance_latest([price.security_id], price.price_date)
+        price_series_store.apply_upserts([price])
         return price
 
     # Bulk save multiple inputs
@@ -211,8 +349,7 @@ class SecurityPriceCRUD(BaseCRUD[SecurityPriceDtl]):
         now = date_utils.get_current_date_time()
         values = []
         
-        for item in items:
-            price_id = date_utils.get_timestamp_with_microseconds()
+        for item, price_id in zip(items, date_utils.get_timestamp_ids(len(items))):
             values.append((
                 price_id,
                 item.security_id,
@@ -261,8 +398,13 @@ class SecurityPriceCRUD(BaseCRUD[SecurityPriceDtl]):
                         cursor, upsert_sql, values, template=None, page_size=100
                     )
                     affected_rows = cursor.rowcount
+                    # Same transaction, so the latest-price table never lags committed prices
+                    cursor.execute(_ADVANCE_LATEST_SQL, (list({i.security_id for i in items}),
+                                                         min(i.price_date for i in items)))
                     conn.commit()
-                    
+            # Keep cached price series current without reloading them
+            price_series_store.apply_upserts(items)
+
             return {
                 "inserted": affected_rows,  # PostgreSQL doesn't distinguish insert vs update in upsert
                 "updated": 0,  # Would need additional query to get exact counts
@@ -327,13 +469,20 @@ class SecurityPriceCRUD(BaseCRUD[SecurityPriceDtl]):
         affected = pg_db_conn_manager.execute_query(sql, params)
         if affected == 0:
             raise KeyError("Security price not found")
+        # The row may have moved to another security or date; reload both series lazily
+        self.refresh_latest([existing.security_id, item.security_id])
+        price_series_store.invalidate(existing.security_id, item.security_id)
         return self.get_security(pk)
 
     def delete(self, pk: int) -> bool:
+        existing = self.get_security(pk)
         affected = pg_db_conn_manager.execute_query(
             "DELETE FROM security_price_dtl WHERE security_price_id = %s",
             (pk,),
         )
+        if affected > 0 and existing:
+            self.refresh_latest([existing.security_id])
+            price_series_store.invalidate(existing.security_id)
         return affected > 0
 
 # Keep a singleton instance for importers (routes)
@@ -1,7 +1,5 @@
-import csv
-import io
 from datetime import date
-from datetime import datetime as dt, date as _date
+from datetime import datetime as dt
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
@@ -15,7 +13,10 @@ from source_code.crud.external_platform_crud_operations import external_platform
 from source_code.crud.portfolio_crud_operations import portfolio_crud
 from source_code.crud.security_crud_operations import security_crud
 from source_code.crud.transaction_crud_operations import transaction_crud
-from source_code.models.models import TransactionDtl, TransactionDtlInput, TransactionFullView, TransactionByNameInput
+from source_code.models.models import TransactionDtl, TransactionDtlInput, TransactionFullView, TransactionByNameInput, \
+    TransactionSummaryRow, PositionSeriesPoint, TransactionBulkDuplicateRequest
+from source_code.utils import columnar_io, csv_export, job_runner, transaction_csv_loader
+from source_code.utils.price_series_store import price_series_store
 
 router = APIRouter(prefix="/api/transactions", tags=["Transactions"])
 
@@ -27,8 +28,48 @@ def save_transaction(transaction: TransactionDtlInput):
 
 @router.get("", response_model=list[TransactionFullView])
 @router.get("/", response_model=list[TransactionFullView])
-def list_transactions_full():
-    return transaction_crud.list_full()
+def list_transactions_full(user_id: int | None = None, portfolio_id: int | None = None, security_id: int | None = None,
+                           external_platform_id: int | None = None, transaction_type: str | None = None,
+                           from_date: date | None = None, to_date: date | None = None):
+    try:
+        return transaction_crud.list_full(**_filters(locals()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _filters(args: dict) -> dict[str, Any]:
+    keys = ("user_id", "portfolio_id", "security_id", "external_platform_id", "transaction_type", "from_date", "to_date")
+    return {k: args[k] for k in keys if args.get(k) is not None}
+
+
+@router.get("/summary", response_model=list[TransactionSummaryRow])
+def summarize_transactions(group_by: str = "portfolio,security,platform,month,type",
+                           user_id: int | None = None, portfolio_id: int | None = None, security_id: int | None = None,
+                           external_platform_id: int | None = None, transaction_type: str | None = None,
+                           from_date: date | None = None, to_date: date | None = None):
+    """
+    Totals (count, qty, net qty, gross amount, fees, net amount) per requested dimension
+    plus a grand total, computed in SQL with the same filters as the listing.
+    group_by is a comma list of: portfolio, security, platform, month, type.
+    """
+    dims = [d.strip().lower() for d in group_by.split(",") if d.strip()]
+    try:
+        return transaction_crud.summarize(dims, **_filters(locals()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/position-series", response_model=list[PositionSeriesPoint])
+def get_position_series(portfolio_id: int, security_id: int, bucket: str = "day",
+                        from_date: date | None = None, to_date: date | None = None):
+    """
+    Cumulative quantity, invested amount and average cost of one holding over time,
+    one point per day/week/month bucket.
+    """
+    try:
+        return transaction_crud.position_series(portfolio_id, security_id, bucket.lower(), from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/form-data")
@@ -133,7 +174,6 @@ def get_performance_comparison(pair_id: str, from_date: date, to_date: date):
         duplicate_id = int(parts[1])
         
         # Get the transactions
-        all_transactions = transaction_crud.list_full()
         original = transaction_crud.get_transaction_by_id(original_id)
         duplicate = transaction_crud.get_transaction_by_id(duplicate_id)
 
@@ -143,21 +183,9 @@ def get_performance_comparison(pair_id: str, from_date: date, to_date: date):
         if not original or not duplicate:
             raise HTTPException(status_code=404, detail="Transaction pair not found")
         
-        # Import security price operations
-        from source_code.crud.security_price_crud_operations import security_price_crud
-        
-        # Get price data for both securities over the date range
-        original_prices = security_price_crud.list_by_date_range_and_ticker(
-            from_date=from_date, 
-            to_date=to_date, 
-            ticker=original.security_ticker
-        )
-        
-        duplicate_prices = security_price_crud.list_by_date_range_and_ticker(
-            from_date=from_date, 
-            to_date=to_date, 
-            ticker=duplicate.security_ticker
-        )
+        # Get price data for both securities over the date range (array slices from the in-memory store)
+        original_prices = price_series_store.get(original.security_id).slice(from_date, to_date)
+        duplicate_prices = price_series_store.get(duplicate.security_id).slice(from_date, to_date)
         
         # Calculate investment performance data
         original_performance = []
@@ -176,19 +204,19 @@ def get_performance_comparison(pair_id: str, from_date: date, to_date: date):
         # This ensures the graph shows performance for the selected date range rather than from first price date
         original_baseline_value = original.total_inv_amt
         
-        for price in original_prices:
+        for price_date, price in original_prices.iter_points():
             if original_transaction_price and original_qty and original_baseline_value:
                 # Current value of the investment
-                current_value = original_qty * price.price
+                current_value = original_qty * price
                 # Investment performance vs baseline value (not original investment amount)
                 performance = ((current_value - original_baseline_value) / original_baseline_value) * 100
                 # Unrealized gain/loss in dollars (vs original investment amount)
                 unrealized_gain_loss = current_value - original.total_inv_amt
                 
                 original_performance.append({
-                    "date": price.price_date.isoformat(),
+                    "date": price_date.isoformat(),
                     "performance": round(performance, 2),
-                    "price": price.price,
+                    "price": price,
                     "current_value": round(current_value, 2),
                     "unrealized_gain_loss": round(unrealized_gain_loss, 2),
                     "unrealized_gain_loss_pct": round(((current_value - original.total_inv_amt) / original.total_inv_amt) * 100, 2)
@@ -198,19 +226,19 @@ def get_performance_comparison(pair_id: str, from_date: date, to_date: date):
         # This ensures consistent baseline logic for both original and duplicate transactions
         duplicate_baseline_value = duplicate.total_inv_amt
         
-        for price in duplicate_prices:
+        for price_date, price in duplicate_prices.iter_points():
             if duplicate_transaction_price and duplicate_qty and duplicate_baseline_value:
                 # Current value of the investment
-                current_value = duplicate_qty * price.price
+                current_value = duplicate_qty * price
                 # Investment performance vs baseline value (not original investment amount)
                 performance = ((current_value - duplicate_baseline_value) / duplicate_baseline_value) * 100
                 # Unrealized gain/loss in dollars (vs original investment amount)
                 unrealized_gain_loss = current_value - duplicate.total_inv_amt
                 
                 duplicate_performance.append({
-                    "date": price.price_date.isoformat(),
+                    "date": price_date.isoformat(),
                     "performance": round(performance, 2),
-                    "price": price.price,
+                    "price": price,
                     "current_value": round(current_value, 2),
                     "unrealized_gain_loss": round(unrealized_gain_loss, 2),
                     "unrealized_gain_loss_pct": round(((current_value - duplicate.total_inv_amt) / duplicate.total_inv_amt) * 100, 2)
@@ -282,6 +310,47 @@ def save_transactions_bulk(txns: list[TransactionDtlInput]):
     return transaction_crud.save_many(txns)
 
 
+@router.post("/bulk-duplicate")
+def duplicate_transactions_bulk(req: TransactionBulkDuplicateRequest) -> dict[str, Any]:
+    """
+    Duplicate many transactions at once as linked copies (rel_transaction_id), e.g. to
+    compare a whole portfolio against an alternative instrument.
+    Returns {"created": [...], "skipped": [{"transaction_id", "reason"}]}.
+    """
+    if not req.transaction_ids:
+        raise HTTPException(status_code=400, detail="transaction_ids is required")
+    try:
+        return transaction_crud.bulk_duplicate(req)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/export.csv")
+def export_transactions_csv(gzip: bool = False) -> Response:
+    """Stream all transactions as CSV straight from COPY; gzip=true downloads transactions.csv.gz."""
+    return csv_export.stream_csv(
+        "SELECT transaction_id, portfolio_id, security_id, external_platform_id, transaction_date, "
+        "transaction_type, transaction_qty, transaction_price, transaction_fee, transaction_fee_percent, "
+        "carry_fee, carry_fee_percent, management_fee, management_fee_percent, external_manager_fee, "
+        "external_manager_fee_percent, total_inv_amt, created_ts, last_updated_ts "
+        "FROM transaction_dtl ORDER BY transaction_id",
+        "transactions.csv", gzip,
+    )
+
+
+# Parquet / Arrow IPC export endpoints
+@router.get("/export.parquet")
+def export_transactions_parquet() -> Response:
+    """Stream all transactions as a typed Parquet file (zstd, one row group per database batch)."""
+    return columnar_io.export_response("transactions", "parquet")
+
+
+@router.get("/export.arrow")
+def export_transactions_arrow() -> Response:
+    """Stream all transactions as an Arrow IPC stream (one record batch per database batch)."""
+    return columnar_io.export_response("transactions", "arrow")
+
+
 @router.get("/{transaction_id}", response_model=TransactionDtl)
 def get_transaction(transaction_id: int):
     t = transaction_crud.get_transaction(transaction_id)
@@ -309,107 +378,48 @@ def delete_transaction(transaction_id: int):
 
 
 # Expected headers (case-insensitive): portfolio_id, security_id, external_platform_id, transaction_date, transaction_type, transaction_qty, transaction_price, [total_inv_amt], [fees...]
-@router.post("/bulk-csv", response_model=list[TransactionDtl])
-async def upload_transactions_csv(file: UploadFile = File(...)):
+# Streams the upload and commits in chunks; returns an import summary (counts + first errors)
+@router.post("/bulk-csv")
+def upload_transactions_csv(response: Response, file: UploadFile = File(...),
+                            chunk_size: int = transaction_csv_loader.DEFAULT_CHUNK_SIZE,
+                            background: bool = False) -> dict[str, Any]:
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Please upload a CSV file")
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="Empty file")
-    text = content.decode("utf-8-sig")
-    reader = csv.DictReader(io.StringIO(text))
-    headers = [h.strip().lower() for h in (reader.fieldnames or [])]
-    required = {"portfolio_id", "security_id", "external_platform_id", "transaction_date", "transaction_type",
-                "transaction_qty", "transaction_price"}
-    missing = required - set(headers)
-    if missing:
-        raise HTTPException(status_code=400, detail=f"Missing required CSV headers: {', '.join(sorted(missing))}")
-    items: list[TransactionDtlInput] = []
-    row_num = 1
-    from datetime import datetime as dt, date
-    for row in reader:
-        row_num += 1
-
-        def get_val(k: str) -> str:
-            return (row.get(k) or row.get(k.upper()) or row.get(k.title()) or "").strip()
-
-        try:
-            portfolio_id = int(get_val("portfolio_id"))
-            security_id = int(get_val("security_id"))
-            external_platform_id = int(get_val("external_platform_id"))
-            qty = float(get_val("transaction_qty"))
-            price = float(get_val("transaction_price"))
-            tdate_str = get_val("transaction_date")
-            tdate = dt.strptime(tdate_str, "%Y-%m-%d").date() if tdate_str else date.today()
-            ttype = get_val("transaction_type")
-            if not ttype:
-                raise ValueError("transaction_type required")
-
-            # Optional fees
-            def fnum(k, default=0.0):
-                v = get_val(k)
-                return float(v) if v else default
-
-            # Optional total investment amount
-            total_inv_amt_val = get_val("total_inv_amt")
-            total_inv_amt = float(total_inv_amt_val) if total_inv_amt_val else (qty * price)
-
-            items.append(TransactionDtlInput(
-                portfolio_id=portfolio_id,
-                security_id=security_id,
-                external_platform_id=external_platform_id,
-                transaction_date=tdate,
-                transaction_type=ttype,
-                transaction_qty=qty,
-                transaction_price=price,
-                transaction_fee=fnum("transaction_fee"),
-                transaction_fee_percent=fnum("transaction_fee_percent"),
-                carry_fee=fnum("carry_fee"),
-                carry_fee_percent=fnum("carry_fee_percent"),
-                management_fee=fnum("management_fee"),
-                management_fee_percent=fnum("management_fee_percent"),
-                external_manager_fee=fnum("external_manager_fee"),
-                external_manager_fee_percent=fnum("external_manager_fee_percent"),
-                total_inv_amt=total_inv_amt,
-            ))
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Row {row_num}: invalid value(s)")
-    if not items:
-        return []
-    return transaction_crud.save_many(items)
-
-
-@router.get("/export.csv")
-def export_transactions_csv() -> Response:
-    items = transaction_crud.list_all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-    header = [
-        "transaction_id", "portfolio_id", "security_id", "external_platform_id", "transaction_date", "transaction_type",
-        "transaction_qty", "transaction_price", "transaction_fee", "transaction_fee_percent", "carry_fee",
-        "carry_fee_percent",
-        "management_fee", "management_fee_percent", "external_manager_fee", "external_manager_fee_percent",
-        "total_inv_amt",
-        "created_ts", "last_updated_ts"
-    ]
-    writer.writerow(header)
-    for t in items:
-        writer.writerow([
-            getattr(t, "transaction_id", ""), getattr(t, "portfolio_id", ""), getattr(t, "security_id", ""),
-            getattr(t, "external_platform_id", ""),
-            getattr(t, "transaction_date", ""), getattr(t, "transaction_type", ""), getattr(t, "transaction_qty", ""),
-            getattr(t, "transaction_price", ""),
-            getattr(t, "transaction_fee", ""), getattr(t, "transaction_fee_percent", ""), getattr(t, "carry_fee", ""),
-            getattr(t, "carry_fee_percent", ""),
-            getattr(t, "management_fee", ""), getattr(t, "management_fee_percent", ""),
-            getattr(t, "external_manager_fee", ""), getattr(t, "external_manager_fee_percent", ""),
-            getattr(t, "total_inv_amt", ""),
-            getattr(t, "created_ts", ""), getattr(t, "last_updated_ts", ""),
-        ])
-    csv_data = output.getvalue()
-    output.close()
-    return Response(content=csv_data, media_type="text/csv",
-                    headers={"Content-Disposition": 'attachment; filename="transactions.csv"'})
+    return _run_csv_import(response, file, transaction_csv_loader.load_transactions_from_stream,
+                           "transactions_csv_import", chunk_size, background)
+
+
+# Same streaming pipeline for a Parquet file with the by-id columns (e.g. one from /export.parquet)
+@router.post("/upload.parquet")
+def upload_transactions_parquet(response: Response, file: UploadFile = File(...),
+                                chunk_size: int = transaction_csv_loader.DEFAULT_CHUNK_SIZE,
+                                background: bool = False) -> dict[str, Any]:
+    # Checked up front: the import may run as a background job
+    columnar_io.require_parquet_upload(file)
+    return _run_csv_import(response, file, transaction_csv_loader.load_transactions_from_parquet,
+                           "transactions_parquet_import", chunk_size, background, suffix=".parquet")
+
+
+def _run_csv_import(response: Response, file: UploadFile, loader, job_type: str, chunk_size: int, background: bool,
+                    suffix: str = ".csv") -> dict[str, Any]:
+    if background:
+        # Spool the upload so the job can read it after this request closes the UploadFile
+        path = job_runner.spool_upload(file.file, suffix=suffix)
+
+        def run(progress):
+            with open(path, "rb") as f:
+                return loader(f, chunk_size=chunk_size, progress=progress)
+
+        job = job_runner.submit_job(job_type, run, params={"filename": file.filename, "chunk_size": chunk_size},
+                                    cleanup=job_runner.remove_file(path))
+        response.status_code = 202
+        return job_runner.accepted(job)
+    try:
+        return loader(file.file, chunk_size=chunk_size)
+    except transaction_csv_loader.CsvHeaderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Unable to decode file. Use UTF-8 encoded CSV.")
 
 
 @router.post("/bulk-by-name")
@@ -422,7 +432,7 @@ def save_transactions_bulk_by_name(items: list[TransactionByNameInput]) -> dict[
     security_map = {s.ticker.strip().lower(): s.security_id for s in security_crud.list_all()}
     platform_map = {e.name.strip().lower(): e.external_platform_id for e in external_platform_crud.list_all()}
 
-    loaded: list[TransactionDtl] = []
+    to_insert: list[TransactionDtlInput] = []
     excluded: list[dict[str, Any]] = []
 
     for it in items:
@@ -462,131 +472,45 @@ def save_transactions_bulk_by_name(items: list[TransactionByNameInput]) -> dict[
             external_manager_fee=it.external_manager_fee,
             external_manager_fee_percent=it.external_manager_fee_percent,
         )
-        loaded.append(transaction_crud.save(tx_input))
+        to_insert.append(tx_input)
 
-    return {"loaded": loaded, "excluded": excluded}
+    loaded = transaction_crud.insert_many(to_insert)
+    # Rows already imported earlier (same content hash) are skipped rather than duplicated
+    return {"loaded": loaded, "excluded": excluded, "skipped": len(to_insert) - len(loaded)}
 
 
 # New: Upload CSV using names (portfolio_name, security_ticker, external_platform_name)
+# Streams the upload and commits in chunks; returns an import summary (counts + first errors)
 @router.post("/bulk-by-name-csv")
-async def upload_transactions_by_name_csv(file: UploadFile = File(...)) -> dict[str, Any]:
+def upload_transactions_by_name_csv(response: Response, file: UploadFile = File(...),
+                                    chunk_size: int = transaction_csv_loader.DEFAULT_CHUNK_SIZE,
+                                    background: bool = False) -> dict[str, Any]:
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Please upload a CSV file")
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="Empty file")
-
-    text = content.decode("utf-8-sig")
-    reader = csv.DictReader(io.StringIO(text))
-    headers = [h.strip().lower() for h in (reader.fieldnames or [])]
-    required = {
-        "portfolio_name", "security_ticker", "external_platform_name",
-        "transaction_date", "transaction_type", "transaction_qty", "transaction_price"
-    }
-    missing = required - set(headers)
-    if missing:
-        raise HTTPException(status_code=400, detail=f"Missing required CSV headers: {', '.join(sorted(missing))}")
-
-    # Build lookup maps (case-insensitive)
-    portfolio_map = {p.name.strip().lower(): p.portfolio_id for p in portfolio_crud.list_all()}
-    security_map = {s.ticker.strip().lower(): s.security_id for s in security_crud.list_all()}
-    platform_map = {e.name.strip().lower(): e.external_platform_id for e in external_platform_crud.list_all()}
-
-    loaded: list[TransactionDtl] = []
-    excluded: list[dict[str, Any]] = []
-
-    row_num = 1
-    for row in reader:
-        row_num += 1
-
-        def get_val(k: str) -> str:
-            return (row.get(k) or row.get(k.upper()) or row.get(k.title()) or "").strip()
-
-        def fnum(k: str, default=0.0) -> float:
-            v = get_val(k)
-            return float(v) if v else default
-
-        try:
-            portfolio_name = get_val("portfolio_name")
-            security_ticker = get_val("security_ticker")
-            external_platform_name = get_val("external_platform_name")
-            ttype = get_val("transaction_type")
-            if not (portfolio_name and security_ticker and external_platform_name and ttype):
-                raise ValueError("Missing required fields")
-
-            qty = float(get_val("transaction_qty"))
-            price = float(get_val("transaction_price"))
-            tdate_str = get_val("transaction_date")
-            tdate = dt.strptime(tdate_str, "%Y-%m-%d").date() if tdate_str else _date.today()
-        except ValueError:
-            excluded.append({
-                "input": {k: row.get(k) for k in row.keys()},
-                "reason": f"Row {row_num}: invalid or missing required value(s)"
-            })
-            continue
-
-        reasons: list[str] = []
-        pid = portfolio_map.get(portfolio_name.strip().lower())
-        if pid is None:
-            reasons.append("portfolio not found")
-        sid = security_map.get(security_ticker.strip().lower())
-        if sid is None:
-            reasons.append("security not found")
-        eid = platform_map.get(external_platform_name.strip().lower())
-        if eid is None:
-            reasons.append("external platform not found")
-
-        if reasons:
-            excluded.append({
-                "input": {
-                    "portfolio_name": portfolio_name,
-                    "security_ticker": security_ticker,
-                    "external_platform_name": external_platform_name,
-                    "transaction_date": tdate.isoformat(),
-                    "transaction_type": ttype,
-                    "transaction_qty": qty,
-                    "transaction_price": price,
-                    "transaction_fee": fnum("transaction_fee"),
-                    "transaction_fee_percent": fnum("transaction_fee_percent"),
-                    "carry_fee": fnum("carry_fee"),
-                    "carry_fee_percent": fnum("carry_fee_percent"),
-                    "management_fee": fnum("management_fee"),
-                    "management_fee_percent": fnum("management_fee_percent"),
-                    "external_manager_fee": fnum("external_manager_fee"),
-                    "external_manager_fee_percent": fnum("external_manager_fee_percent"),
-                },
-                "reason": ", ".join(reasons),
-            })
-            continue
-
-        tx_input = TransactionDtlInput(
-            portfolio_id=pid,
-            security_id=sid,
-            external_platform_id=eid,
-            transaction_date=tdate,
-            transaction_type=ttype,
-            transaction_qty=qty,
-            transaction_price=price,
-            transaction_fee=fnum("transaction_fee"),
-            transaction_fee_percent=fnum("transaction_fee_percent"),
-            carry_fee=fnum("carry_fee"),
-            carry_fee_percent=fnum("carry_fee_percent"),
-            management_fee=fnum("management_fee"),
-            management_fee_percent=fnum("management_fee_percent"),
-            external_manager_fee=fnum("external_manager_fee"),
-            external_manager_fee_percent=fnum("external_manager_fee_percent"),
-        )
-        loaded.append(transaction_crud.save(tx_input))
-
-    return {"loaded": loaded, "excluded": excluded}
+    return _run_csv_import(response, file, transaction_csv_loader.load_transactions_by_name_from_stream,
+                           "transactions_by_name_csv_import", chunk_size, background)
 
 
 # Recalculate fees based on percent fields for all transactions
 @router.post("/recalculate-fees")
-def recalculate_fees() -> dict[str, int]:
+def recalculate_fees(response: Response, chunk_size: int = 5000, changed_since: dt | None = None,
+                     full: bool = False, background: bool = False) -> dict[str, Any]:
+    """
+    Recalculate fees in primary-key chunks, rewriting only rows whose fees changed.
+    `changed_since` limits the pass to rows updated at or after that timestamp; by default
+    the pass covers rows updated since the last clean run, and `full` scans every row.
+    Ranges that failed are listed in failed_chunks.
+    """
+    if background:
+        job = job_runner.submit_job(
+            "transactions_recalculate_fees",
+            lambda progress: transaction_crud.recalculate_fees_all(chunk_size, changed_since, progress, full=full),
+            params={"chunk_size": chunk_size, "changed_since": changed_since, "full": full},
+        )
+        response.status_code = 202
+        return job_runner.accepted(job)
     try:
-        updated = transaction_crud.recalculate_fees_all()
-        return {"updated": int(updated)}
+        return transaction_crud.recalculate_fees_all(chunk_size, changed_since, full=full)
     except Exception as e:
         # surface a 500 with error message
         raise HTTPException(status_code=500, detail=str(e))
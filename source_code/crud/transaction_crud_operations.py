@@ -1,9 +1,13 @@
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from source_code.config import pg_db_conn_manager
 from source_code.crud.base import BaseCRUD
-from source_code.models.models import TransactionDtl, TransactionDtlInput, TransactionFullView
+from source_code.models.models import TransactionDtl, TransactionDtlInput, TransactionFullView, TransactionSummaryRow, \
+    PositionSeriesPoint, TransactionBulkDuplicateRequest
 from source_code.utils import domain_utils as date_utils
+from source_code.utils.transaction_content_hash import content_hashes
+from source_code.utils.transaction_fee_calculator import apply_computed_amounts
 
 
 class TransactionCRUD(BaseCRUD[TransactionDtl]):
@@ -27,19 +31,193 @@ class TransactionCRUD(BaseCRUD[TransactionDtl]):
             return rev[u]
         raise ValueError("Invalid transaction_type; expected one of: " + ", ".join(list(TRANSACTION_TYPES.keys())))
 
+    def _build_transaction(self, item: TransactionDtlInput, transaction_id: int, now) -> TransactionDtl:
+        return TransactionDtl(
+            transaction_id=transaction_id,
+            portfolio_id=item.portfolio_id,
+            security_id=item.security_id,
+            external_platform_id=item.external_platform_id,
+            transaction_date=item.transaction_date,
+            transaction_type=self._normalize_type(item.transaction_type),
+            transaction_qty=item.transaction_qty,
+            transaction_price=item.transaction_price,
+            transaction_fee=item.transaction_fee,
+            transaction_fee_percent=item.transaction_fee_percent,
+            carry_fee=item.carry_fee,
+            carry_fee_percent=item.carry_fee_percent,
+            management_fee=item.management_fee,
+            management_fee_percent=item.management_fee_percent,
+            external_manager_fee=item.external_manager_fee,
+            external_manager_fee_percent=item.external_manager_fee_percent,
+            total_inv_amt=item.total_inv_amt if getattr(item, 'total_inv_amt', None) is not None else (item.transaction_qty * item.transaction_price),
+            rel_transaction_id=getattr(item, 'rel_transaction_id', None),
+            created_ts=now,
+            last_updated_ts=now,
+        )
+
+    @staticmethod
+    def _insert_params(txn: TransactionDtl) -> tuple:
+        return (
+            txn.transaction_id, txn.portfolio_id, txn.security_id, txn.external_platform_id, txn.transaction_date,
+            txn.transaction_type,
+            txn.transaction_qty, txn.transaction_price, txn.transaction_fee, txn.transaction_fee_percent,
+            txn.carry_fee, txn.carry_fee_percent, txn.management_fee, txn.management_fee_percent,
+            txn.external_manager_fee, txn.external_manager_fee_percent, txn.total_inv_amt, txn.rel_transaction_id, txn.created_ts, txn.last_updated_ts
+        )
+
     # Bulk save JSON array
     def save_many(self, items: List[TransactionDtlInput]) -> List[TransactionDtl]:
-        results: List[TransactionDtl] = []
-        for it in items:
-            results.append(self.save(it))
-        return results
+        # Entered transactions, like single saves: a repeat of an earlier buy is a new trade,
+        # so no content hash and nothing is skipped
+        return self.insert_many(items, dedupe=False)
+
+    def insert_many(
+            self,
+            items: List[TransactionDtlInput],
+            occurrences: Optional[Dict[str, int]] = None,
+            dedupe: bool = True,
+    ) -> List[TransactionDtl]:
+        """
+        Insert a batch of transactions with a single multi-row INSERT and one commit.
+        Ids are allocated as one consecutive block. For file imports (dedupe) each row
+        carries a content hash; rows whose hash already exists are skipped (one lookup
+        per batch, plus ON CONFLICT for concurrent imports), so re-imports are idempotent.
+        Without dedupe content_hash stays NULL and every row is inserted.
+        Returns only the inserted transactions. Raises on failure so callers
+        (e.g. the CSV import pipeline) can record the failed chunk.
+        """
+        if not items:
+            return []
+        now = date_utils.get_current_date_time()
+        ids = date_utils.get_timestamp_ids(len(items))
+        txns = [self._build_transaction(it, tid, now) for it, tid in zip(apply_computed_amounts(items), ids)]
+        if dedupe:
+            txns = self._skip_imported(txns, occurrences)
+        if not txns:
+            return []
+        sql = """
+        INSERT INTO transaction_dtl (
+            transaction_id, portfolio_id, security_id, external_platform_id, transaction_date, transaction_type,
+            transaction_qty, transaction_price, transaction_fee, transaction_fee_percent,
+            carry_fee, carry_fee_percent, management_fee, management_fee_percent,
+            external_manager_fee, external_manager_fee_percent, total_inv_amt, rel_transaction_id, created_ts, last_updated_ts,
+            content_hash
+        ) VALUES %s
+        ON CONFLICT (content_hash) DO NOTHING
+        RETURNING transaction_id
+        """
+        rows = pg_db_conn_manager.execute_values(
+            sql, [self._insert_params(t) + (t.content_hash,) for t in txns], fetch=True
+        )
+        inserted_ids = {row["transaction_id"] for row in rows}
+        return [t for t in txns if t.transaction_id in inserted_ids]
+
+    @staticmethod
+    def _skip_imported(txns: List[TransactionDtl], occurrences: Optional[Dict[str, int]]) -> List[TransactionDtl]:
+        """Set each row's content hash and drop rows an earlier import already stored."""
+        for txn, content_hash in zip(txns, content_hashes(txns, occurrences)):
+            txn.content_hash = content_hash
+        existing = {
+            row.get("content_hash")
+            for row in pg_db_conn_manager.fetch_data(
+                "SELECT content_hash FROM transaction_dtl WHERE content_hash = ANY(%s)",
+                ([t.content_hash for t in txns],),
+            )
+        }
+        return [t for t in txns if t.content_hash not in existing]
 
-    def list_full(self) -> List[TransactionFullView]:
+    @staticmethod
+    def _full_view_filters(
+        user_id: Optional[int] = None,
+        portfolio_id: Optional[int] = None,
+        security_id: Optional[int] = None,
+        external_platform_id: Optional[int] = None,
+        transaction_type: Optional[str] = None,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ) -> Tuple[str, list]:
+        """WHERE clause and params over v_transaction_full shared by the listing and the summary."""
+        conditions = []
+        params: list = []
+        for column, value in (
+            ("user_id", user_id),
+            ("portfolio_id", portfolio_id),
+            ("security_id", security_id),
+            ("external_platform_id", external_platform_id),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = %s")
+                params.append(value)
+        if transaction_type:
+            conditions.append("transaction_type = %s")
+            params.append(TransactionCRUD._normalize_type(transaction_type))
+        if from_date is not None:
+            conditions.append("transaction_date >= %s")
+            params.append(from_date)
+        if to_date is not None:
+            conditions.append("transaction_date <= %s")
+            params.append(to_date)
+        where_clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        return where_clause, params
+
+    def list_full(self, **filters) -> List[TransactionFullView]:
+        where_clause, params = self._full_view_filters(**filters)
         rows = pg_db_conn_manager.fetch_data(
-            "SELECT * FROM v_transaction_full ORDER BY transaction_id"
+            f"SELECT * FROM v_transaction_full {where_clause} ORDER BY transaction_id",
+            tuple(params) if params else None,
         )
         return [TransactionFullView(**row) for row in rows]
 
+    # Summary dimension -> columns grouped together (id + display name)
+    SUMMARY_DIMENSIONS = {
+        "portfolio": ("portfolio_id", "portfolio_name"),
+        "security": ("security_id", "security_ticker"),
+        "platform": ("external_platform_id", "external_platform_name"),
+        "month": ("month",),
+        "type": ("transaction_type",),
+    }
+
+    def summarize(self, group_by: List[str], **filters) -> List[TransactionSummaryRow]:
+        """
+        Aggregate v_transaction_full in one query with GROUPING SETS: one rollup level
+        per requested dimension plus a grand total row (level "total").
+        """
+        unknown = [d for d in group_by if d not in self.SUMMARY_DIMENSIONS]
+        if unknown:
+            raise ValueError("Invalid group_by; expected any of: " + ", ".join(self.SUMMARY_DIMENSIONS))
+        where_clause, params = self._full_view_filters(**filters)
+        all_columns = [c for cols in self.SUMMARY_DIMENSIONS.values() for c in cols]
+        grouping_sets = ", ".join(f"({', '.join(self.SUMMARY_DIMENSIONS[d])})" for d in group_by)
+        grouping_sets = f"{grouping_sets}, ()" if grouping_sets else "()"
+        grouping_flags = ", ".join(
+            f"GROUPING({cols[0]}) AS g_{dim}" for dim, cols in self.SUMMARY_DIMENSIONS.items() if dim in group_by
+        )
+        sql = (
+            f"SELECT {', '.join(all_columns)},\n"
+            + (f"  {grouping_flags},\n" if grouping_flags else "")
+            + "  COUNT(*) AS transaction_count,\n"
+            "  COALESCE(SUM(transaction_qty), 0) AS total_qty,\n"
+            "  COALESCE(SUM(CASE WHEN transaction_type = 'S' THEN -transaction_qty ELSE transaction_qty END), 0) AS net_qty,\n"
+            "  COALESCE(SUM(gross_amount), 0) AS gross_amount,\n"
+            "  COALESCE(SUM(total_fee), 0) AS total_fee,\n"
+            "  COALESCE(SUM(net_amount), 0) AS net_amount\n"
+            "FROM (\n"
+            "  SELECT v.*, date_trunc('month', v.transaction_date)::date AS month\n"
+            f"  FROM v_transaction_full v {where_clause}\n"
+            ") t\n"
+            f"GROUP BY GROUPING SETS ({grouping_sets})\n"
+            f"ORDER BY {', '.join(all_columns)}"
+        )
+        rows = pg_db_conn_manager.fetch_data(sql, tuple(params) if params else None)
+        result = []
+        for row in rows:
+            level = next((d for d in group_by if row.get(f"g_{d}") == 0), "total")
+            result.append(TransactionSummaryRow(level=level, **{k: v for k, v in row.items() if not k.startswith("g_")}))
+        # Rollup levels in requested order, grand total last
+        order = {d: i for i, d in enumerate(group_by)}
+        result.sort(key=lambda r: order.get(r.level, len(order)))
+        return result
+
     def get_transaction_by_id(self, transaction_id) -> TransactionFullView:
         params = (transaction_id,)
         rows = pg_db_conn_manager.fetch_data(
@@ -55,37 +233,16 @@ class TransactionCRUD(BaseCRUD[TransactionDtl]):
         rows = pg_db_conn_manager.fetch_data(
             "SELECT transaction_id, portfolio_id, security_id, external_platform_id, transaction_date, transaction_type, "
             "transaction_qty, transaction_price, transaction_fee, transaction_fee_percent, carry_fee, carry_fee_percent, "
-            "management_fee, management_fee_percent, external_manager_fee, external_manager_fee_percent, total_inv_amt, rel_transaction_id, created_ts, last_updated_ts "
+            "management_fee, management_fee_percent, external_manager_fee, external_manager_fee_percent, total_inv_amt, rel_transaction_id, created_ts, last_updated_ts, content_hash "
             "FROM transaction_dtl ORDER BY transaction_id"
         )
         return [TransactionDtl(**row) for row in rows]
 
     def save(self, item: TransactionDtlInput) -> TransactionDtl:
         # Generate server-side ID and timestamps
-        next_id = date_utils.get_timestamp_with_microseconds()
+        next_id = date_utils.get_timestamp_ids(1)[0]
         now = date_utils.get_current_date_time()
-        txn = TransactionDtl(
-            transaction_id=next_id,
-            portfolio_id=item.portfolio_id,
-            security_id=item.security_id,
-            external_platform_id=item.external_platform_id,
-            transaction_date=item.transaction_date,
-            transaction_type=self._normalize_type(item.transaction_type),
-            transaction_qty=item.transaction_qty,
-            transaction_price=item.transaction_price,
-            transaction_fee=item.transaction_fee,
-            transaction_fee_percent=item.transaction_fee_percent,
-            carry_fee=item.carry_fee,
-            carry_fee_percent=item.carry_fee_percent,
-            management_fee=item.management_fee,
-            management_fee_percent=item.management_fee_percent,
-            external_manager_fee=item.external_manager_fee,
-            external_manager_fee_percent=item.external_manager_fee_percent,
-            total_inv_amt=item.total_inv_amt if getattr(item, 'total_inv_amt', None) is not None else (item.transaction_qty * item.transaction_price),
-            rel_transaction_id=getattr(item, 'rel_transaction_id', None),
-            created_ts=now,
-            last_updated_ts=now,
-        )
+        txn = self._build_transaction(apply_computed_amounts([item])[0], next_id, now)
         sql = """
         INSERT INTO transaction_dtl (
             transaction_id, portfolio_id, security_id, external_platform_id, transaction_date, transaction_type,
@@ -118,13 +275,7 @@ class TransactionCRUD(BaseCRUD[TransactionDtl]):
             rel_transaction_id = EXCLUDED.rel_transaction_id,
             last_updated_ts = EXCLUDED.last_updated_ts
         """
-        params = (
-            txn.transaction_id, txn.portfolio_id, txn.security_id, txn.external_platform_id, txn.transaction_date,
-            txn.transaction_type,
-            txn.transaction_qty, txn.transaction_price, txn.transaction_fee, txn.transaction_fee_percent,
-            txn.carry_fee, txn.carry_fee_percent, txn.management_fee, txn.management_fee_percent,
-            txn.external_manager_fee, txn.external_manager_fee_percent, txn.total_inv_amt, txn.rel_transaction_id, txn.created_ts, txn.last_updated_ts
-        )
+        params = self._insert_params(txn)
         affected = pg_db_conn_manager.execute_query(sql, params)
         if affected == 0:
             raise RuntimeError("Failed to save transaction")
@@ -135,7 +286,7 @@ class TransactionCRUD(BaseCRUD[TransactionDtl]):
             "SELECT transaction_id, portfolio_id, security_id, external_platform_id, transaction_date, transaction_type, "
             "transaction_qty, transaction_price, transaction_fee, transaction_fee_percent, "
             "carry_fee, carry_fee_percent, management_fee, management_fee_percent, "
-            "external_manager_fee, external_manager_fee_percent, total_inv_amt, rel_transaction_id, created_ts, last_updated_ts "
+            "external_manager_fee, external_manager_fee_percent, total_inv_amt, rel_transaction_id, created_ts, last_updated_ts, content_hash "
             "FROM transaction_dtl WHERE transaction_id = %s",
             (pk,),
         )
@@ -152,6 +303,7 @@ class TransactionCRUD(BaseCRUD[TransactionDtl]):
         existing = self.get_security(pk)
         if not existing:
             raise KeyError("Transaction not found")
+        item = apply_computed_amounts([item])[0]
         now = date_utils.get_current_date_time()
         sql = """
         UPDATE transaction_dtl
@@ -210,25 +362,228 @@ class TransactionCRUD(BaseCRUD[TransactionDtl]):
         )
         return affected > 0
 
-    def recalculate_fees_all(self) -> int:
+    def bulk_duplicate(self, req: TransactionBulkDuplicateRequest) -> Dict[str, Any]:
         """
-        Recalculate transaction_fee and external_manager_fee for all transactions
-        based on their corresponding percent fields applied to the transaction amount.
-        The transaction amount is total_inv_amt if present, otherwise qty * price.
-        Returns the number of rows updated.
+        Create linked copies (rel_transaction_id = source id) of many transactions in one
+        set-based INSERT ... SELECT ... RETURNING. Portfolio, security, platform and price
+        can be overridden for all copies. When the price changes, the copy keeps the source
+        amount and its quantity becomes round(amount / price, 2); fees are reset to 0.
+        Sources with no usable price for the target security are reported as skipped.
         """
-        sql = (
+        source_ids = list(dict.fromkeys(req.transaction_ids))
+        if not source_ids:
+            return {"created": [], "skipped": []}
+        now = date_utils.get_current_date_time()
+        params = {
+            "source_ids": source_ids,
+            "new_ids": date_utils.get_timestamp_ids(len(source_ids)),
+            "portfolio_id": req.portfolio_id,
+            "security_id": req.security_id,
+            "external_platform_id": req.external_platform_id,
+            "price": req.transaction_price,
+            "now": now,
+        }
+        sql = """
+        WITH src AS (
+            SELECT ids.new_id, t.*,
+                   COALESCE(NULLIF(t.total_inv_amt, 0), t.transaction_qty * t.transaction_price) AS amount,
+                   COALESCE(%(security_id)s::bigint, t.security_id) AS target_security_id
+            FROM unnest(%(source_ids)s::bigint[], %(new_ids)s::bigint[]) AS ids(source_id, new_id)
+            JOIN transaction_dtl t ON t.transaction_id = ids.source_id
+        ), priced AS (
+            SELECT s.*,
+                   COALESCE(%(price)s::double precision,
+                            CASE WHEN s.target_security_id = s.security_id THEN s.transaction_price ELSE px.price END) AS new_price
+            FROM src s
+            LEFT JOIN LATERAL (
+                SELECT p.price FROM security_price_dtl p
+                WHERE p.security_id = s.target_security_id AND p.price_date <= s.transaction_date
+                ORDER BY p.price_date DESC LIMIT 1
+            ) px ON TRUE
+        )
+        INSERT INTO transaction_dtl (
+            transaction_id, portfolio_id, security_id, external_platform_id, transaction_date, transaction_type,
+            transaction_qty, transaction_price, transaction_fee, transaction_fee_percent,
+            carry_fee, carry_fee_percent, management_fee, management_fee_percent,
+            external_manager_fee, external_manager_fee_percent, total_inv_amt, rel_transaction_id, created_ts, last_updated_ts
+        )
+        SELECT new_id, COALESCE(%(portfolio_id)s::bigint, portfolio_id), target_security_id,
+               COALESCE(%(external_platform_id)s::bigint, external_platform_id), transaction_date, transaction_type,
+               CASE WHEN target_security_id = security_id AND new_price = transaction_price THEN transaction_qty
+                    ELSE ROUND((amount / new_price)::numeric, 2) END,
+               new_price, 0, 0, 0, 0, 0, 0, 0, 0, amount, transaction_id, %(now)s, %(now)s
+        FROM priced
+        WHERE new_price > 0
+        RETURNING transaction_id, portfolio_id, security_id, external_platform_id, transaction_date, transaction_type,
+                  transaction_qty, transaction_price, transaction_fee, transaction_fee_percent, carry_fee, carry_fee_percent,
+                  management_fee, management_fee_percent, external_manager_fee, external_manager_fee_percent, total_inv_amt,
+                  rel_transaction_id, created_ts, last_updated_ts
+        """
+        created = [TransactionDtl(**row) for row in pg_db_conn_manager.execute_returning(sql, params)]
+        copied = {t.rel_transaction_id for t in created}
+        skipped = [{"transaction_id": sid, "reason": "source not found or no price for target security"}
+                   for sid in source_ids if sid not in copied]
+        return {"created": created, "skipped": skipped}
+
+    # Bucket name -> SQL expression over transaction_date
+    POSITION_BUCKETS = {
+        "day": "transaction_date",
+        "week": "date_trunc('week', transaction_date)::date",
+        "month": "date_trunc('month', transaction_date)::date",
+    }
+
+    def position_series(
+        self,
+        portfolio_id: int,
+        security_id: int,
+        bucket: str = "day",
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ) -> List[PositionSeriesPoint]:
+        """
+        Running position for one (portfolio_id, security_id) computed with window functions:
+        cumulative signed quantity, cumulative signed invested amount (total_inv_amt, else
+        qty * price) and average cost (cumulative buy amount / cumulative buy quantity).
+        One point per bucket, taken at the bucket's last transaction. from_date only trims
+        the output; running totals always include earlier history.
+        """
+        if bucket not in self.POSITION_BUCKETS:
+            raise ValueError("Invalid bucket; expected one of: " + ", ".join(self.POSITION_BUCKETS))
+        params: list = [portfolio_id, security_id]
+        to_clause = ""
+        if to_date is not None:
+            to_clause = " AND transaction_date <= %s"
+            params.append(to_date)
+        from_clause = ""
+        if from_date is not None:
+            from_clause = "WHERE transaction_date >= %s"
+            params.append(from_date)
+        sql = f"""
+        WITH tx AS (
+            SELECT transaction_id, transaction_date,
+                   CASE WHEN transaction_type = 'S' THEN -1 ELSE 1 END AS sign,
+                   transaction_qty AS qty,
+                   COALESCE(NULLIF(total_inv_amt, 0), transaction_qty * transaction_price) AS amount
+            FROM transaction_dtl
+            WHERE portfolio_id = %s AND security_id = %s{to_clause}
+        ), running AS (
+            SELECT transaction_id, transaction_date,
+                   {self.POSITION_BUCKETS[bucket]} AS period_start,
+                   SUM(sign * qty) OVER w AS quantity,
+                   SUM(sign * amount) OVER w AS invested_amount,
+                   SUM(CASE WHEN sign > 0 THEN qty ELSE 0 END) OVER w AS buy_qty,
+                   SUM(CASE WHEN sign > 0 THEN amount ELSE 0 END) OVER w AS buy_amount
+            FROM tx
+            WINDOW w AS (ORDER BY transaction_date, transaction_id ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+        )
+        SELECT DISTINCT ON (period_start)
+               period_start, transaction_date AS as_of_date, quantity, invested_amount,
+               CASE WHEN buy_qty > 0 THEN buy_amount / buy_qty ELSE 0 END AS avg_cost
+        FROM running
+        {from_clause}
+        ORDER BY period_start, transaction_date DESC, transaction_id DESC
+        """
+        rows = pg_db_conn_manager.fetch_data(sql, tuple(params))
+        return [PositionSeriesPoint(**row) for row in rows]
+
+    # Same rules as transaction_fee_calculator: amount = total_inv_amt unless NULL/0 (then qty * price);
+    # a non-zero percent derives the fee, a zero percent keeps the entered flat fee
+    _AMOUNT_SQL = "COALESCE(NULLIF(total_inv_amt, 0), transaction_qty * transaction_price)"
+    _TXN_FEE_SQL = (
+        "CASE WHEN COALESCE(transaction_fee_percent, 0) <> 0 "
+        f"THEN ROUND(({_AMOUNT_SQL} * (transaction_fee_percent / 100.0))::numeric, 2) "
+        "ELSE transaction_fee END"
+    )
+    _EXT_FEE_SQL = (
+        "CASE WHEN COALESCE(external_manager_fee_percent, 0) <> 0 "
+        f"THEN ROUND(({_AMOUNT_SQL} * (external_manager_fee_percent / 100.0))::numeric, 2) "
+        "ELSE external_manager_fee END"
+    )
+
+    def get_fee_recalc_watermark(self) -> Optional[datetime]:
+        """Start time of the last fee recalculation that finished without failed chunks."""
+        rows = pg_db_conn_manager.fetch_data("SELECT last_success_ts FROM transaction_fee_recalc_state WHERE state_id = 1")
+        return rows[0]["last_success_ts"] if rows else None
+
+    def recalculate_fees_all(
+        self,
+        chunk_size: int = 5000,
+        changed_since: Optional[datetime] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        full: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Recalculate transaction_fee and external_manager_fee from their percent fields
+        applied to the transaction amount (total_inv_amt if present, otherwise qty * price).
+        New rows already get these amounts at ingest time; this brings older rows in line.
+
+        Walks the primary key in ranges of `chunk_size` rows; each range is one short
+        UPDATE/commit and only rewrites rows whose stored fees differ from the computed
+        ones. Only rows with last_updated_ts >= changed_since are considered; without
+        changed_since the start of the last clean run (transaction_fee_recalc_state) is
+        used, and `full` scans every row. A range whose UPDATE fails is recorded in
+        failed_chunks and the walk continues; if the next range cannot be read the walk
+        stops there. A default or full run without failed chunks stores its start time
+        as the next watermark.
+        Returns {"updated", "scanned", "chunks", "failed_chunks", "changed_since"}.
+        """
+        chunk_size = max(1, int(chunk_size))
+        started = date_utils.get_current_date_time()
+        advance_watermark = changed_since is None
+        if changed_since is None and not full:
+            changed_since = self.get_fee_recalc_watermark()
+        since_clause = " AND last_updated_ts >= %s" if changed_since is not None else ""
+        since_params: tuple = (changed_since,) if changed_since is not None else ()
+        bound_sql = (
+            "SELECT MAX(transaction_id) AS upper_id, COUNT(*) AS n FROM (\n"
+            "  SELECT transaction_id FROM transaction_dtl\n"
+            f"  WHERE transaction_id > %s{since_clause}\n"
+            "  ORDER BY transaction_id LIMIT %s\n"
+            ") s"
+        )
+        update_sql = (
             "UPDATE transaction_dtl\n"
             "SET\n"
-            "  transaction_fee = ROUND((COALESCE(total_inv_amt, transaction_qty * transaction_price) * (COALESCE(transaction_fee_percent, 0) / 100.0))::numeric, 2),\n"
-            "  external_manager_fee = ROUND((COALESCE(total_inv_amt, transaction_qty * transaction_price) * (COALESCE(external_manager_fee_percent, 0) / 100.0))::numeric, 2),\n"
+            f"  transaction_fee = {self._TXN_FEE_SQL},\n"
+            f"  external_manager_fee = {self._EXT_FEE_SQL},\n"
             "  last_updated_ts = %s\n"
-            ";"
+            f"WHERE transaction_id > %s AND transaction_id <= %s{since_clause}\n"
+            f"  AND (transaction_fee IS DISTINCT FROM {self._TXN_FEE_SQL}\n"
+            f"       OR external_manager_fee IS DISTINCT FROM {self._EXT_FEE_SQL})"
         )
-        now = date_utils.get_current_date_time()
-        # execute_query returns affected row count for UPDATE statements
-        affected = pg_db_conn_manager.execute_query(sql, (now,))
-        return affected
+        summary: Dict[str, Any] = {"updated": 0, "scanned": 0, "chunks": 0, "failed_chunks": [],
+                                   "changed_since": changed_since}
+        lower_id = -1
+        while True:
+            try:
+                rows = pg_db_conn_manager.execute_returning(bound_sql, (lower_id, *since_params, chunk_size))
+            except Exception as e:
+                # Without the next bound there is no range to continue from
+                summary["failed_chunks"].append({"after_id": lower_id, "through_id": None, "error": str(e)})
+                break
+            if not rows or not rows[0].get("n"):
+                break
+            upper_id = rows[0]["upper_id"]
+            now = date_utils.get_current_date_time()
+            try:
+                # One transaction per range, so locks are held for one range only
+                summary["updated"] += pg_db_conn_manager.execute_statements(
+                    [(update_sql, (now, lower_id, upper_id, *since_params))])
+            except Exception as e:
+                summary["failed_chunks"].append({"after_id": lower_id, "through_id": upper_id, "error": str(e)})
+            summary["scanned"] += int(rows[0]["n"])
+            summary["chunks"] += 1
+            if progress is not None:
+                progress(dict(summary))
+            lower_id = upper_id
+        if advance_watermark and not summary["failed_chunks"]:
+            pg_db_conn_manager.execute_statements([(
+                "INSERT INTO transaction_fee_recalc_state (state_id, last_success_ts, last_updated_ts) "
+                "VALUES (1, %s, %s) ON CONFLICT (state_id) DO UPDATE "
+                "SET last_success_ts = EXCLUDED.last_success_ts, last_updated_ts = EXCLUDED.last_updated_ts",
+                (started, date_utils.get_current_date_time()),
+            )])
+        return summary
 
 
 # Keep a singleton instance for importers (routes)
@@ -7,11 +7,12 @@ import os
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel, EmailStr
 
 from source_code.crud.user_crud_operations import user_crud
 from source_code.models.models import UserDtl, UserDtlInput
-from source_code.utils import auth_utils
+from source_code.utils import auth_utils, csv_export
 
 router = APIRouter(prefix="/users", tags=["Users"]) 
 # Also expose the same endpoints under /api/users for the front-end
@@ -157,27 +158,13 @@ async def upload_users_csv(file):
 # CSV export endpoint
 @router.get("/export.csv")
 @router_api.get("/export.csv")
-def export_users_csv():
-    import csv, io
-    from fastapi.responses import Response
-    items = user_crud.list_all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-    header = ["user_id", "first_name", "last_name", "email", "created_ts", "last_updated_ts"]
-    writer.writerow(header)
-    for u in items:
-        writer.writerow([
-            getattr(u, "user_id", ""),
-            getattr(u, "first_name", ""),
-            getattr(u, "last_name", ""),
-            getattr(u, "email", ""),
-            getattr(u, "created_ts", ""),
-            getattr(u, "last_updated_ts", ""),
-        ])
-    csv_data = output.getvalue()
-    output.close()
-    return Response(content=csv_data, media_type="text/csv",
-                    headers={"Content-Disposition": 'attachment; filename="users.csv"'})
+def export_users_csv(gzip: bool = False) -> Response:
+    """Stream all users as CSV straight from COPY; gzip=true downloads users.csv.gz."""
+    return csv_export.stream_csv(
+        "SELECT user_id, first_name, last_name, email, created_ts, last_updated_ts "
+        "FROM user_dtl ORDER BY user_id",
+        "users.csv", gzip,
+    )
 
 
 @router.get("/{user_id}", response_model=UserDtl)
@@ -20,7 +20,7 @@ class UserCRUD(BaseCRUD[UserDtl]):
 
     def save(self, item: UserDtlInput) -> UserDtl:
         # Generate ID and timestamps server-side.
-        next_id = date_utils.get_timestamp_with_microseconds()
+        next_id = date_utils.get_timestamp_ids(1)[0]
         now = date_utils.get_current_date_time()
         # We expect routes to pass hashed password in item.password if provided; map to password_hash
         password_hash = item.password if getattr(item, 'password', None) else None
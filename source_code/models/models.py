@@ -1,6 +1,6 @@
 # models.py
 from datetime import datetime, timezone, date
-from typing import Optional
+from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
@@ -105,6 +105,8 @@ class TransactionDtl(BaseModel):
     rel_transaction_id: Optional[int] = None
     created_ts: datetime = datetime.now(timezone.utc)
     last_updated_ts: datetime = datetime.now(timezone.utc)
+    # Set by bulk/CSV imports to skip rows already present on re-import; NULL for manual entries
+    content_hash: Optional[str] = None
 
 
 class TransactionDtlInput(BaseModel):
@@ -231,6 +233,46 @@ class TransactionFullView(BaseModel):
     last_updated_ts: datetime
 
 
+class TransactionSummaryRow(BaseModel):
+    # "portfolio" | "security" | "platform" | "month" | "type" | "total"
+    level: str
+    portfolio_id: Optional[int] = None
+    portfolio_name: Optional[str] = None
+    security_id: Optional[int] = None
+    security_ticker: Optional[str] = None
+    external_platform_id: Optional[int] = None
+    external_platform_name: Optional[str] = None
+    month: Optional[date] = None
+    transaction_type: Optional[str] = None
+    transaction_count: int = 0
+    total_qty: float = 0.0
+    net_qty: float = 0.0
+    gross_amount: float = 0.0
+    total_fee: float = 0.0
+    net_amount: float = 0.0
+
+
+class PositionSeriesPoint(BaseModel):
+    # First day of the bucket (the transaction date itself for "day")
+    period_start: date
+    # Date of the last transaction in the bucket; values are as of that transaction
+    as_of_date: date
+    quantity: float
+    invested_amount: float
+    avg_cost: float
+
+
+class TransactionBulkDuplicateRequest(BaseModel):
+    transaction_ids: list[int]
+    # Overrides applied to every copy; omitted fields are copied from the source transaction
+    portfolio_id: Optional[int] = None
+    security_id: Optional[int] = None
+    external_platform_id: Optional[int] = None
+    # Fixed price for all copies; when omitted and the security changes, the target
+    # security's latest price on or before each transaction date is used
+    transaction_price: Optional[float] = None
+
+
 class TransactionByNameInput(BaseModel):
     portfolio_name: str
     security_ticker: str
@@ -283,3 +325,38 @@ class CompanyValuationDtlInput(BaseModel):
     price_per_share: Optional[float] = None
     amount_raised: Optional[str] = None
     raw_data_json: Optional[dict] = None
+
+
+JOB_STATUSES = ["queued", "running", "succeeded", "failed"]
+
+
+class JobDtl(BaseModel):
+    job_id: int
+    job_type: str
+    status: str = "queued"
+    params: Optional[dict] = None
+    progress: Optional[dict] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_ts: datetime = datetime.now(timezone.utc)
+    started_ts: Optional[datetime] = None
+    finished_ts: Optional[datetime] = None
+    last_updated_ts: datetime = datetime.now(timezone.utc)
+
+
+BACKFILL_UNIT_STATUSES = ["pending", "running", "done", "failed"]
+
+
+class PriceBackfillUnitDtl(BaseModel):
+    run_id: int
+    unit_no: int
+    tickers: list[str]
+    from_date: date
+    to_date: date
+    status: str = "pending"
+    rows_saved: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    created_ts: datetime = datetime.now(timezone.utc)
+    finished_ts: Optional[datetime] = None
+    last_updated_ts: datetime = datetime.now(timezone.utc)
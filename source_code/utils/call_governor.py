@@ -0,0 +1,225 @@
+"""
+Outbound-call governor for market-data providers.
+
+Every provider request goes through CallGovernor.call(), which
+1. fails fast with CircuitOpenError while the provider's circuit is open,
+2. waits for a token from a token-bucket rate limiter (rate_per_sec, burst),
+3. retries retryable failures (rate limiting, timeouts, connection errors,
+   HTTP 429/5xx) with exponential backoff and full jitter,
+4. opens the circuit after `failure_threshold` consecutive failed calls and
+   lets one trial call through after `reset_after` seconds (half-open).
+
+One governor is shared per provider name (get_governor) so all threads of a
+sync draw from the same budget. Defaults come from the environment:
+MARKET_DATA_RATE_PER_SEC (2), MARKET_DATA_BURST (5), MARKET_DATA_MAX_RETRIES (3),
+MARKET_DATA_BACKOFF_BASE_SEC (1), MARKET_DATA_BACKOFF_MAX_SEC (30),
+MARKET_DATA_BREAKER_THRESHOLD (5) and MARKET_DATA_BREAKER_RESET_SEC (60).
+"""
+from __future__ import annotations
+
+import os
+import random
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class RateLimitedError(RuntimeError):
+    """Raised by provider adapters when the remote side reports throttling."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+_RETRYABLE_MARKERS = ("429", "too many requests", "rate limit", "ratelimit", "timed out", "timeout",
+                      "temporarily unavailable", "502", "503", "504", "connection reset", "connection aborted")
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (RateLimitedError, TimeoutError, ConnectionError)):
+        return True
+    text = f"{error.__class__.__name__} {error}".lower()
+    return any(marker in text for marker in _RETRYABLE_MARKERS)
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec: float, burst: int, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate_per_sec
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_after: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_after = reset_after
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self._clock() - self._opened_at >= self.reset_after else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                # Let a single trial call probe the provider
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+class CallGovernor:
+    def __init__(
+            self,
+            name: str,
+            rate_per_sec: Optional[float] = None,
+            burst: Optional[int] = None,
+            max_retries: Optional[int] = None,
+            backoff_base: Optional[float] = None,
+            backoff_max: Optional[float] = None,
+            failure_threshold: Optional[int] = None,
+            reset_after: Optional[float] = None,
+            retryable: Callable[[Exception], bool] = is_retryable,
+            sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.name = name
+        self.max_retries = int(max_retries if max_retries is not None else _env_float("MARKET_DATA_MAX_RETRIES", "3"))
+        self.backoff_base = backoff_base if backoff_base is not None else _env_float("MARKET_DATA_BACKOFF_BASE_SEC", "1")
+        self.backoff_max = backoff_max if backoff_max is not None else _env_float("MARKET_DATA_BACKOFF_MAX_SEC", "30")
+        self.retryable = retryable
+        self._sleep = sleep
+        self.bucket = TokenBucket(
+            rate_per_sec if rate_per_sec is not None else _env_float("MARKET_DATA_RATE_PER_SEC", "2"),
+            int(burst if burst is not None else _env_float("MARKET_DATA_BURST", "5")),
+            sleep=sleep,
+        )
+        self.breaker = CircuitBreaker(
+            int(failure_threshold if failure_threshold is not None else _env_float("MARKET_DATA_BREAKER_THRESHOLD", "5")),
+            reset_after if reset_after is not None else _env_float("MARKET_DATA_BREAKER_RESET_SEC", "60"),
+        )
+        self._metrics = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "rejected": 0,
+                         "throttled_sec": 0.0, "backoff_sec": 0.0}
+        self._metrics_lock = Lock()
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._metrics_lock:
+            self._metrics[key] += amount
+
+    def backoff_delay(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn(*args, **kwargs) under the rate limit, retry policy and circuit breaker."""
+        self._count("calls")
+        # Checked once per call: a half-open trial keeps its slot through its own retries and
+        # always ends in record_success/record_failure, which release it
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name}: circuit open after repeated failures; try again later")
+        attempt = 0
+        while True:
+            self._count("throttled_sec", self.bucket.acquire())
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if attempt < self.max_retries and self.retryable(e):
+                    delay = self.backoff_delay(attempt)
+                    attempt += 1
+                    self._count("retries")
+                    self._count("backoff_sec", delay)
+                    print(f"[{self.name}] retryable failure ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    self._sleep(delay)
+                    continue
+                self.breaker.record_failure()
+                self._count("failed")
+                raise
+            self.breaker.record_success()
+            self._count("succeeded")
+            return result
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            snapshot = dict(self._metrics)
+        snapshot["throttled_sec"] = round(snapshot["throttled_sec"], 3)
+        snapshot["backoff_sec"] = round(snapshot["backoff_sec"], 3)
+        return {"name": self.name, "circuit": self.breaker.state, "rate_per_sec": self.bucket.rate, **snapshot}
+
+
+_governors: Dict[str, CallGovernor] = {}
+_governors_lock = Lock()
+
+
+def get_governor(name: str, **settings: Any) -> CallGovernor:
+    """Shared governor for a provider; settings only apply when it is first created."""
+    with _governors_lock:
+        if name not in _governors:
+            _governors[name] = CallGovernor(name, **settings)
+        return _governors[name]
+
+
+def all_metrics() -> list:
+    with _governors_lock:
+        governors = list(_governors.values())
+    return [g.metrics() for g in governors]
+
+
+__all__ = ["CallGovernor", "TokenBucket", "CircuitBreaker", "CircuitOpenError", "RateLimitedError",
+           "is_retryable", "get_governor", "all_metrics"]
@@ -0,0 +1,293 @@
+"""
+Parquet and Arrow IPC export/import for the bulk tables.
+
+Exports stream security_price_dtl, transaction_dtl, holding_dtl and
+company_valuations with an explicit Arrow schema (int64 ids, date32 dates,
+float64 amounts, timestamps, strings), so files open in pandas/polars/DuckDB
+with their types intact. Rows are read in batches through a server-side cursor
+(pg_db_conn_manager.fetch_batches); each batch becomes one Parquet row group
+(zstd) or one IPC record batch and is sent before the next one is read.
+
+Imports read uploaded Parquet files batch by batch (iter_parquet_records /
+iter_parquet_frames) and hand the rows to each table's bulk ingest path: the
+COPY merge for prices, the chunked transaction pipeline, and save_many for
+holdings and company valuations (save_parquet_records).
+
+pyarrow is an optional dependency: without it these functions raise
+ColumnarUnavailableError. Routers use export_response / parquet_upload, which
+report that as 501 and unreadable uploads (ColumnarFormatError) as 400.
+"""
+from __future__ import annotations
+
+from datetime import datetime, time as _time
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+
+from source_code.config import pg_db_conn_manager
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = pa_ipc = pq = None
+
+EXPORT_BATCH_SIZE = 50_000
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+_TS = ("created_ts", "timestamp"), ("last_updated_ts", "timestamp")
+
+# dataset -> (table, [(column, type)], order by); types map to Arrow types in _arrow_type
+DATASETS: Dict[str, tuple] = {
+    "security_prices": ("security_price_dtl", [
+        ("security_price_id", "int64"), ("security_id", "int64"), ("price_source_id", "int64"),
+        ("price_date", "date"), ("price", "float64"), ("open_px", "float64"), ("close_px", "float64"),
+        ("high_px", "float64"), ("low_px", "float64"), ("adj_close_px", "float64"), ("volume", "float64"),
+        ("market_cap", "float64"), ("addl_notes", "string"), ("price_currency", "string"), *_TS,
+    ], "security_id, price_date"),
+    "transactions": ("transaction_dtl", [
+        ("transaction_id", "int64"), ("portfolio_id", "int64"), ("security_id", "int64"),
+        ("external_platform_id", "int64"), ("transaction_date", "date"), ("transaction_type", "string"),
+        ("transaction_qty", "float64"), ("transaction_price", "float64"), ("transaction_fee", "float64"),
+        ("transaction_fee_percent", "float64"), ("carry_fee", "float64"), ("carry_fee_percent", "float64"),
+        ("management_fee", "float64"), ("management_fee_percent", "float64"),
+        ("external_manager_fee", "float64"), ("external_manager_fee_percent", "float64"),
+        ("total_inv_amt", "float64"), ("rel_transaction_id", "int64"), *_TS,
+    ], "transaction_id"),
+    "holdings": ("holding_dtl", [
+        ("holding_id", "int64"), ("holding_dt", "date"), ("portfolio_id", "int64"), ("security_id", "int64"),
+        ("quantity", "float64"), ("price", "float64"), ("avg_price", "float64"), ("market_value", "float64"),
+        ("security_price_dt", "date"), ("holding_cost_amt", "float64"), ("unreal_gain_loss_amt", "float64"),
+        ("unreal_gain_loss_perc", "float64"), *_TS,
+    ], "holding_id"),
+    "company_valuations": ("company_valuations", [
+        ("company_valuation_id", "int64"), ("as_of_date", "date"), ("price_source", "string"),
+        ("company", "string"), ("sector_subsector", "string"), ("price", "float64"),
+        ("price_change_amt", "float64"), ("price_change_perc", "float64"), ("last_matched_price", "string"),
+        ("share_class", "string"), ("post_money_valuation", "string"), ("price_per_share", "float64"),
+        ("amount_raised", "string"), ("created_ts", "timestamptz"), ("last_updated_ts", "timestamptz"),
+    ], "as_of_date DESC, company"),
+}
+
+
+class ColumnarUnavailableError(RuntimeError):
+    """Raised when pyarrow is not installed."""
+
+
+class ColumnarFormatError(ValueError):
+    """Raised when an uploaded file is not readable Parquet or misses required columns."""
+
+
+T = TypeVar("T")
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ColumnarUnavailableError("Parquet/Arrow support needs pyarrow (pip install pyarrow)")
+
+
+def require_parquet_upload(file: UploadFile) -> None:
+    """400 unless the upload is a .parquet file, 501 without pyarrow."""
+    if not (file.filename or "").lower().endswith(".parquet"):
+        raise HTTPException(status_code=400, detail="Please upload a Parquet file")
+    try:
+        _require_pyarrow()
+    except ColumnarUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+
+def _arrow_type(name: str):
+    return {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "date": pa.date32(),
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+        "timestamptz": pa.timestamp("us", tz="UTC"),
+    }[name]
+
+
+def schema_for(dataset: str):
+    _require_pyarrow()
+    _, columns, _ = DATASETS[dataset]
+    return pa.schema([(name, _arrow_type(kind)) for name, kind in columns])
+
+
+def _select_sql(dataset: str) -> str:
+    table, columns, order = DATASETS[dataset]
+    # numeric columns (company_valuations) are read as float8 so they land as float64
+    cols = [f"{name}::float8 AS {name}" if kind == "float64" else name for name, kind in columns]
+    return f"SELECT {', '.join(cols)} FROM {table} ORDER BY {order}"
+
+
+class _ByteSink:
+    """Write-only file object whose written bytes are collected and drained by the generator."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_export(dataset: str, fmt: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encoded bytes of a whole table in `fmt` ("parquet" or "arrow"), one DB batch at a time."""
+    _require_pyarrow()
+    schema = schema_for(dataset)
+    sink = _ByteSink()
+    out = pa.PythonFile(sink, mode="w")
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(out, schema, compression="zstd")
+    else:
+        writer = pa_ipc.new_stream(out, schema)
+    for rows in pg_db_conn_manager.fetch_batches(_select_sql(dataset), batch_size=batch_size):
+        arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        data = sink.drain()
+        if data:
+            yield data
+    # Parquet footer / IPC end-of-stream marker
+    writer.close()
+    yield sink.drain()
+
+
+def stream_export(dataset: str, fmt: str, filename: str) -> StreamingResponse:
+    """StreamingResponse downloading `dataset` as <filename>.parquet or <filename>.arrows."""
+    _require_pyarrow()
+    media_type, extension = FORMATS[fmt]
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{extension}"'}
+    if fmt == "parquet":
+        # Already zstd-compressed; keep the GZip middleware off it
+        headers["Content-Encoding"] = "identity"
+    return StreamingResponse(iter_export(dataset, fmt), media_type=media_type, headers=headers)
+
+
+def export_response(dataset: str, fmt: str) -> StreamingResponse:
+    """stream_export for an /export.parquet or /export.arrow route, named after the dataset; 501 without pyarrow."""
+    try:
+        return stream_export(dataset, fmt, dataset)
+    except ColumnarUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+
+def parquet_upload(file: UploadFile, ingest: Callable[[BinaryIO], T]) -> T:
+    """Run `ingest` on an uploaded Parquet file, mapping unreadable files and missing columns to 400."""
+    require_parquet_upload(file)
+    try:
+        return ingest(file.file)
+    except ColumnarFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _normalize_header(h: str) -> str:
+    return (h or "").strip().lower().replace(" ", "_")
+
+
+def _as_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime) and value.time() == _time(0):
+        return value.date().isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        # ids written as doubles (e.g. from pandas with NaNs) must still parse as int
+        return str(int(value))
+    return str(value)
+
+
+def iter_parquet_records(
+        binary_file: BinaryIO,
+        required: Optional[set] = None,
+        as_text: bool = False,
+        batch_size: int = 10_000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Rows of an uploaded Parquet file as dicts with lower_snake_case keys, read one row group
+    batch at a time. Values keep their Python types (None for nulls) unless as_text, which
+    renders them like CSV cells for loaders that parse strings.
+    """
+    _require_pyarrow()
+    try:
+        parquet = pq.ParquetFile(binary_file)
+    except Exception as e:
+        raise ColumnarFormatError(f"Not a readable Parquet file: {e}")
+    names = [_normalize_header(n) for n in parquet.schema_arrow.names]
+    missing = (required or set()) - set(names)
+    if missing:
+        raise ColumnarFormatError(f"Missing required columns: {', '.join(sorted(missing))}")
+    for batch in parquet.iter_batches(batch_size=batch_size):
+        columns = [batch.column(i).to_pylist() for i in range(batch.num_columns)]
+        for values in zip(*columns):
+            if as_text:
+                yield {name: _as_text(v) for name, v in zip(names, values)}
+            else:
+                yield dict(zip(names, values))
+
+
+def iter_parquet_frames(binary_file: BinaryIO, batch_size: int = 100_000) -> Iterator["pd.DataFrame"]:
+    """Uploaded Parquet file as pandas frames of at most batch_size rows."""
+    _require_pyarrow()
+    try:
+        parquet = pq.ParquetFile(binary_file)
+    except Exception as e:
+        raise ColumnarFormatError(f"Not a readable Parquet file: {e}")
+    for batch in parquet.iter_batches(batch_size=batch_size):
+        yield batch.to_pandas()
+
+
+def save_parquet_records(
+        binary_file: BinaryIO,
+        model: type,
+        required: set,
+        save_many: Callable[[list], list],
+        batch_size: int = 5000,
+) -> Dict[str, int]:
+    """
+    Validate each row of an uploaded Parquet file into `model` (nulls fall back to the model
+    defaults, extra columns such as ids and timestamps are ignored) and persist it with
+    `save_many` every batch_size rows. Returns {"read", "saved"}.
+    """
+    read, saved = 0, 0
+    batch: list = []
+    for row in iter_parquet_records(binary_file, required):
+        read += 1
+        try:
+            batch.append(model(**{k: v for k, v in row.items() if v is not None}))
+        except ValueError as e:
+            raise ColumnarFormatError(f"Row {read}: {e}")
+        if len(batch) >= batch_size:
+            saved += len(save_many(batch))
+            batch = []
+    if batch:
+        saved += len(save_many(batch))
+    return {"read": read, "saved": saved}
+
+
+__all__ = ["DATASETS", "FORMATS", "ColumnarUnavailableError", "ColumnarFormatError", "schema_for",
+           "iter_export", "stream_export", "export_response", "parquet_upload", "require_parquet_upload",
+           "iter_parquet_records", "iter_parquet_frames", "save_parquet_records"]
@@ -0,0 +1,49 @@
+"""
+Streaming CSV exports for the /export.csv endpoints.
+
+stream_csv() turns a SELECT into a StreamingResponse fed by
+pg_db_conn_manager.copy_to_stream (COPY ... TO STDOUT WITH CSV HEADER), so rows
+go from PostgreSQL to the client in fixed-size chunks without building models
+or an in-memory file. Plain responses are compressed chunk by chunk by the GZip
+middleware when the client accepts it.
+
+With gzip=True the body is a gzip file (<name>.csv.gz) compressed while
+streaming; it is sent with Content-Encoding: identity so the middleware does
+not compress it a second time.
+"""
+from __future__ import annotations
+
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+from source_code.config import pg_db_conn_manager
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into gzip format incrementally."""
+    # wbits=31 selects the gzip container (header + CRC trailer)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_csv(query: str, filename: str, gzip: bool = False, params: Optional[tuple] = None) -> StreamingResponse:
+    """StreamingResponse with the CSV (header + rows) of `query`, downloaded as `filename`."""
+    chunks = pg_db_conn_manager.copy_to_stream(query, params)
+    if gzip:
+        return StreamingResponse(
+            gzip_chunks(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.gz"',
+                     "Content-Encoding": "identity"},
+        )
+    return StreamingResponse(chunks, media_type="text/csv",
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+__all__ = ["stream_csv", "gzip_chunks"]
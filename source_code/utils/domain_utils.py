@@ -1,6 +1,10 @@
 import datetime
+import threading
 import uuid
 
+_id_lock = threading.Lock()
+_last_issued_id = 0
+
 
 def get_unique_id() -> int:
     """Returns a unique integer based on a UUID."""
@@ -12,6 +16,21 @@ def get_timestamp_with_microseconds() -> int:
     return int(datetime.datetime.now(datetime.timezone.utc).timestamp() * 1_000_000)
 
 
+def get_timestamp_ids(count: int) -> list[int]:
+    """
+    Returns `count` consecutive timestamp-based ids for bulk inserts.
+    Ids are strictly increasing within the process, so two blocks never overlap
+    even when requested within the same microsecond.
+    """
+    global _last_issued_id
+    if count <= 0:
+        return []
+    with _id_lock:
+        start = max(get_timestamp_with_microseconds(), _last_issued_id + 1)
+        _last_issued_id = start + count - 1
+    return list(range(start, start + count))
+
+
 def get_current_date_time():
     return datetime.datetime.now(datetime.timezone.utc)
 
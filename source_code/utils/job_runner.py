@@ -0,0 +1,112 @@
+"""
+In-process background job runner backed by the job_dtl table.
+
+Routes submit heavy work (price downloads, holdings/fee recalculation, large CSV
+imports) with submit_job(); the call returns immediately with a queued job row
+and a bounded thread pool executes the work. The job function receives a
+progress callback whose snapshots are persisted, so clients can poll
+GET /api/jobs/{job_id} for status, progress and the final result.
+
+Pool size is configured with JOB_MAX_WORKERS (default 2). Keep it well below the
+DB pool size (POSTGRES_DB_MAX_CONN) so request handlers still get connections.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from source_code.crud.job_crud_operations import job_crud
+from source_code.models.models import JobDtl
+
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "2"))
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+JobFunction = Callable[[ProgressCallback], Any]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_MAX_WORKERS, thread_name_prefix="job-worker")
+        return _executor
+
+
+def _error_message(e: Exception) -> str:
+    # HTTPException carries its message in detail; str() would be empty
+    return str(getattr(e, "detail", None) or e) or e.__class__.__name__
+
+
+def _run_job(job_id: int, fn: JobFunction, cleanup: Optional[Callable[[], None]]) -> None:
+    def report_progress(progress: Dict[str, Any]) -> None:
+        try:
+            job_crud.update_progress(job_id, jsonable_encoder(progress))
+        except Exception as e:
+            # Progress is best effort; never fail the job because of it
+            print(f"[jobs] progress update failed for {job_id}: {e}")
+
+    try:
+        job_crud.mark_running(job_id)
+        result = fn(report_progress)
+        job_crud.mark_succeeded(job_id, jsonable_encoder(result))
+    except Exception as e:
+        print(f"[jobs] job {job_id} failed: {e}")
+        job_crud.mark_failed(job_id, _error_message(e))
+    finally:
+        if cleanup is not None:
+            try:
+                cleanup()
+            except Exception as e:
+                print(f"[jobs] cleanup failed for {job_id}: {e}")
+
+
+def submit_job(
+    job_type: str,
+    fn: JobFunction,
+    params: Optional[dict] = None,
+    cleanup: Optional[Callable[[], None]] = None,
+) -> JobDtl:
+    """
+    Persist a queued job and schedule `fn(report_progress)` on the worker pool.
+    `cleanup` runs after the job finishes either way (e.g. to remove a spooled upload).
+    """
+    job = job_crud.create(job_type, jsonable_encoder(params) if params is not None else None)
+    _get_executor().submit(_run_job, job.job_id, fn, cleanup)
+    return job
+
+
+def spool_upload(file_obj: BinaryIO, suffix: str = "") -> str:
+    """
+    Copy an uploaded file to a temp path so a background job can read it after
+    the request (and its UploadFile) is closed. Returns the temp file path.
+    """
+    fd, path = tempfile.mkstemp(prefix="job_upload_", suffix=suffix)
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(file_obj, out)
+    return path
+
+
+def remove_file(path: str) -> Callable[[], None]:
+    return lambda: os.remove(path) if os.path.exists(path) else None
+
+
+def accepted(job: JobDtl) -> dict:
+    """Response body returned by routes when work was queued instead of run inline."""
+    return {"job_id": job.job_id, "job_type": job.job_type, "status": job.status}
+
+
+def shutdown(wait: bool = False) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=not wait)
+            _executor = None
@@ -0,0 +1,157 @@
+"""
+Return and risk analytics over the columnar price store.
+
+For each security the requested price field (default price) is sliced from
+price_series_store for the date range, NaN points are dropped and the metrics
+are computed with NumPy on the arrays:
+
+- daily simple returns r_t = p_t / p_{t-1} - 1 and log returns ln(p_t / p_{t-1})
+- start/end price, high/low and cumulative return p_last / p_first - 1
+- annualized volatility: sample std of log returns * sqrt(periods_per_year)
+- max drawdown: the largest peak-to-trough fall of the price, with its dates
+- Sharpe ratio: mean excess daily return / std of daily returns * sqrt(periods_per_year)
+- rolling windows (optional): trailing `window`-day return and annualized volatility
+
+periods_per_year defaults to 252 trading sessions; risk_free_rate is annual.
+Metrics that need more points than available are None.
+"""
+from __future__ import annotations
+
+import math
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from source_code.config import pg_db_conn_manager
+from source_code.utils.price_series_store import VALUE_FIELDS, PriceSeries, price_series_store
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _num(value) -> Optional[float]:
+    # JSON-safe float: NaN/inf become None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _dates(ordinals: np.ndarray) -> List[date]:
+    return [date.fromordinal(int(d)) for d in ordinals]
+
+
+def compute_metrics(
+        dates: np.ndarray,
+        prices: np.ndarray,
+        risk_free_rate: float = 0.0,
+        periods_per_year: int = TRADING_DAYS_PER_YEAR,
+        window: Optional[int] = None,
+        include_series: bool = True,
+) -> dict:
+    """
+    Metrics for one price series (date ordinals and prices, ascending, NaN allowed).
+    With include_series the per-day returns are returned as columns next to their dates.
+    """
+    dates = np.asarray(dates, dtype=np.int32)
+    prices = np.asarray(prices, dtype=np.float64)
+    valid = np.isfinite(prices) & (prices > 0)
+    dates, prices = dates[valid], prices[valid]
+    n = len(prices)
+    result: dict = {"points": int(n), "start_date": None, "end_date": None, "start_price": None, "end_price": None,
+                    "high": None, "low": None, "cumulative_return": None, "annualized_volatility": None, "max_drawdown": None,
+                    "max_drawdown_peak_date": None, "max_drawdown_trough_date": None, "sharpe_ratio": None}
+    if n == 0:
+        return result
+
+    returns = prices[1:] / prices[:-1] - 1.0
+    log_returns = np.diff(np.log(prices))
+    result.update(start_date=date.fromordinal(int(dates[0])), end_date=date.fromordinal(int(dates[-1])),
+                  start_price=_num(prices[0]), end_price=_num(prices[-1]),
+                  high=_num(prices.max()), low=_num(prices.min()),
+                  cumulative_return=_num(prices[-1] / prices[0] - 1.0))
+
+    running_peak = np.maximum.accumulate(prices)
+    drawdowns = prices / running_peak - 1.0
+    trough = int(np.argmin(drawdowns))
+    peak = int(np.argmax(prices[:trough + 1]))
+    result.update(max_drawdown=_num(drawdowns[trough]),
+                  max_drawdown_peak_date=date.fromordinal(int(dates[peak])),
+                  max_drawdown_trough_date=date.fromordinal(int(dates[trough])))
+
+    if len(returns) >= 2:
+        scale = math.sqrt(periods_per_year)
+        result["annualized_volatility"] = _num(np.std(log_returns, ddof=1) * scale)
+        std = np.std(returns, ddof=1)
+        if std > 0:
+            excess = returns - risk_free_rate / periods_per_year
+            result["sharpe_ratio"] = _num(np.mean(excess) / std * scale)
+
+    if include_series:
+        result["series"] = {
+            "dates": _dates(dates[1:]),
+            "daily_return": [_num(v) for v in returns],
+            "log_return": [_num(v) for v in log_returns],
+            "cumulative_return": [_num(v) for v in prices[1:] / prices[0] - 1.0],
+        }
+    if window and n > window:
+        # Window ending on session i covers sessions i-window .. i
+        rolling_vol = []
+        if window >= 2:
+            windows = np.lib.stride_tricks.sliding_window_view(log_returns, window)
+            rolling_vol = [_num(v) for v in np.std(windows, axis=-1, ddof=1) * math.sqrt(periods_per_year)]
+        result["rolling"] = {
+            "window": window,
+            "dates": _dates(dates[window:]),
+            "return": [_num(v) for v in prices[window:] / prices[:-window] - 1.0],
+            "volatility": rolling_vol,
+        }
+    return result
+
+
+def _resolve_tickers(tickers: List[str]) -> Dict[str, int]:
+    wanted = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    if not wanted:
+        return {}
+    rows = pg_db_conn_manager.fetch_data(
+        "SELECT upper(ticker) AS ticker, security_id FROM security_dtl WHERE upper(ticker) = ANY(%s) "
+        "ORDER BY security_id",
+        (wanted,),
+    )
+    ids: Dict[str, int] = {}
+    for row in rows:
+        ids.setdefault(row["ticker"], row["security_id"])
+    return ids
+
+
+def analyze_tickers(
+        tickers: List[str],
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        field: str = "price",
+        risk_free_rate: float = 0.0,
+        window: Optional[int] = None,
+        include_series: bool = True,
+) -> dict:
+    """
+    Metrics per ticker (comma-split by the caller) for [from_date, to_date]:
+    {"analytics": {TICKER: {"security_id", <metrics>...}}, "missing": [tickers without prices]}.
+    """
+    if field not in VALUE_FIELDS:
+        raise ValueError("Invalid field; expected one of: " + ", ".join(VALUE_FIELDS))
+    if window is not None and window < 1:
+        raise ValueError("window must be a positive number of sessions")
+    wanted = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    ids = _resolve_tickers(wanted)
+    analytics: dict = {}
+    for ticker in wanted:
+        if ticker not in ids:
+            continue
+        series: PriceSeries = price_series_store.get(ids[ticker]).slice(from_date, to_date)
+        if not len(series):
+            continue
+        analytics[ticker] = {"security_id": ids[ticker],
+                             **compute_metrics(series.dates, getattr(series, field), risk_free_rate,
+                                               window=window, include_series=include_series)}
+    return {"analytics": analytics, "missing": [t for t in wanted if t not in analytics]}
+
+
+__all__ = ["compute_metrics", "analyze_tickers", "TRADING_DAYS_PER_YEAR"]
@@ -0,0 +1,186 @@
+"""
+Resumable, checkpointed bulk historical price backfill.
+
+A backfill run is split into (ticker chunk, date window) units which are
+persisted in price_backfill_unit_dtl before any download starts. Units run in
+parallel on a bounded pool (BACKFILL_MAX_WORKERS, default 3); each unit is one
+multi-ticker download plus one COPY-based upsert, and its row is marked done only
+after the upsert succeeded. yfinance downloads themselves run one at a time (see
+security_data_by_yfinance), so the pool overlaps one unit's download with the
+others' upserts. Running the same run_id again skips finished units,
+so a crash, timeout or provider outage only costs the units that were in flight.
+
+Windows without any trading session are not planned. Progress and the final
+summary report throughput as rows per second.
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from source_code.crud.price_backfill_crud_operations import price_backfill_crud
+from source_code.crud.security_crud_operations import security_crud
+from source_code.models.models import PriceBackfillUnitDtl
+from source_code.utils import domain_utils, price_frame_ingest
+from source_code.utils.price_providers import PriceProvider, get_provider
+from source_code.utils.trading_calendar import NYSE
+
+BACKFILL_MAX_WORKERS = int(os.getenv("BACKFILL_MAX_WORKERS", "3"))
+BACKFILL_CHUNK_SIZE = 50
+BACKFILL_WINDOW_DAYS = 365
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def plan_units(
+        run_id: int,
+        tickers: List[str],
+        from_date: date,
+        to_date: date,
+        chunk_size: int = BACKFILL_CHUNK_SIZE,
+        window_days: int = BACKFILL_WINDOW_DAYS,
+) -> List[PriceBackfillUnitDtl]:
+    """Split the work into units ordered by date window, then ticker chunk."""
+    tickers = sorted({t.strip().upper() for t in tickers if t and t.strip()})
+    chunk_size, window_days = max(1, chunk_size), max(1, window_days)
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    units: List[PriceBackfillUnitDtl] = []
+    start = from_date
+    while start <= to_date:
+        end = min(to_date, start + timedelta(days=window_days - 1))
+        if NYSE.session_count(start, end):
+            for chunk in chunks:
+                units.append(PriceBackfillUnitDtl(run_id=run_id, unit_no=len(units) + 1, tickers=chunk,
+                                                  from_date=start, to_date=end))
+        start = end + timedelta(days=1)
+    return units
+
+
+def _run_unit(unit: PriceBackfillUnitDtl, provider: PriceProvider) -> int:
+    price_backfill_crud.mark_running(unit.run_id, unit.unit_no)
+    frame = provider.fetch_history(unit.tickers, unit.from_date.isoformat(), unit.to_date.isoformat(),
+                                   raise_errors=True)
+    if frame.empty:
+        return 0
+    return int(price_frame_ingest.ingest_price_frame(frame, addl_notes="Backfill")["total"])
+
+
+def run_backfill(
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        tickers: Optional[List[str]] = None,
+        run_id: Optional[int] = None,
+        chunk_size: int = BACKFILL_CHUNK_SIZE,
+        window_days: int = BACKFILL_WINDOW_DAYS,
+        max_workers: int = BACKFILL_MAX_WORKERS,
+        provider: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+) -> dict:
+    """
+    Start a backfill (from_date/to_date, optional tickers; defaults to all public
+    securities) or resume an existing one by run_id. Failed and interrupted units
+    of a resumed run are retried. `provider` names the price provider (default
+    PRICE_PROVIDER). Returns a summary with rows/second throughput.
+    """
+    price_provider = get_provider(provider)
+    if run_id is not None:
+        units = price_backfill_crud.list_units(run_id)
+        if not units:
+            raise ValueError(f"Backfill run {run_id} not found")
+        resumed = True
+    else:
+        if from_date is None or to_date is None or to_date < from_date:
+            raise ValueError("from_date and to_date are required and from_date must not be after to_date")
+        if tickers is None:
+            tickers = [s.ticker for s in security_crud.list_all_public() if s.ticker]
+        run_id = domain_utils.get_timestamp_ids(1)[0]
+        units = plan_units(run_id, tickers, from_date, to_date, chunk_size, window_days)
+        price_backfill_crud.create_units(units)
+        resumed = False
+
+    pending = [u for u in units if u.status != "done"]
+    already_done = len(units) - len(pending)
+    print(f"[backfill] run {run_id}: {len(pending)} of {len(units)} unit(s) to process")
+
+    done, failed, rows = 0, 0, 0
+    failures: List[dict] = []
+    started = time.monotonic()
+
+    def snapshot() -> dict:
+        elapsed = time.monotonic() - started
+        return {
+            "run_id": run_id,
+            "units_total": len(units),
+            "units_done": already_done + done,
+            "units_failed": failed,
+            "rows_saved": rows,
+            "elapsed_sec": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending))),
+                                thread_name_prefix="price-backfill") as pool:
+            futures = {pool.submit(_run_unit, u, price_provider): u for u in pending}
+            for future in as_completed(futures):
+                unit = futures[future]
+                try:
+                    saved = future.result()
+                    price_backfill_crud.mark_done(unit.run_id, unit.unit_no, saved)
+                    done += 1
+                    rows += saved
+                except Exception as e:
+                    print(f"[backfill] run {run_id} unit {unit.unit_no} failed: {e}")
+                    price_backfill_crud.mark_failed(unit.run_id, unit.unit_no, str(e) or e.__class__.__name__)
+                    failed += 1
+                    failures.append({"unit_no": unit.unit_no, "error": str(e)})
+                if progress is not None:
+                    progress(snapshot())
+
+    return {**snapshot(), "resumed": resumed, "failures": failures[:20]}
+
+
+def run_status(run_id: int) -> Optional[dict]:
+    """Checkpoint summary of a run: unit counts by status and rows saved so far."""
+    units = price_backfill_crud.list_units(run_id)
+    if not units:
+        return None
+    by_status: Dict[str, int] = {}
+    for u in units:
+        by_status[u.status] = by_status.get(u.status, 0) + 1
+    return {
+        "run_id": run_id,
+        "units_total": len(units),
+        "by_status": by_status,
+        "rows_saved": sum(u.rows_saved for u in units),
+        "from_date": min(u.from_date for u in units),
+        "to_date": max(u.to_date for u in units),
+        "failed_units": [{"unit_no": u.unit_no, "tickers": u.tickers, "from_date": u.from_date,
+                          "to_date": u.to_date, "error": u.error} for u in units if u.status == "failed"][:20],
+    }
+
+
+__all__ = ["plan_units", "run_backfill", "run_status"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill historical prices in checkpointed units")
+    parser.add_argument("--from-date", type=date.fromisoformat)
+    parser.add_argument("--to-date", type=date.fromisoformat)
+    parser.add_argument("--tickers", nargs="*", help="Defaults to all public securities")
+    parser.add_argument("--resume", type=int, metavar="RUN_ID", help="Resume an interrupted run")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    parser.add_argument("--window-days", type=int, default=BACKFILL_WINDOW_DAYS)
+    parser.add_argument("--max-workers", type=int, default=BACKFILL_MAX_WORKERS)
+    parser.add_argument("--provider", help="Price provider name (default: PRICE_PROVIDER or yfinance)")
+    args = parser.parse_args()
+
+    summary = run_backfill(args.from_date, args.to_date, args.tickers, run_id=args.resume,
+                           chunk_size=args.chunk_size, window_days=args.window_days,
+                           max_workers=args.max_workers, provider=args.provider, progress=print)
+    print(summary)
@@ -0,0 +1,102 @@
+"""
+Price coverage engine for incremental price syncs.
+
+Given a set of securities and a date range, work out exactly which trading
+sessions have no row in security_price_dtl and express them as contiguous
+(start, end) spans per security. plan_fetches() then groups tickers that share
+the same span so each group can be fetched with one multi-ticker download; a
+daily sync where everybody is missing the last session becomes one request,
+and a security missing only a few days no longer refetches the whole range.
+
+Sessions come from the exchange trading calendar (NYSE by default), so
+weekends and exchange holidays are never reported as missing.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from source_code.config import pg_db_conn_manager
+from source_code.utils.trading_calendar import NYSE, TradingCalendar
+
+Span = Tuple[date, date]
+
+
+def expected_sessions(from_date: date, to_date: date, calendar: TradingCalendar = NYSE) -> np.ndarray:
+    """Trading sessions in [from_date, to_date] as a sorted datetime64[D] array."""
+    return calendar.sessions_in_range(from_date, to_date)
+
+
+def covered_dates(security_ids: Sequence[int], from_date: date, to_date: date) -> Dict[int, np.ndarray]:
+    """Dates that already have a price per security, from a single query."""
+    if not security_ids:
+        return {}
+    rows = pg_db_conn_manager.fetch_data(
+        "SELECT DISTINCT security_id, price_date FROM security_price_dtl "
+        "WHERE security_id = ANY(%s) AND price_date BETWEEN %s AND %s",
+        (list(security_ids), from_date, to_date),
+    )
+    by_security: Dict[int, list] = {}
+    for row in rows:
+        by_security.setdefault(row["security_id"], []).append(row["price_date"])
+    return {sid: np.array(dates, dtype="datetime64[D]") for sid, dates in by_security.items()}
+
+
+def _runs(missing_idx: np.ndarray, merge_within: int) -> List[Tuple[int, int]]:
+    # Split session indexes into runs; runs separated by <= merge_within covered sessions are joined
+    if len(missing_idx) == 0:
+        return []
+    breaks = np.nonzero(np.diff(missing_idx) > merge_within + 1)[0]
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(missing_idx) - 1]))
+    return [(int(missing_idx[s]), int(missing_idx[e])) for s, e in zip(starts, ends)]
+
+
+def missing_spans(
+        security_ids: Sequence[int],
+        from_date: date,
+        to_date: date,
+        merge_within: int = 0,
+        calendar: TradingCalendar = NYSE,
+) -> Dict[int, List[Span]]:
+    """
+    Missing sessions per security as inclusive (start, end) spans. Securities
+    that are fully covered are omitted. With merge_within > 0, spans separated
+    by at most that many covered sessions are merged to save requests.
+    """
+    sessions = expected_sessions(from_date, to_date, calendar)
+    if len(sessions) == 0:
+        return {}
+    covered = covered_dates(security_ids, from_date, to_date)
+    result: Dict[int, List[Span]] = {}
+    for sid in security_ids:
+        have = covered.get(sid)
+        is_missing = ~np.isin(sessions, have) if have is not None else np.ones(len(sessions), dtype=bool)
+        runs = _runs(np.nonzero(is_missing)[0], merge_within)
+        if runs:
+            result[sid] = [(sessions[s].astype(date), sessions[e].astype(date)) for s, e in runs]
+    return result
+
+
+def plan_fetches(spans_by_ticker: Mapping[str, Iterable[Span]]) -> List[Tuple[date, date, List[str]]]:
+    """Group tickers by identical span: [(start, end, [tickers])], ordered by start date."""
+    groups: Dict[Span, List[str]] = {}
+    for ticker, spans in spans_by_ticker.items():
+        for span in spans:
+            groups.setdefault(span, []).append(ticker)
+    return [(start, end, sorted(tickers)) for (start, end), tickers in sorted(groups.items())]
+
+
+def missing_pairs(spans_by_ticker: Mapping[str, Iterable[Span]],
+                  calendar: TradingCalendar = NYSE) -> List[Tuple[str, date]]:
+    """Expand spans into the individual (ticker, session) pairs they cover."""
+    pairs: List[Tuple[str, date]] = []
+    for ticker, spans in spans_by_ticker.items():
+        for start, end in spans:
+            pairs.extend((ticker, d.astype(date)) for d in expected_sessions(start, end, calendar))
+    return pairs
+
+
+__all__ = ["expected_sessions", "covered_dates", "missing_spans", "plan_fetches", "missing_pairs"]
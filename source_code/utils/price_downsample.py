@@ -0,0 +1,124 @@
+"""
+Server-side downsampling of daily price series for charts.
+
+Two reductions, usable together (bucket first, then points):
+
+- bucket="week" | "month": OHLC aggregation per calendar week (Monday start) or
+  month. open_px is the bucket's first value, high_px the max, low_px the min,
+  volume the sum, and price / close_px / adj_close_px the last value. Each
+  point is dated on the bucket's last session.
+- points=N: Largest-Triangle-Three-Buckets (LTTB) selection of at most N of the
+  points, keeping first and last and the shape of the line. The shape is taken
+  from the first requested field; every other column keeps the same rows.
+
+Input and output are the columnar lists used by the /series payload
+(dates + one list per field, None for missing values), so the chart payload is
+bounded by the bucket count or N instead of growing with the date range.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+
+BUCKETS = ("day", "week", "month")
+MIN_POINTS = 3
+
+# Aggregation per field when bucketing; fields not listed take the bucket's last value
+_FIRST = {"open_px"}
+_MAX = {"high_px"}
+_MIN = {"low_px"}
+_SUM = {"volume"}
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _bucket_keys(ordinals: np.ndarray, bucket: str) -> np.ndarray:
+    if bucket == "week":
+        # Ordinal 1 (0001-01-01) is a Monday
+        return (ordinals - 1) // 7
+    days = (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+    return days.astype("datetime64[M]").astype(np.int64)
+
+
+def bucket_ohlc(ordinals: np.ndarray, columns: Dict[str, np.ndarray], bucket: str) -> tuple:
+    """Aggregate sorted daily points into week/month buckets. Returns (ordinals, columns)."""
+    if bucket not in BUCKETS:
+        raise ValueError("Invalid bucket; expected one of: " + ", ".join(BUCKETS))
+    if bucket == "day" or len(ordinals) == 0:
+        return ordinals, columns
+    keys = _bucket_keys(ordinals, bucket)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(ordinals)] - 1
+    out: Dict[str, np.ndarray] = {}
+    for field, values in columns.items():
+        if field in _FIRST:
+            out[field] = values[starts]
+        elif field in _MAX:
+            out[field] = np.fmax.reduceat(values, starts)
+        elif field in _MIN:
+            out[field] = np.fmin.reduceat(values, starts)
+        elif field in _SUM:
+            valid = np.add.reduceat(np.isfinite(values).astype(np.int64), starts)
+            sums = np.add.reduceat(np.nan_to_num(values, nan=0.0), starts)
+            out[field] = np.where(valid > 0, sums, np.nan)
+        else:
+            out[field] = values[ends]
+    return ordinals[ends], out
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets (first and last always kept)."""
+    n = len(x)
+    if threshold >= n or threshold < MIN_POINTS:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # Bucket edges over the interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        next_y = y[nlo:nhi][np.isfinite(y[nlo:nhi])]
+        avg_x, avg_y = x[nlo:nhi].mean(), (next_y.mean() if len(next_y) else y[a])
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        # Missing values are chosen only when the bucket has nothing else
+        area = np.where(np.isfinite(area), area, -1.0)
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def downsample_columns(
+        dates: List[date],
+        columns: Dict[str, List[Optional[float]]],
+        bucket: Optional[str] = None,
+        points: Optional[int] = None,
+) -> tuple:
+    """
+    Downsample one ticker's columnar series (dates + field lists, None for missing).
+    Returns (dates, columns) in the same list form.
+    """
+    if points is not None and points < MIN_POINTS:
+        raise ValueError(f"points must be at least {MIN_POINTS}")
+    ordinals = np.array([d.toordinal() for d in dates], dtype=np.int64)
+    arrays = {f: np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+              for f, values in columns.items()}
+    if bucket:
+        ordinals, arrays = bucket_ohlc(ordinals, arrays, bucket)
+    if points and len(ordinals) > points and arrays:
+        shape_field = next(iter(arrays))
+        idx = lttb_indices(ordinals, arrays[shape_field], points)
+        ordinals = ordinals[idx]
+        arrays = {f: values[idx] for f, values in arrays.items()}
+    out_dates = [date.fromordinal(int(d)) for d in ordinals]
+    out_columns = {f: [None if np.isnan(v) else float(v) for v in values] for f, values in arrays.items()}
+    return out_dates, out_columns
+
+
+__all__ = ["bucket_ohlc", "lttb_indices", "downsample_columns", "BUCKETS"]
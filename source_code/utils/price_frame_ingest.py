@@ -0,0 +1,284 @@
+"""
+Direct DataFrame -> security_price_dtl ingestion.
+
+Downloaded history frames (Date, Ticker, Open, High, Low, Close, Volume,
+Adj Close) are mapped to security_price_dtl columns with column operations:
+tickers are mapped to security ids with one Series.map, rows without a known
+ticker or a close are dropped, NaN becomes NULL, and duplicates of the natural
+key (security_id, price_source_id, price_date) keep the last row. The result is
+written to an in-memory CSV buffer by pandas and loaded with COPY into a
+temporary staging table, then merged with one INSERT ... ON CONFLICT;
+security_latest_price is advanced for the touched securities afterwards.
+
+No per-row dicts or SecurityPriceDtlInput models are built on this path.
+"""
+from __future__ import annotations
+
+import io
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from source_code.config import pg_db_conn_manager
+from source_code.crud.security_crud_operations import security_crud
+from source_code.crud.security_price_crud_operations import security_price_crud
+from source_code.utils import domain_utils
+from source_code.utils.price_series_store import price_series_store
+from source_code.utils.security_price_loader import DEFAULT_PRICE_SOURCE_ID
+
+# Target columns in COPY order
+PRICE_COLUMNS = [
+    "security_price_id", "security_id", "price_source_id", "price_date", "price", "open_px", "close_px",
+    "high_px", "low_px", "adj_close_px", "volume", "market_cap", "addl_notes", "price_currency",
+    "created_ts", "last_updated_ts",
+]
+
+# Frame column -> security_price_dtl column (case-insensitive on the frame side)
+_VALUE_COLUMNS = {
+    "open": "open_px", "high": "high_px", "low": "low_px", "close": "close_px",
+    "adj close": "adj_close_px", "adj_close": "adj_close_px", "volume": "volume",
+}
+
+# Audit timestamps are staged as timestamptz so the UTC offset written by copy_price_table is
+# honoured; the merge then stores session-local time, like the psycopg2 writers do
+_STAGING_DDL = (
+    "CREATE TEMP TABLE security_price_stage (LIKE security_price_dtl INCLUDING DEFAULTS) ON COMMIT DROP; "
+    "ALTER TABLE security_price_stage ALTER COLUMN created_ts TYPE timestamptz, "
+    "ALTER COLUMN last_updated_ts TYPE timestamptz"
+)
+_AUDIT_TS_COLUMNS = ("created_ts", "last_updated_ts")
+_COPY_SQL = f"COPY security_price_stage ({', '.join(PRICE_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+_MERGE_SQL = f"""
+    INSERT INTO security_price_dtl ({', '.join(PRICE_COLUMNS)})
+    SELECT {', '.join(PRICE_COLUMNS)} FROM security_price_stage
+    ON CONFLICT (security_id, price_source_id, price_date) DO UPDATE SET
+        price = EXCLUDED.price,
+        open_px = EXCLUDED.open_px,
+        close_px = EXCLUDED.close_px,
+        high_px = EXCLUDED.high_px,
+        low_px = EXCLUDED.low_px,
+        adj_close_px = EXCLUDED.adj_close_px,
+        volume = EXCLUDED.volume,
+        market_cap = EXCLUDED.market_cap,
+        addl_notes = EXCLUDED.addl_notes,
+        price_currency = EXCLUDED.price_currency,
+        last_updated_ts = EXCLUDED.last_updated_ts
+"""
+
+
+def _security_lookup(include_private: bool) -> Tuple[Dict[str, int], Dict[str, str]]:
+    securities = security_crud.list_all() if include_private else security_crud.list_all_public()
+    ids, currencies = {}, {}
+    for s in securities:
+        t = (s.ticker or "").upper().strip()
+        if t:
+            ids[t] = s.security_id
+            currencies[t] = (s.security_currency or "").upper() or None
+    return ids, currencies
+
+
+def frame_to_price_table(
+        frame: pd.DataFrame,
+        security_ids: Dict[str, int],
+        currencies: Optional[Dict[str, str]] = None,
+        price_source_id: int = DEFAULT_PRICE_SOURCE_ID,
+        addl_notes: str = "",
+        default_currency: str = "USD",
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Map a long history frame onto security_price_dtl columns (PRICE_COLUMNS order).
+    Returns the table and a dict of skip counts / unknown tickers.
+    """
+    cols = {str(c).strip().lower(): c for c in frame.columns}
+    tickers = frame[cols["ticker"]].astype(str).str.strip().str.upper()
+    sid = tickers.map(security_ids)
+    if "close" in cols:
+        close = pd.to_numeric(frame[cols["close"]], errors="coerce")
+    else:
+        close = pd.Series(float("nan"), index=frame.index)
+
+    unknown = sid.isna()
+    no_close = ~unknown & close.isna()
+    keep = ~unknown & ~no_close
+
+    out = pd.DataFrame({"security_id": sid[keep].astype("int64")})
+    dates = pd.to_datetime(frame.loc[keep, cols["date"]])
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_localize(None)
+    out["price_date"] = dates.dt.date
+    out["price_source_id"] = price_source_id
+    out["price"] = close[keep]
+    for source, target in _VALUE_COLUMNS.items():
+        if source in cols and target not in out:
+            out[target] = pd.to_numeric(frame.loc[keep, cols[source]], errors="coerce")
+    for target in set(_VALUE_COLUMNS.values()) - set(out.columns):
+        out[target] = float("nan")
+    # Whole-number volumes so the column also loads into integer types
+    out["volume"] = out["volume"].round().astype("Int64")
+    out["market_cap"] = 0.0
+    out["addl_notes"] = addl_notes or ""
+    out["price_currency"] = tickers[keep].map(currencies or {}).fillna(default_currency.upper())
+
+    # Last occurrence of a natural key wins
+    out = out.drop_duplicates(subset=["security_id", "price_source_id", "price_date"], keep="last")
+    now = domain_utils.get_current_date_time()
+    out["security_price_id"] = domain_utils.get_timestamp_ids(len(out))
+    out["created_ts"] = now
+    out["last_updated_ts"] = now
+
+    skipped = {
+        "read": int(len(frame)),
+        "skipped_unknown_ticker": sorted(tickers[unknown].unique().tolist()),
+        "skipped_bad_data_count": int(no_close.sum()),
+    }
+    return out[PRICE_COLUMNS].reset_index(drop=True), skipped
+
+
+def id_frame_to_price_table(
+        frame: pd.DataFrame,
+        price_source_id: int = DEFAULT_PRICE_SOURCE_ID,
+        addl_notes: str = "",
+        default_currency: str = "USD",
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Map a frame already keyed by security_id (security_price_dtl column names, e.g. a Parquet
+    export) onto PRICE_COLUMNS. price falls back to close_px; rows without either are dropped.
+    price_source_id, addl_notes and price_currency columns win over the defaults when present.
+    """
+    frame = frame.rename(columns={c: str(c).strip().lower() for c in frame.columns})
+    sid = pd.to_numeric(frame["security_id"], errors="coerce")
+    nan = pd.Series(float("nan"), index=frame.index)
+    price = pd.to_numeric(frame["price"], errors="coerce") if "price" in frame else nan
+    if "close_px" in frame:
+        price = price.fillna(pd.to_numeric(frame["close_px"], errors="coerce"))
+    dates = pd.to_datetime(frame["price_date"], errors="coerce")
+    keep = sid.notna() & price.notna() & dates.notna()
+
+    out = pd.DataFrame({"security_id": sid[keep].astype("int64"), "price_date": dates[keep].dt.date})
+    if "price_source_id" in frame:
+        out["price_source_id"] = pd.to_numeric(frame.loc[keep, "price_source_id"], errors="coerce") \
+            .fillna(price_source_id).astype("int64")
+    else:
+        out["price_source_id"] = price_source_id
+    out["price"] = price[keep]
+    for target in set(_VALUE_COLUMNS.values()) | {"market_cap"}:
+        out[target] = pd.to_numeric(frame.loc[keep, target], errors="coerce") if target in frame else float("nan")
+    out["volume"] = out["volume"].round().astype("Int64")
+    out["market_cap"] = out["market_cap"].fillna(0.0)
+    out["addl_notes"] = frame.loc[keep, "addl_notes"].fillna(addl_notes or "") if "addl_notes" in frame \
+        else addl_notes or ""
+    currency = frame.loc[keep, "price_currency"].fillna("").astype(str).str.upper() if "price_currency" in frame \
+        else pd.Series("", index=out.index)
+    out["price_currency"] = currency.where(currency != "", default_currency.upper())
+
+    out = out.drop_duplicates(subset=["security_id", "price_source_id", "price_date"], keep="last")
+    now = domain_utils.get_current_date_time()
+    out["security_price_id"] = domain_utils.get_timestamp_ids(len(out))
+    out["created_ts"] = now
+    out["last_updated_ts"] = now
+    return out[PRICE_COLUMNS].reset_index(drop=True), {"read": int(len(frame)),
+                                                       "skipped_bad_data_count": int((~keep).sum())}
+
+
+def _with_offset(values: pd.Series) -> pd.Series:
+    """ISO timestamps with their UTC offset; naive values are taken as UTC (domain_utils clock)."""
+    ts = pd.to_datetime(values)
+    if ts.dt.tz is None:
+        ts = ts.dt.tz_localize("UTC")
+    return ts.map(lambda t: t.isoformat(sep=" ", timespec="microseconds"))
+
+
+def copy_price_table(table: pd.DataFrame) -> int:
+    """COPY a PRICE_COLUMNS table into a staging table and upsert it into security_price_dtl."""
+    if table.empty:
+        return 0
+    buffer = io.StringIO()
+    table.assign(**{c: _with_offset(table[c]) for c in _AUDIT_TS_COLUMNS}) \
+        .to_csv(buffer, index=False, header=False, na_rep="\\N", date_format="%Y-%m-%d %H:%M:%S.%f")
+    buffer.seek(0)
+    affected = pg_db_conn_manager.copy_and_merge(_STAGING_DDL, _COPY_SQL, buffer, _MERGE_SQL)
+    security_ids = table["security_id"].unique().tolist()
+    security_price_crud.advance_latest(security_ids, table["price_date"].min())
+    # Touched series reload lazily from the database on next use
+    price_series_store.invalidate(*security_ids)
+    return affected
+
+
+def ingest_price_frame(
+        frame: pd.DataFrame,
+        price_source_id: int = DEFAULT_PRICE_SOURCE_ID,
+        addl_notes: str = "Yahoo",
+        default_currency: str = "USD",
+        include_private: bool = False,
+) -> Dict[str, Any]:
+    """
+    Upsert a downloaded history frame into security_price_dtl via COPY.
+    Returns a summary shaped like security_price_loader's (read/prepared/total/inserted/...).
+    """
+    if frame is None or frame.empty:
+        return {"read": 0, "prepared": 0, "total": 0, "inserted": 0, "updated": 0,
+                "skipped_unknown_ticker": [], "skipped_unknown_ticker_count": 0, "skipped_bad_data_count": 0}
+    security_ids, currencies = _security_lookup(include_private)
+    table, skipped = frame_to_price_table(frame, security_ids, currencies, price_source_id, addl_notes,
+                                          default_currency)
+    affected = copy_price_table(table)
+    summary = {
+        "read": skipped["read"],
+        "prepared": int(len(table)),
+        "total": int(len(table)),
+        "inserted": int(affected),  # PostgreSQL does not distinguish insert vs update in upsert
+        "updated": 0,
+        "skipped_unknown_ticker": skipped["skipped_unknown_ticker"],
+        "skipped_unknown_ticker_count": len(skipped["skipped_unknown_ticker"]),
+        "skipped_bad_data_count": skipped["skipped_bad_data_count"],
+    }
+    print(f"Price frame ingest summary: {summary}")
+    return summary
+
+
+def ingest_price_parquet(
+        binary_file,
+        price_source_id: int = DEFAULT_PRICE_SOURCE_ID,
+        default_currency: str = "USD",
+        addl_notes: str = "Parquet",
+        include_private: bool = False,
+) -> Dict[str, Any]:
+    """
+    Upsert an uploaded Parquet file one row-group batch at a time. Files with a security_id
+    column (e.g. from /export.parquet) are mapped with id_frame_to_price_table; files in the
+    loader layout (Date, Ticker, Close, ...) go through load_security_prices_from_frame.
+    Returns one summary accumulated over all batches.
+    """
+    # Imported here: security_price_loader imports this module lazily as well
+    from source_code.utils import columnar_io, security_price_loader
+
+    summary: Dict[str, Any] = {"read": 0, "prepared": 0, "total": 0, "inserted": 0, "updated": 0,
+                               "skipped_unknown_ticker": [], "skipped_bad_data_count": 0}
+    for frame in columnar_io.iter_parquet_frames(binary_file):
+        columns = {str(c).strip().lower() for c in frame.columns}
+        if "security_id" in columns:
+            if "price_date" not in columns or not columns & {"price", "close_px"}:
+                raise columnar_io.ColumnarFormatError("Missing required columns: price_date, price or close_px")
+            table, skipped = id_frame_to_price_table(frame, price_source_id, addl_notes, default_currency)
+            affected = copy_price_table(table)
+            part = {"read": skipped["read"], "prepared": len(table), "total": len(table), "inserted": affected,
+                    "skipped_bad_data_count": skipped["skipped_bad_data_count"]}
+        elif {"date", "ticker"} <= columns:
+            # Keep row numbers in skip messages relative to the whole file
+            frame.index += summary["read"]
+            part = security_price_loader.load_security_prices_from_frame(
+                frame, price_source_id, default_currency, addl_notes, include_private)
+            part["skipped_bad_data_count"] = len(part.pop("skipped_bad_data", []))
+        else:
+            raise columnar_io.ColumnarFormatError(
+                "Expected security_id/price_date/price or Date/Ticker/Close columns")
+        for key in ("read", "prepared", "total", "inserted", "updated", "skipped_bad_data_count"):
+            summary[key] += int(part.get(key, 0))
+        summary["skipped_unknown_ticker"] = sorted(set(summary["skipped_unknown_ticker"])
+                                                   | set(part.get("skipped_unknown_ticker", [])))
+    summary["skipped_unknown_ticker_count"] = len(summary["skipped_unknown_ticker"])
+    print(f"Price parquet ingest summary: {summary}")
+    return summary
+
+
+__all__ = ["frame_to_price_table", "id_frame_to_price_table", "copy_price_table", "ingest_price_parquet", "ingest_price_frame", "PRICE_COLUMNS"]
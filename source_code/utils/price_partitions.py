@@ -0,0 +1,296 @@
+"""
+Range partitioning of security_price_dtl by price_date.
+
+Partitioned layout (config/sql/security_price_dtl_partitioned_ddl.sql):
+security_price_dtl is PARTITION BY RANGE (price_date) with one partition per
+year (security_price_dtl_y2024) or month (security_price_dtl_m202401), plus
+security_price_dtl_default for dates without a partition so writes never fail.
+PostgreSQL requires the partition key in unique constraints, so the primary key
+is (security_price_id, price_date); unique_sec_price_by_source
+(security_id, price_source_id, price_date) is unchanged, so every
+ON CONFLICT upsert keeps its target. Queries that filter price_date (date-range
+lists, /series, coverage) only scan the partitions they touch, and each
+partition's indexes stay small.
+
+- ensure_partitions(): pre-create partitions through `ahead` periods after today;
+  rows already sitting in the default partition for a new range move into it
+- migrate(): convert the plain table while it stays in use (copy per range,
+  short final swap)
+- detach_partitions(before): detach partitions ending on/before a date for
+  archiving; they remain plain tables that can be dumped and dropped
+- list_partitions()
+"""
+from __future__ import annotations
+
+import os
+import re
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from source_code.config import pg_db_conn_manager
+from source_code.utils import domain_utils
+from source_code.utils.price_frame_ingest import PRICE_COLUMNS
+from source_code.utils.price_series_store import price_series_store
+
+TABLE = "security_price_dtl"
+DEFAULT_PARTITION = f"{TABLE}_default"
+GRANULARITIES = ("year", "month")
+PARTITION_GRANULARITY = os.getenv("PRICE_PARTITION_GRANULARITY", "year")
+PARTITIONS_AHEAD = 2
+# Rows written up to this long before the migration started are copied again in the final swap
+MIGRATION_CATCHUP_MARGIN = timedelta(minutes=5)
+
+_BOUND_RE = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def _period_start(day: date, granularity: str) -> date:
+    return date(day.year, 1, 1) if granularity == "year" else date(day.year, day.month, 1)
+
+
+def _next_period(start: date, granularity: str) -> date:
+    if granularity == "year":
+        return date(start.year + 1, 1, 1)
+    return date(start.year + (start.month == 12), start.month % 12 + 1, 1)
+
+
+def _horizon(ahead: int, granularity: str) -> date:
+    """First day of the period `ahead` periods after the current one."""
+    end = _period_start(date.today(), granularity)
+    for _ in range(max(0, ahead)):
+        end = _next_period(end, granularity)
+    return end
+
+
+def partition_name(start: date, granularity: str) -> str:
+    return f"{TABLE}_y{start.year}" if granularity == "year" else f"{TABLE}_m{start.year}{start.month:02d}"
+
+
+def plan_partitions(from_date: date, to_date: date, granularity: str) -> List[Tuple[str, date, date]]:
+    """(name, from, to-exclusive) of every period overlapping [from_date, to_date]."""
+    if granularity not in GRANULARITIES:
+        raise ValueError("Invalid granularity; expected one of: " + ", ".join(GRANULARITIES))
+    plan = []
+    start = _period_start(from_date, granularity)
+    while start <= to_date:
+        end = _next_period(start, granularity)
+        plan.append((partition_name(start, granularity), start, end))
+        start = end
+    return plan
+
+
+def is_partitioned() -> bool:
+    rows = pg_db_conn_manager.fetch_data("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (TABLE,))
+    return bool(rows) and rows[0]["relkind"] == "p"
+
+
+def list_partitions() -> List[Dict[str, Any]]:
+    """Partitions of security_price_dtl with their range (to_date exclusive) and estimated rows."""
+    rows = pg_db_conn_manager.fetch_data(
+        "SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound, c.reltuples::bigint AS approx_rows "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+        (TABLE,),
+    )
+    partitions = []
+    for row in rows:
+        m = _BOUND_RE.search(row["bound"] or "")
+        partitions.append({
+            "name": row["name"],
+            "is_default": (row["bound"] or "").strip().upper() == "DEFAULT",
+            "from_date": date.fromisoformat(m.group(1)) if m else None,
+            "to_date": date.fromisoformat(m.group(2)) if m else None,
+            # reltuples is -1 until the partition was first analyzed
+            "approx_rows": max(0, int(row["approx_rows"] or 0)),
+        })
+    return partitions
+
+
+def _detect_granularity(partitions: List[Dict[str, Any]]) -> Optional[str]:
+    for p in partitions:
+        if p["from_date"] and p["to_date"]:
+            return "year" if (p["to_date"] - p["from_date"]).days > 31 else "month"
+    return None
+
+
+def _create_partition_statements(name: str, start: date, end: date, has_default: bool) -> List:
+    # Built as a plain table and attached afterwards, so rows the default partition already
+    # holds for the range can be moved in the same transaction
+    statements: List = [f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)"]
+    if has_default:
+        statements.append((
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE price_date >= %s AND price_date < %s "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved",
+            (start, end),
+        ))
+    statements.append(
+        f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    return statements
+
+
+def ensure_partitions(
+        ahead: int = PARTITIONS_AHEAD,
+        granularity: Optional[str] = None,
+        from_date: Optional[date] = None,
+) -> Dict[str, Any]:
+    """
+    Create the missing partitions from from_date (default: today) through `ahead` periods
+    after the current one. Granularity defaults to that of the existing partitions, then
+    PRICE_PARTITION_GRANULARITY. Ranges already covered by another partition are skipped.
+    """
+    if not is_partitioned():
+        raise ValueError(f"{TABLE} is not partitioned; run the migration first")
+    existing = list_partitions()
+    granularity = granularity or _detect_granularity(existing) or PARTITION_GRANULARITY
+    if granularity not in GRANULARITIES:
+        raise ValueError("Invalid granularity; expected one of: " + ", ".join(GRANULARITIES))
+    has_default = any(p["is_default"] for p in existing)
+    covered = [(p["from_date"], p["to_date"]) for p in existing if p["from_date"]]
+    created = []
+    for name, start, end in plan_partitions(from_date or date.today(), _horizon(ahead, granularity), granularity):
+        if any(s < end and start < e for s, e in covered):
+            continue
+        pg_db_conn_manager.execute_statements(_create_partition_statements(name, start, end, has_default))
+        created.append(name)
+        print(f"[partitions] created {name} [{start}, {end})")
+    return {"granularity": granularity, "created": created, "partitions": len(existing) + len(created)}
+
+
+def migrate(
+        granularity: str = PARTITION_GRANULARITY,
+        ahead: int = PARTITIONS_AHEAD,
+        progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Convert the plain security_price_dtl into the partitioned layout while it stays in use:
+
+    1. build security_price_dtl_new (same columns and defaults, keys as described above)
+       with partitions from the oldest price_date through `ahead` periods after today;
+    2. copy the rows one partition range at a time, each range in its own transaction;
+    3. in one short transaction that blocks writers (readers continue until the rename),
+       copy again the rows written since the migration started and swap the table names.
+
+    The old table stays as security_price_dtl_unpartitioned for checks and archiving.
+    Deletes, and updates that move a row to another date, made during step 2 are not
+    replayed, so run it when prices are only being added.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError("Invalid granularity; expected one of: " + ", ".join(GRANULARITIES))
+    if is_partitioned():
+        raise ValueError(f"{TABLE} is already partitioned")
+    started = domain_utils.get_current_date_time() - MIGRATION_CATCHUP_MARGIN
+    rows = pg_db_conn_manager.fetch_data(f"SELECT min(price_date) AS first_date FROM {TABLE}")
+    first_date = (rows[0]["first_date"] if rows else None) or date.today()
+    horizon = _horizon(ahead, granularity)
+    plan = plan_partitions(first_date, horizon, granularity)
+
+    new, old = f"{TABLE}_new", f"{TABLE}_unpartitioned"
+    pg_db_conn_manager.execute_statements([
+        f"CREATE TABLE {new} (LIKE {TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (price_date)",
+        f"ALTER TABLE {new} ADD CONSTRAINT {new}_pkey PRIMARY KEY (security_price_id, price_date)",
+        f"ALTER TABLE {new} ADD CONSTRAINT unique_sec_price_by_source_new UNIQUE (security_id, price_source_id, price_date)",
+        f"CREATE INDEX idx_{new}_security_date ON {new} (security_id, price_date DESC)",
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {new} DEFAULT",
+        *[f"CREATE TABLE {name} PARTITION OF {new} FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+          for name, start, end in plan],
+    ])
+
+    copied = 0
+    ranges = list(plan)
+    # Anything dated past the last planned partition lands in the default partition
+    ranges.append((DEFAULT_PARTITION, plan[-1][2], date.max))
+    for i, (name, start, end) in enumerate(ranges, start=1):
+        copied += pg_db_conn_manager.execute_statements([(
+            f"INSERT INTO {new} SELECT * FROM {TABLE} WHERE price_date >= %s AND price_date < %s "
+            "ON CONFLICT DO NOTHING",
+            (start, end),
+        )])
+        if progress is not None:
+            progress({"ranges_total": len(ranges), "ranges_done": i, "partition": name, "rows_copied": copied})
+
+    columns = ", ".join(PRICE_COLUMNS)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in PRICE_COLUMNS
+                        if c not in ("security_id", "price_source_id", "price_date"))
+    caught_up = pg_db_conn_manager.execute_statements([
+        # Blocks inserts/updates/deletes on the old table; reads go on until the rename
+        f"LOCK TABLE {TABLE} IN SHARE ROW EXCLUSIVE MODE",
+        (f"INSERT INTO {new} ({columns}) SELECT {columns} FROM {TABLE} WHERE last_updated_ts >= %s "
+         f"ON CONFLICT (security_id, price_source_id, price_date) DO UPDATE SET {updates}", (started,)),
+        f"ALTER TABLE {TABLE} RENAME TO {old}",
+        f"ALTER TABLE {old} RENAME CONSTRAINT {TABLE}_pkey TO {old}_pkey",
+        f"ALTER TABLE {old} RENAME CONSTRAINT unique_sec_price_by_source TO unique_sec_price_by_source_unpartitioned",
+        f"ALTER INDEX IF EXISTS idx_{TABLE}_security_date RENAME TO idx_{old}_security_date",
+        f"ALTER TABLE {new} RENAME TO {TABLE}",
+        f"ALTER TABLE {TABLE} RENAME CONSTRAINT {new}_pkey TO {TABLE}_pkey",
+        f"ALTER TABLE {TABLE} RENAME CONSTRAINT unique_sec_price_by_source_new TO unique_sec_price_by_source",
+        f"ALTER INDEX idx_{new}_security_date RENAME TO idx_{TABLE}_security_date",
+    ])
+    summary = {"granularity": granularity, "partitions": len(plan) + 1, "rows_copied": copied,
+               "rows_caught_up": caught_up, "old_table": old}
+    print(f"[partitions] migration done: {summary}")
+    return summary
+
+
+def detach_partitions(before: date, concurrently: bool = True) -> Dict[str, Any]:
+    """
+    Detach every range partition that ends on or before `before` (e.g. 2015-01-01 detaches
+    2014 and earlier). The partitions stay as standalone tables for dumping or dropping.
+    CONCURRENTLY (PostgreSQL 14+) does not block queries on security_price_dtl, but PostgreSQL
+    rejects it while a DEFAULT partition exists, so with one (the normal layout) each detach
+    takes a brief exclusive lock instead.
+    """
+    if not is_partitioned():
+        raise ValueError(f"{TABLE} is not partitioned")
+    partitions = list_partitions()
+    if concurrently and any(p["is_default"] for p in partitions):
+        print(f"[partitions] {DEFAULT_PARTITION} exists; detaching without CONCURRENTLY")
+        concurrently = False
+    detached = []
+    for p in partitions:
+        if p["is_default"] or p["to_date"] is None or p["to_date"] > before:
+            continue
+        sql = f"ALTER TABLE {TABLE} DETACH PARTITION {p['name']}" + (" CONCURRENTLY" if concurrently else "")
+        pg_db_conn_manager.execute_statements([sql], autocommit=concurrently)
+        detached.append(p["name"])
+        print(f"[partitions] detached {p['name']}")
+    if detached:
+        # Cached series may still hold the detached history
+        price_series_store.clear()
+    return {"detached": detached}
+
+
+__all__ = ["plan_partitions", "partition_name", "is_partitioned", "list_partitions", "ensure_partitions",
+           "migrate", "detach_partitions", "GRANULARITIES"]
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Manage price_date range partitions of security_price_dtl")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List partitions")
+    ensure = sub.add_parser("ensure", help="Pre-create upcoming partitions")
+    ensure.add_argument("--ahead", type=int, default=PARTITIONS_AHEAD)
+    ensure.add_argument("--granularity", choices=GRANULARITIES)
+    ensure.add_argument("--from-date", type=date.fromisoformat)
+    migration = sub.add_parser("migrate", help="Convert the plain table into the partitioned layout")
+    migration.add_argument("--granularity", choices=GRANULARITIES, default=PARTITION_GRANULARITY)
+    migration.add_argument("--ahead", type=int, default=PARTITIONS_AHEAD)
+    detach = sub.add_parser("detach", help="Detach partitions ending on/before a date for archiving")
+    detach.add_argument("--before", type=date.fromisoformat, required=True)
+    detach.add_argument("--blocking", action="store_true",
+                        help="Detach without CONCURRENTLY (always the case while a default partition exists)")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        result: Any = list_partitions()
+    elif args.command == "ensure":
+        result = ensure_partitions(args.ahead, args.granularity, args.from_date)
+    elif args.command == "migrate":
+        result = migrate(args.granularity, args.ahead, progress=print)
+    else:
+        result = detach_partitions(args.before, concurrently=not args.blocking)
+    print(json.dumps(result, indent=2, default=str))
@@ -0,0 +1,257 @@
+"""
+Pluggable market-data providers.
+
+Ingestion code asks get_provider() for a PriceProvider instead of importing a
+vendor library. Every provider offers the same two batched calls:
+
+- fetch_history(tickers, start, end) -> long DataFrame with columns
+  Date, Ticker, Open, High, Low, Close, Volume (+ Adj Close when available),
+  ordered by Date then Ticker; end is inclusive.
+- fetch_quotes(tickers) -> {TICKER: {"price", "currency", "name", "long_name", "as_of"}}
+
+Each provider carries its own chunk_size and max_workers plus a shared call
+governor (token-bucket rate limit, retries with backoff, circuit breaker; see
+call_governor), so ingestion can be tuned or benchmarked per provider without
+touching routes.
+
+Shipped providers:
+- "yfinance"   (default) multi-ticker yf.download batches
+- "yahooquery" yahooquery Ticker batches
+- "file"       local CSV/Parquet files for tests and air-gapped use
+
+The default is chosen with PRICE_PROVIDER; the file provider reads
+PRICE_PROVIDER_FILE_PATH (a file, or a directory of *.csv / *.parquet files).
+"""
+from __future__ import annotations
+
+import glob
+import os
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from source_code.utils.call_governor import get_governor
+from source_code.utils.security_data_by_yfinance import (
+    YF_DOWNLOAD_CHUNK_SIZE,
+    YF_DOWNLOAD_MAX_WORKERS,
+    download_history_frame,
+)
+
+HISTORY_COLUMNS = ["Date", "Ticker", "Open", "High", "Low", "Close", "Volume", "Adj Close"]
+
+# Receives {"chunks_done", "chunks_total", "tickers_done", "tickers_total"} after each chunk
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def _normalize_tickers(tickers: List[str]) -> List[str]:
+    return sorted({t.strip().upper() for t in tickers if t and t.strip()})
+
+
+def _finish_history(frame: pd.DataFrame) -> pd.DataFrame:
+    if frame is None or frame.empty:
+        return pd.DataFrame()
+    cols = [c for c in HISTORY_COLUMNS if c in frame.columns]
+    return frame[cols].sort_values(["Date", "Ticker"], kind="stable").reset_index(drop=True)
+
+
+def _quotes_from_history(frame: pd.DataFrame) -> Dict[str, dict]:
+    # Latest close per ticker as a quote
+    if frame.empty:
+        return {}
+    latest = frame.dropna(subset=["Close"]).drop_duplicates(subset="Ticker", keep="last")
+    return {
+        row["Ticker"]: {"price": float(row["Close"]), "currency": None, "name": None, "long_name": None,
+                        "as_of": pd.Timestamp(row["Date"]).date()}
+        for row in latest.to_dict("records")
+    }
+
+
+class PriceProvider(ABC):
+    name: str = ""
+
+    def __init__(self, chunk_size: int = 100, max_workers: int = 4, **governor_settings):
+        self.chunk_size = max(1, chunk_size)
+        self.max_workers = max(1, max_workers)
+        # One governor per provider name, shared by every worker thread
+        self.governor = get_governor(self.name, **governor_settings)
+
+    @abstractmethod
+    def fetch_history(self, tickers: List[str], start: str, end: str, interval: str = "1d",
+                      auto_adjust: Optional[bool] = None, raise_errors: bool = False,
+                      progress: Optional[ProgressCallback] = None) -> pd.DataFrame:
+        """Daily (or `interval`) bars for all tickers in [start, end] as one long frame."""
+
+    @abstractmethod
+    def fetch_quotes(self, tickers: List[str]) -> Dict[str, dict]:
+        """Latest quote per ticker."""
+
+    def settings(self) -> dict:
+        return {"name": self.name, "chunk_size": self.chunk_size, "max_workers": self.max_workers,
+                "rate_per_sec": self.governor.bucket.rate, "max_retries": self.governor.max_retries}
+
+
+class YFinanceProvider(PriceProvider):
+    name = "yfinance"
+
+    def __init__(self, chunk_size: int = YF_DOWNLOAD_CHUNK_SIZE, max_workers: int = YF_DOWNLOAD_MAX_WORKERS,
+                 **governor_settings):
+        super().__init__(chunk_size, max_workers, **governor_settings)
+
+    def fetch_history(self, tickers, start, end, interval="1d", auto_adjust=None, raise_errors=False, progress=None):
+        return _finish_history(download_history_frame(
+            tickers, start, end, interval=interval, auto_adjust=auto_adjust, chunk_size=self.chunk_size,
+            max_workers=self.max_workers, raise_errors=raise_errors, governor=self.governor, progress=progress))
+
+    def fetch_quotes(self, tickers):
+        end = pd.Timestamp.today().normalize()
+        # A week back always contains the last session
+        frame = self.fetch_history(tickers, (end - pd.Timedelta(days=7)).date().isoformat(), end.date().isoformat())
+        return _quotes_from_history(frame)
+
+
+class YahooQueryProvider(PriceProvider):
+    name = "yahooquery"
+
+    def __init__(self, chunk_size: int = 50, max_workers: int = 1, **governor_settings):
+        super().__init__(chunk_size, max_workers, **governor_settings)
+
+    def fetch_history(self, tickers, start, end, interval="1d", auto_adjust=None, raise_errors=False, progress=None):
+        from yahooquery import Ticker
+
+        tickers = _normalize_tickers(tickers)
+        end_exclusive = (pd.to_datetime(end) + pd.Timedelta(days=1)).date().isoformat()
+        frames = []
+        chunks_total = -(-len(tickers) // self.chunk_size)
+        for i in range(0, len(tickers), self.chunk_size):
+            chunk = tickers[i:i + self.chunk_size]
+            if progress is not None and i:
+                progress({"chunks_done": i // self.chunk_size, "chunks_total": chunks_total,
+                          "tickers_done": i, "tickers_total": len(tickers)})
+            try:
+                df = self.governor.call(lambda c=chunk: Ticker(c, asynchronous=True).history(
+                    start=start, end=end_exclusive, interval=interval, adj_ohlc=bool(auto_adjust)))
+            except Exception as e:
+                print(f"yahooquery history failed for chunk starting {chunk[0]} ({len(chunk)} tickers): {e}")
+                if raise_errors:
+                    raise
+                continue
+            if not isinstance(df, pd.DataFrame) or df.empty:
+                continue
+            df = df.reset_index().rename(columns={
+                "symbol": "Ticker", "date": "Date", "open": "Open", "high": "High", "low": "Low",
+                "close": "Close", "volume": "Volume", "adjclose": "Adj Close"})
+            df["Date"] = pd.to_datetime(df["Date"], utc=True).dt.tz_localize(None).dt.normalize()
+            df["Ticker"] = df["Ticker"].str.upper()
+            frames.append(df)
+        if progress is not None and tickers:
+            progress({"chunks_done": chunks_total, "chunks_total": chunks_total,
+                      "tickers_done": len(tickers), "tickers_total": len(tickers)})
+        return _finish_history(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+
+    def fetch_quotes(self, tickers):
+        from source_code.utils import security_data_by_yahooquery
+
+        prices = security_data_by_yahooquery.get_security_data(_normalize_tickers(tickers), self.chunk_size)["price"] or {}
+        quotes = {}
+        for ticker, p in prices.items():
+            if not isinstance(p, dict) or p.get("regularMarketPrice") is None:
+                continue
+            quotes[ticker.upper()] = {"price": float(p["regularMarketPrice"]), "currency": p.get("currency"),
+                                      "name": p.get("shortName"), "long_name": p.get("longName"),
+                                      "as_of": p.get("regularMarketTime")}
+        return quotes
+
+
+# Accepted header spellings for file providers (case-insensitive)
+_FILE_COLUMN_ALIASES = {
+    "date": "Date", "price_date": "Date",
+    "ticker": "Ticker", "symbol": "Ticker",
+    "open": "Open", "open_px": "Open",
+    "high": "High", "high_px": "High",
+    "low": "Low", "low_px": "Low",
+    "close": "Close", "close_px": "Close",
+    "adj close": "Adj Close", "adj_close": "Adj Close", "adj_close_px": "Adj Close",
+    "volume": "Volume",
+}
+
+
+class FileProvider(PriceProvider):
+    """Serves history and quotes from local CSV/Parquet files (Parquet needs pyarrow)."""
+    name = "file"
+
+    def __init__(self, path: Optional[str] = None):
+        # Local reads need no rate limit or retries
+        super().__init__(chunk_size=10_000, max_workers=1, rate_per_sec=0, max_retries=0)
+        self.path = path or os.getenv("PRICE_PROVIDER_FILE_PATH", "")
+        self._frame: Optional[pd.DataFrame] = None
+        self._load_lock = Lock()
+
+    def _files(self) -> List[str]:
+        if os.path.isdir(self.path):
+            return sorted(glob.glob(os.path.join(self.path, "*.csv")) + glob.glob(os.path.join(self.path, "*.parquet")))
+        return [self.path] if self.path and os.path.exists(self.path) else []
+
+    def _load(self) -> pd.DataFrame:
+        with self._load_lock:
+            if self._frame is None:
+                frames = []
+                for f in self._files():
+                    df = pd.read_parquet(f) if f.endswith(".parquet") else pd.read_csv(f)
+                    df = df.rename(columns={c: _FILE_COLUMN_ALIASES.get(str(c).strip().lower(), c) for c in df.columns})
+                    frames.append(df)
+                if not frames:
+                    raise FileNotFoundError(f"No price files found at {self.path!r} (set PRICE_PROVIDER_FILE_PATH)")
+                frame = pd.concat(frames, ignore_index=True)
+                frame["Date"] = pd.to_datetime(frame["Date"]).dt.normalize()
+                frame["Ticker"] = frame["Ticker"].astype(str).str.strip().str.upper()
+                self._frame = _finish_history(frame.drop_duplicates(subset=["Date", "Ticker"], keep="last"))
+            return self._frame
+
+    def fetch_history(self, tickers, start, end, interval="1d", auto_adjust=None, raise_errors=False, progress=None):
+        frame = self._load()
+        tickers = _normalize_tickers(tickers)
+        mask = (frame["Ticker"].isin(tickers)
+                & (frame["Date"] >= pd.to_datetime(start)) & (frame["Date"] <= pd.to_datetime(end)))
+        if progress is not None:
+            progress({"chunks_done": 1, "chunks_total": 1, "tickers_done": len(tickers), "tickers_total": len(tickers)})
+        return frame[mask].reset_index(drop=True)
+
+    def fetch_quotes(self, tickers):
+        frame = self._load()
+        return _quotes_from_history(frame[frame["Ticker"].isin(_normalize_tickers(tickers))])
+
+
+_factories: Dict[str, Callable[[], PriceProvider]] = {
+    "yfinance": YFinanceProvider,
+    "yahooquery": YahooQueryProvider,
+    "file": FileProvider,
+}
+_instances: Dict[str, PriceProvider] = {}
+_instances_lock = Lock()
+
+
+def register_provider(name: str, factory: Callable[[], PriceProvider]) -> None:
+    with _instances_lock:
+        _factories[name.lower()] = factory
+        _instances.pop(name.lower(), None)
+
+
+def get_provider(name: Optional[str] = None) -> PriceProvider:
+    """Provider by name, defaulting to PRICE_PROVIDER (yfinance). Instances are shared per process."""
+    key = (name or os.getenv("PRICE_PROVIDER", "yfinance")).lower()
+    with _instances_lock:
+        if key not in _instances:
+            if key not in _factories:
+                raise ValueError(f"Unknown price provider {key!r}; available: {sorted(_factories)}")
+            _instances[key] = _factories[key]()
+        return _instances[key]
+
+
+def available_providers() -> List[str]:
+    return sorted(_factories)
+
+
+__all__ = ["PriceProvider", "YFinanceProvider", "YahooQueryProvider", "FileProvider",
+           "get_provider", "register_provider", "available_providers"]
@@ -0,0 +1,192 @@
+"""
+In-process columnar store of daily price history, one entry per security.
+
+Each security's history is held as contiguous NumPy arrays sorted by date:
+dates as int32 proleptic ordinals (date.toordinal()), float64 price/OHLC/adj
+close/volume (NaN where missing). Series are loaded lazily from
+security_price_dtl on first use, kept in LRU order and evicted once the total
+footprint exceeds the memory budget (PRICE_STORE_MAX_MB, default 64).
+
+Writers keep it current: SecurityPriceCRUD merges upserted rows into cached
+series (apply_upserts) and drops series touched by updates/deletes
+(invalidate). Readers (performance comparison, holdings as-of lookups,
+analytics) take array slices instead of re-querying and building
+SecurityPriceDtl objects.
+
+When a security has prices from several sources for the same date, the most
+recently updated row wins, both on load and on incremental merges.
+"""
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from datetime import date
+from threading import RLock
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from source_code.config import pg_db_conn_manager
+
+PRICE_STORE_MAX_MB = float(os.getenv("PRICE_STORE_MAX_MB", "64"))
+
+VALUE_FIELDS = ("price", "open_px", "high_px", "low_px", "close_px", "adj_close_px", "volume")
+
+
+def _to_float(value) -> float:
+    return float(value) if value is not None else np.nan
+
+
+class PriceSeries:
+    """Sorted, date-unique price arrays for one security."""
+
+    __slots__ = ("security_id", "dates") + VALUE_FIELDS
+
+    def __init__(self, security_id: int, dates: np.ndarray, **values: np.ndarray):
+        self.security_id = security_id
+        self.dates = np.asarray(dates, dtype=np.int32)
+        n = len(self.dates)
+        for field in VALUE_FIELDS:
+            arr = values.get(field)
+            setattr(self, field, np.asarray(arr, dtype=np.float64) if arr is not None else np.full(n, np.nan))
+
+    @classmethod
+    def from_rows(cls, security_id: int, rows: Iterable[dict]) -> "PriceSeries":
+        """Build from row dicts with price_date plus any VALUE_FIELDS; later rows win on equal dates."""
+        rows = list(rows)
+        dates = np.array([r["price_date"].toordinal() for r in rows], dtype=np.int32)
+        values = {f: np.array([_to_float(r.get(f)) for r in rows], dtype=np.float64) for f in VALUE_FIELDS}
+        return cls(security_id, dates, **values)._dedupe_sorted()
+
+    def _dedupe_sorted(self) -> "PriceSeries":
+        if len(self.dates) == 0:
+            return self
+        # Stable sort keeps input order within a date; keep the last occurrence of each date
+        order = np.argsort(self.dates, kind="stable")
+        dates = self.dates[order]
+        keep = np.append(dates[1:] != dates[:-1], True)
+        idx = order[keep]
+        return PriceSeries(self.security_id, self.dates[idx], **{f: getattr(self, f)[idx] for f in VALUE_FIELDS})
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + sum(getattr(self, f).nbytes for f in VALUE_FIELDS)
+
+    def merge(self, other: "PriceSeries") -> "PriceSeries":
+        """Return a new series with `other`'s points added; `other` wins on equal dates."""
+        dates = np.concatenate([self.dates, other.dates])
+        values = {f: np.concatenate([getattr(self, f), getattr(other, f)]) for f in VALUE_FIELDS}
+        return PriceSeries(self.security_id, dates, **values)._dedupe_sorted()
+
+    def slice(self, from_date: Optional[date] = None, to_date: Optional[date] = None) -> "PriceSeries":
+        """Points with from_date <= price_date <= to_date (array views, no copies)."""
+        lo = 0 if from_date is None else int(np.searchsorted(self.dates, from_date.toordinal(), side="left"))
+        hi = len(self.dates) if to_date is None else int(np.searchsorted(self.dates, to_date.toordinal(), side="right"))
+        return PriceSeries(self.security_id, self.dates[lo:hi], **{f: getattr(self, f)[lo:hi] for f in VALUE_FIELDS})
+
+    def as_of(self, on_date: date, field: str = "price") -> Optional[Tuple[date, float]]:
+        """Latest (price_date, value) on or before `on_date`, or None."""
+        idx = int(np.searchsorted(self.dates, on_date.toordinal(), side="right")) - 1
+        if idx < 0:
+            return None
+        return date.fromordinal(int(self.dates[idx])), float(getattr(self, field)[idx])
+
+    def iter_points(self, field: str = "price") -> Iterator[Tuple[date, float]]:
+        values = getattr(self, field)
+        for i in range(len(self.dates)):
+            yield date.fromordinal(int(self.dates[i])), float(values[i])
+
+
+def _load_from_db(security_id: int) -> PriceSeries:
+    rows = pg_db_conn_manager.fetch_data(
+        "SELECT DISTINCT ON (price_date) price_date, price, open_px, high_px, low_px, close_px, adj_close_px, volume "
+        "FROM security_price_dtl WHERE security_id = %s "
+        "ORDER BY price_date, last_updated_ts DESC",
+        (security_id,),
+    )
+    return PriceSeries.from_rows(security_id, rows)
+
+
+class PriceSeriesStore:
+    def __init__(self, max_bytes: int, loader: Callable[[int], PriceSeries] = _load_from_db):
+        self.max_bytes = max_bytes
+        self._loader = loader
+        self._series: "OrderedDict[int, PriceSeries]" = OrderedDict()
+        self._bytes = 0
+        # Per-security write counters; a load that raced with a write is not cached
+        self._versions: dict = {}
+        self._lock = RLock()
+
+    def get(self, security_id: int) -> PriceSeries:
+        """Cached series for a security, loading it on first use."""
+        with self._lock:
+            series = self._series.get(security_id)
+            if series is not None:
+                self._series.move_to_end(security_id)
+                return series
+            version = self._versions.get(security_id, 0)
+        # Load outside the lock so a slow query does not block readers of other securities
+        series = self._loader(security_id)
+        with self._lock:
+            # Empty results are not cached (no prices yet, or the query failed)
+            if len(series) and self._versions.get(security_id, 0) == version:
+                self._put(series)
+        return series
+
+    def get_many(self, security_ids: Iterable[int]) -> List[PriceSeries]:
+        return [self.get(sid) for sid in security_ids]
+
+    def _put(self, series: PriceSeries) -> None:
+        old = self._series.pop(series.security_id, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._series[series.security_id] = series
+        self._bytes += series.nbytes
+        # Evict least recently used series, but never the one just stored
+        while self._bytes > self.max_bytes and len(self._series) > 1:
+            _, evicted = self._series.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def apply_upserts(self, items: Iterable) -> None:
+        """
+        Merge written prices (objects with security_id, price_date and VALUE_FIELDS) into
+        cached series. Securities that are not cached are left to load lazily.
+        """
+        by_security: dict = {}
+        for item in items:
+            by_security.setdefault(item.security_id, []).append(
+                {"price_date": item.price_date, **{f: getattr(item, f, None) for f in VALUE_FIELDS}}
+            )
+        with self._lock:
+            for security_id, rows in by_security.items():
+                self._versions[security_id] = self._versions.get(security_id, 0) + 1
+                cached = self._series.get(security_id)
+                if cached is not None:
+                    self._put(cached.merge(PriceSeries.from_rows(security_id, rows)))
+
+    def invalidate(self, *security_ids: int) -> None:
+        with self._lock:
+            for security_id in security_ids:
+                self._versions[security_id] = self._versions.get(security_id, 0) + 1
+                old = self._series.pop(security_id, None)
+                if old is not None:
+                    self._bytes -= old.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._versions.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"securities": len(self._series), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+# Process-wide store used by CRUD hooks and readers
+price_series_store = PriceSeriesStore(int(PRICE_STORE_MAX_MB * 1024 * 1024))
+
+__all__ = ["PriceSeries", "PriceSeriesStore", "price_series_store", "VALUE_FIELDS"]
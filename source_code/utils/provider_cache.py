@@ -0,0 +1,181 @@
+"""
+On-disk cache for market-data provider responses (SQLite, standard library only).
+
+Two kinds of entries are stored:
+- history frames: one ticker's OHLCV rows for (provider, interval variant, start, end);
+- payloads: JSON documents such as yahooquery quote/profile data per (provider, kind, ticker).
+
+History for closed past spans never changes and is kept without expiry; spans
+ending within the last PROVIDER_CACHE_RECENT_DAYS days (default 5) expire after
+PROVIDER_CACHE_RECENT_TTL_SEC (default 3600). Payloads expire after
+PROVIDER_CACHE_PAYLOAD_TTL_SEC (default 43200).
+
+Settings are read from the environment on each call so .env files loaded at
+startup apply:
+- PROVIDER_CACHE_ENABLED   "true"/"1" turns the cache on (default off)
+- PROVIDER_CACHE_PATH      database file (default .cache/provider_cache.sqlite)
+- PROVIDER_CACHE_OFFLINE   "true"/"1" serves only from the cache and never calls providers
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from threading import Lock
+from typing import Any, Iterator, Optional
+
+import pandas as pd
+
+_TRUE = ("1", "true", "yes", "on")
+
+
+def _flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in _TRUE
+
+
+def enabled() -> bool:
+    return _flag("PROVIDER_CACHE_ENABLED") or offline()
+
+
+def offline() -> bool:
+    return _flag("PROVIDER_CACHE_OFFLINE")
+
+
+def _history_ttl(end_date: str) -> Optional[float]:
+    recent_days = int(os.getenv("PROVIDER_CACHE_RECENT_DAYS", "5"))
+    if date.fromisoformat(str(end_date)[:10]) < date.today() - timedelta(days=recent_days):
+        return None
+    return float(os.getenv("PROVIDER_CACHE_RECENT_TTL_SEC", "3600"))
+
+
+class ProviderCache:
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._initialized_path: Optional[str] = None
+        self._lock = Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path or os.getenv("PROVIDER_CACHE_PATH", os.path.join(".cache", "provider_cache.sqlite"))
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS history (provider TEXT, ticker TEXT, variant TEXT, "
+            "start_date TEXT, end_date TEXT, frame TEXT, expires_at REAL, "
+            "PRIMARY KEY (provider, ticker, variant, start_date, end_date))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS payload (provider TEXT, kind TEXT, ticker TEXT, body TEXT, "
+            "expires_at REAL, PRIMARY KEY (provider, kind, ticker))"
+        )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        path = self.path
+        with self._lock:
+            if self._initialized_path != path:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            if self._initialized_path != path:
+                self._init_schema(conn)
+                self._initialized_path = path
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---- history frames -------------------------------------------------
+
+    def get_frame(self, provider: str, ticker: str, variant: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """
+        Cached rows for one ticker, or None on a miss or expired entry (expired entries
+        are still served in offline mode). An empty frame is a cached 'no data'.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT frame, expires_at FROM history WHERE provider = ? AND ticker = ? AND variant = ? "
+                "AND start_date = ? AND end_date = ?",
+                (provider, ticker, variant, str(start_date), str(end_date)),
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time() and not offline()):
+            return None
+        frame = pd.read_json(io.StringIO(row[0]), orient="table")
+        return frame.reset_index(drop=True)
+
+    def put_frame(self, provider: str, ticker: str, variant: str, start_date: str, end_date: str,
+                  frame: pd.DataFrame) -> None:
+        ttl = _history_ttl(end_date)
+        expires_at = time.time() + ttl if ttl is not None else None
+        body = frame.reset_index(drop=True).to_json(orient="table", date_format="iso", index=False)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (provider, ticker, variant, str(start_date), str(end_date), body, expires_at),
+            )
+
+    # ---- JSON payloads --------------------------------------------------
+
+    def get_payload(self, provider: str, kind: str, ticker: str) -> Optional[Any]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT body, expires_at FROM payload WHERE provider = ? AND kind = ? AND ticker = ?",
+                (provider, kind, ticker),
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time() and not offline()):
+            return None
+        return json.loads(row[0])
+
+    def put_payload(self, provider: str, kind: str, ticker: str, body: Any, ttl: Optional[float] = None) -> None:
+        if ttl is None:
+            ttl = float(os.getenv("PROVIDER_CACHE_PAYLOAD_TTL_SEC", "43200"))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO payload VALUES (?, ?, ?, ?, ?)",
+                (provider, kind, ticker, json.dumps(body, default=str), time.time() + ttl),
+            )
+
+    # ---- maintenance ----------------------------------------------------
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            n = conn.execute("DELETE FROM history WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)).rowcount
+            n += conn.execute("DELETE FROM payload WHERE expires_at < ?", (now,)).rowcount
+        return n
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM history")
+            conn.execute("DELETE FROM payload")
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            history = conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            payloads = conn.execute("SELECT COUNT(*) FROM payload").fetchone()[0]
+        return {"path": self.path, "history_entries": history, "payload_entries": payloads}
+
+
+# Process-wide cache used by the provider modules
+provider_cache = ProviderCache()
+
+__all__ = ["ProviderCache", "provider_cache", "enabled", "offline"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or maintain the provider response cache")
+    parser.add_argument("action", choices=["stats", "purge", "clear"])
+    args = parser.parse_args()
+
+    if args.action == "purge":
+        print(f"Removed {provider_cache.purge_expired()} expired entries")
+    elif args.action == "clear":
+        provider_cache.clear()
+    print(provider_cache.stats())
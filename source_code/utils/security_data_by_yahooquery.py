@@ -2,6 +2,9 @@
 
 from yahooquery import Ticker
 
+from source_code.utils.call_governor import get_governor
+from source_code.utils.provider_cache import provider_cache, enabled as cache_enabled, offline as cache_offline
+
 asset_profile = "asset_profile"
 financial_data = "financial_data"
 key_stats = "key_stats"
@@ -19,21 +22,44 @@ def populate_data(in_dict, new_value):
 # define function to take a list of tickers and type of data needed. Once received, split the list into 50 at a time and request data.
 # After all data is received, combine the results into a single dictionary, for the type of data requested.
 # example, if asset profile data is needed, user will send 'asset_profile' as the data type.
+# When the provider cache is enabled, each ticker's data is served from / saved to it.
 def get_security_data(tickers_list, split_size:int = 50):
     # assert that the data type is valid
     # assert data_type in [asset_profile, financial_data, key_stats, price, summary_detail]
 
-    data = dict.fromkeys([asset_profile, financial_data, key_stats, price, summary_detail], None)
+    data_types = [asset_profile, financial_data, key_stats, price, summary_detail]
+    data = dict.fromkeys(data_types, None)
+    use_cache = cache_enabled()
+    to_fetch = list(tickers_list)
+    if use_cache:
+        to_fetch = []
+        for t in tickers_list:
+            cached = provider_cache.get_payload("yahooquery", "security_data", t)
+            if cached is None:
+                to_fetch.append(t)
+                continue
+            for data_type in data_types:
+                data[data_type] = populate_data(data[data_type], {t: cached.get(data_type)})
+        if cache_offline():
+            to_fetch = []
+
     # store data in a dictionary of lists for each data type requested
-    for i in range(0, len(tickers_list), split_size):
-        ticker_list = tickers_list[i:i+split_size]
+    for i in range(0, len(to_fetch), split_size):
+        ticker_list = to_fetch[i:i+split_size]
         ticker_data = Ticker(ticker_list, asynchronous=True)
 
-        data['asset_profile'] = populate_data(data['asset_profile'], ticker_data.asset_profile)
-        data['financial_data'] = populate_data(data['financial_data'], ticker_data.financial_data)
-        data['key_stats'] = populate_data(data['key_stats'], ticker_data.key_stats)
-        data['price'] = populate_data(data['price'], ticker_data.price)
-        data['summary_detail'] = populate_data(data['summary_detail'], ticker_data.summary_detail)
+        # Rate limited, retried and circuit-broken with the shared yahooquery governor
+        fetched = get_governor("yahooquery").call(
+            lambda: {data_type: getattr(ticker_data, data_type) for data_type in data_types})
+        for data_type in data_types:
+            data[data_type] = populate_data(data[data_type], fetched[data_type])
+        if use_cache:
+            for t in ticker_list:
+                payload = {data_type: fetched[data_type].get(t) if isinstance(fetched[data_type], dict) else None
+                           for data_type in data_types}
+                # Error strings (e.g. "Quote not found") are not cached
+                if isinstance(payload[price], dict):
+                    provider_cache.put_payload("yahooquery", "security_data", t, payload)
 
     return data
 
@@ -1,6 +1,21 @@
+import os
+from threading import Lock
+
 import yfinance as yf
 import pandas as pd
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
+
+from source_code.utils.call_governor import CallGovernor, RateLimitedError, get_governor
+from source_code.utils.provider_cache import provider_cache, enabled as cache_enabled, offline as cache_offline
+
+# Multi-ticker downloads are split into chunks; each chunk is one yf.download call that
+# fetches its tickers on up to YF_DOWNLOAD_MAX_WORKERS threads
+YF_DOWNLOAD_CHUNK_SIZE = int(os.getenv("YF_DOWNLOAD_CHUNK_SIZE", "100"))
+YF_DOWNLOAD_MAX_WORKERS = int(os.getenv("YF_DOWNLOAD_MAX_WORKERS", "4"))
+
+# yf.download collects results in module globals (yf.shared._DFS / _ERRORS) that every call
+# resets, so concurrent calls mix each other's tickers; only one runs at a time per process
+_download_lock = Lock()
 
 # function to get company data based on list of tickers
 # Install the library if not already installed
@@ -12,7 +27,7 @@ def get_company_info(ticker):
     """Fetches key company information for a given stock ticker from Yahoo Finance."""
     try:
         stock = yf.Ticker(ticker)
-        info = stock.info
+        info = get_governor("yfinance").call(lambda: stock.info)
         company_info = {
             "ticker": ticker,
             "name": info.get("longName"),
@@ -30,6 +45,114 @@ def get_company_info(ticker):
         return None
 
 
+def _to_long_frame(df_multi: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
+    """Reshape a yf.download frame (Date x (Ticker, Field)) into rows of Date, Ticker, fields."""
+    if df_multi is None or df_multi.empty:
+        return pd.DataFrame()
+    if not isinstance(df_multi.columns, pd.MultiIndex):
+        # Single ticker without a ticker level
+        df_multi = pd.concat({tickers[0]: df_multi}, axis=1)
+    df_flat = df_multi.stack(level=0, future_stack=True)
+    df_flat = df_flat.rename_axis(['Date', 'Ticker']).reset_index()
+    df_flat.columns.name = None
+    # Tickers with no data in the range come back as all-NaN rows
+    value_cols = [c for c in df_flat.columns if c not in ('Date', 'Ticker')]
+    return df_flat.dropna(subset=value_cols, how='all')
+
+
+def _download_chunk(chunk: List[str], start_date: str, end, interval: str, threads: int, kwargs: dict) -> pd.DataFrame:
+    with _download_lock:
+        df = yf.download(tickers=chunk, start=start_date, end=end, interval=interval, group_by='ticker',
+                         progress=False, threads=threads if threads > 1 else False, **kwargs)
+        # Read before the lock is released; the next call resets it
+        errors = dict(getattr(yf.shared, "_ERRORS", None) or {})
+    long_df = _to_long_frame(df, chunk)
+    if long_df.empty:
+        # yf.download reports per-ticker failures instead of raising; surface throttling so it is retried
+        if any("ratelimit" in str(errors.get(t, "")).replace(" ", "").lower()
+               or "too many requests" in str(errors.get(t, "")).lower() for t in chunk):
+            raise RateLimitedError(f"Yahoo Finance rate limited a chunk of {len(chunk)} tickers")
+    return long_df
+
+
+def download_history_frame(
+        tickers: List[str],
+        start_date: str,
+        end_date: str,
+        interval: str = "1d",
+        auto_adjust: bool | None = None,
+        chunk_size: int = YF_DOWNLOAD_CHUNK_SIZE,
+        max_workers: int = YF_DOWNLOAD_MAX_WORKERS,
+        raise_errors: bool = False,
+        governor: CallGovernor | None = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> pd.DataFrame:
+    """
+    Download history for many tickers as one long DataFrame with columns
+    Date, Ticker, Open, High, Low, Close, Volume (and Adj Close when not auto-adjusted),
+    ordered by Date then Ticker. end_date is inclusive.
+
+    Tickers are split into chunks of `chunk_size`, each fetched with one multi-ticker
+    yf.download call that uses at most `max_workers` threads. yf.download is not safe to run
+    concurrently, so chunks (and downloads from other threads) are fetched one at a time.
+    A failing chunk is logged and skipped so one bad batch does not lose the others,
+    unless raise_errors is set (callers that checkpoint work need to know it failed).
+    Every request goes through `governor` (default: the shared "yfinance" governor) for
+    rate limiting, retries with backoff and circuit breaking. `progress` receives
+    {"chunks_done", "chunks_total", "tickers_done", "tickers_total"} after every chunk.
+    """
+    tickers = sorted({t.strip().upper() for t in tickers if t and t.strip()})
+    if not tickers:
+        return pd.DataFrame()
+    # Per-ticker responses are served from / saved to the provider cache when it is enabled
+    use_cache = cache_enabled()
+    variant = f"{interval}|auto_adjust={auto_adjust}"
+    frames: List[pd.DataFrame] = []
+    if use_cache:
+        misses = []
+        for t in tickers:
+            hit = provider_cache.get_frame("yfinance", t, variant, start_date, end_date)
+            if hit is None:
+                misses.append(t)
+            else:
+                frames.append(hit)
+        print(f"--- Provider cache: {len(tickers) - len(misses)} hit(s), {len(misses)} miss(es) ---")
+        tickers = [] if cache_offline() else misses
+    # yfinance treats end as exclusive; move it to the next day so end_date is included
+    end = pd.to_datetime(end_date) + pd.Timedelta(days=1)
+    chunks = [tickers[i:i + max(1, chunk_size)] for i in range(0, len(tickers), max(1, chunk_size))]
+
+    governor = governor or get_governor("yfinance")
+    kwargs = {"auto_adjust": auto_adjust} if auto_adjust is not None else {}
+
+    def fetch(chunk: List[str]) -> pd.DataFrame:
+        try:
+            long_df = governor.call(_download_chunk, chunk, start_date, end, interval, max(1, max_workers), kwargs)
+            if use_cache and not long_df.empty:
+                # Empty results are not cached; yfinance reports transient failures as missing data
+                for t, rows in long_df.groupby('Ticker', sort=False):
+                    provider_cache.put_frame("yfinance", t, variant, start_date, end_date, rows)
+            return long_df
+        except Exception as e:
+            print(f"Download failed for chunk starting {chunk[0]} ({len(chunk)} tickers): {e}")
+            if raise_errors:
+                raise
+            return pd.DataFrame()
+
+    if chunks:
+        print(f"--- Downloading data for {len(tickers)} tickers in {len(chunks)} chunk(s) from {start_date} to {end_date} ---")
+        for done, chunk in enumerate(chunks, start=1):
+            long_df = fetch(chunk)
+            if not long_df.empty:
+                frames.append(long_df)
+            if progress is not None:
+                progress({"chunks_done": done, "chunks_total": len(chunks),
+                          "tickers_done": min(len(tickers), done * max(1, chunk_size)), "tickers_total": len(tickers)})
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True).sort_values(['Date', 'Ticker'], kind='stable').reset_index(drop=True)
+
+
 def get_historical_data_list(
         tickers: List[str],
         start_date: str,
@@ -45,61 +168,22 @@ def get_historical_data_list(
     Args:
         tickers: A list of stock ticker symbols (e.g., ['AAPL', 'MSFT']).
         start_date: The start date in 'YYYY-MM-DD' format.
-        end_date: The end date in 'YYYY-MM-DD' format (exclusive).
+        end_date: The end date in 'YYYY-MM-DD' format (inclusive).
         interval: Data frequency ('1d' for daily, '1wk' for weekly, etc.).
 
     Returns:
         A list of dictionaries, where each dictionary represents one day's
         data for one ticker. Returns an empty list on failure.
     """
-    # library doesn't give data for the last date - ex, if data is requested with 10/20 as the start date and end date, it returns no data.
-    # To fix, move the end date to the next day.
-    end_date = pd.to_datetime(end_date) + pd.Timedelta(days=1)
-    print(f"--- Downloading data for {len(tickers)} tickers from {start_date} to {end_date} ---")
-
     try:
-        # 1. Bulk Download Data
-        # group_by='ticker' ensures the Ticker symbol is the top level in the columns
-        df_multi = yf.download(
-            tickers=tickers,
-            start=start_date,
-            end=end_date,
-            interval=interval,
-            group_by='ticker',
-            progress=False  # Suppress download messages for cleaner output
-        )
+        df_flat = download_history_frame(tickers, start_date, end_date, interval=interval)
 
         # Check if the dataframe is empty
-        if df_multi.empty:
+        if df_flat.empty:
             print("No data retrieved. Check ticker symbols or date range.")
             return [], []
 
-        # 2. Flatten the MultiIndex DataFrame (Date and Ticker to columns)
-        # Stack the first level of the column MultiIndex (the Ticker) into a row index
-        df_flat = df_multi.stack(level=0)
-
-        # The index is now (Date, Ticker). Convert these index levels back to columns.
-        df_flat = df_flat.rename_axis(['Date', 'Ticker']).reset_index()
-
-        # 3. Rename columns for clarity (yfinance uses spaces, which is often undesirable)
-        # Old: ['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Adj_Close', 'Volume']
-        # New:
-        columns = ['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume']
-        """
-            Sample data for df_multi:
-            df_multi = {DataFrame} [('ZS', 'Open'), ('ZS', 'High'), ('ZS', 'Low'), ('ZS', 'Close'), ('ZS', 'Volume'), ('NVDA', 'Open'), ('NVDA', 'High'), ('NVDA', 'Low'), ('NVDA', 'Close'), ('NVDA', 'Volume'), ('MSFT', 'Open'), ('MSFT', 'High'), ('MSFT', 'Low'), ('MSFT', 'Close'), ('MSFT', 
-             AAPL = {DataFrame} ['Open', 'High', 'Low', 'Close', 'Volume'] [Date                                                                ] [2025-10-01  255.039993  258.790009  254.929993  255.449997  48713900] [2025-10-02  256.579987  258.179993  254.149994  257.130005  42630200] [2025-10-03  254.669998  259.239990  253.949997  258.019989  49155600]
-             MSFT = {DataFrame} ['Open', 'High', 'Low', 'Close', 'Volume'] [Date                                                                ] [2025-10-01  514.799988  520.510010  511.690002  519.710022  22632300] [2025-10-02  517.640015  521.599976  510.679993  515.739990  21222900] [2025-10-03  517.099976  520.489990  515.000000  517.349976  15112300]
-             NVDA = {DataFrame} ['Open', 'High', 'Low', 'Close', 'Volume'] [Date                                                                 ] [2025-10-01  185.240005  188.139999  183.899994  187.240005  173844900] [2025-10-02  189.600006  191.050003  188.059998  188.889999  136805800] [2025-10-03  189.190002  190.360001  185.380005  187.619995  137596900]
-        """
-        # check if Adj Close is in df_multi (a dataframe) based on the first security in the list
-        # column_tuple = (tickers[0] + "/" + 'Adj Close')
-        # if column_tuple in df_multi.columns:
-        #     columns.append('Adj Close')
-
-        # df_flat.columns = columns
-
-        # 4. Convert the DataFrame to the desired list of dictionaries
+        # Columns: Date, Ticker, Open, High, Low, Close, Volume (+ Adj Close when present)
         data_list = df_flat.to_dict('records')
 
         print("Download successful and data restructured.")
@@ -107,7 +191,7 @@ def get_historical_data_list(
 
     except Exception as e:
         print(f"An error occurred during data retrieval: {e}")
-        return []
+        return [], []
 
 
 # --- Example Usage ---
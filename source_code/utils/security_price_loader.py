@@ -11,9 +11,15 @@ Expected input columns (case-insensitive, flexible names):
 - Volume
 - Adj Close (adj_close, adj_close_px)
 
-Each row is mapped to a SecurityPriceDtlInput. Ticker is resolved to security_id
-using security_dtl. Unknown tickers are skipped. The loader uses batch upsert for
-performance and returns a summary dict (counts and a few sample details).
+Files are loaded in "vectorized" mode by default: headers are normalized once,
+columns are parsed in bulk (the date format is detected once per file, numbers
+go through pd.to_numeric), invalid rows are found with boolean masks and the
+remaining rows are upserted with COPY (see price_frame_ingest). Files are read and
+upserted in batches of FILE_BATCH_ROWS rows, so memory stays bounded and progress
+can be reported per batch. The "rows" mode
+maps each row to a SecurityPriceDtlInput and uses batch upsert. Ticker is
+resolved to security_id using security_dtl; unknown tickers are skipped. Both
+modes return the same summary dict (counts and a few sample details).
 
 Example CSV line:
 Date,Ticker,Open,High,Low,Close,Volume,Adj Close
@@ -23,7 +29,9 @@ from __future__ import annotations
 
 import csv
 from datetime import datetime, date as _date
-from typing import Dict, Any, Tuple, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
 
 from source_code.crud.security_crud_operations import security_crud
 from source_code.crud.security_price_crud_operations import security_price_crud
@@ -31,6 +39,10 @@ from source_code.models.models import SecurityPriceDtlInput
 
 # Default price source id (Yahoo Finance) used elsewhere in the codebase
 DEFAULT_PRICE_SOURCE_ID = 1759649078984028
+# Rows per read + COPY batch in the vectorized file mode
+FILE_BATCH_ROWS = 100_000
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
 
 
 def _normalize_header(h: str) -> str:
@@ -47,6 +59,15 @@ def _get_row_val(row: Dict[str, str], *keys: str) -> str:
     return ""
 
 
+_DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%m/%d/%Y",
+    "%Y/%m/%d",
+    "%d-%b-%Y",
+]
+
+
 def _parse_date(s: str) -> _date | None:
     if isinstance(s, _date):
         return s
@@ -54,14 +75,7 @@ def _parse_date(s: str) -> _date | None:
     s = (s or "").strip()
     if not s:
         return None
-    fmts = [
-        "%Y-%m-%d",
-        "%Y-%m-%d %H:%M:%S",
-        "%m/%d/%Y",
-        "%Y/%m/%d",
-        "%d-%b-%Y",
-    ]
-    for f in fmts:
+    for f in _DATE_FORMATS:
         try:
             return datetime.strptime(s, f).date()
         except Exception:
@@ -98,28 +112,182 @@ def _load_ticker_map(include_private: bool = False) -> Dict[str, Dict[str, Any]]
     return out
 
 
+# Normalized header -> canonical frame column, for the vectorized mode
+_HEADER_ALIASES = {
+    "date": "Date", "price_date": "Date",
+    "ticker": "Ticker", "symbol": "Ticker",
+    "open": "Open", "open_px": "Open",
+    "high": "High", "high_px": "High",
+    "low": "Low", "low_px": "Low",
+    "close": "Close", "close_px": "Close",
+    "adj_close": "Adj Close", "adj_close_px": "Adj Close",
+    "volume": "Volume",
+}
+_NUMERIC_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+def _canonical_columns(headers: List[str]) -> Dict[str, str]:
+    """Raw header -> canonical column; the first header matching an alias wins."""
+    mapping: Dict[str, str] = {}
+    for h in headers:
+        target = _HEADER_ALIASES.get(_normalize_header(h))
+        if target and target not in mapping.values():
+            mapping[h] = target
+    return mapping
+
+
+def _detect_date_format(values: pd.Series) -> Optional[str]:
+    """First format in _DATE_FORMATS that parses the first non-empty value."""
+    sample = next((v for v in values if v), None)
+    if sample is None:
+        return None
+    for f in _DATE_FORMATS:
+        try:
+            datetime.strptime(sample, f)
+            return f
+        except ValueError:
+            pass
+    return None
+
+
+def _bulk_parse_dates(values: pd.Series) -> pd.Series:
+    values = values.fillna("").astype(str).str.strip()
+    fmt = _detect_date_format(values)
+    if fmt is None:
+        # Unknown layout, e.g. ISO timestamps with offsets: parse the date part
+        fmt, values = "%Y-%m-%d", values.str[:10]
+    parsed = pd.to_datetime(values, format=fmt, errors="coerce").dt.date.copy()
+    # Rows in another layout than the detected one fall back to the per-value parser
+    stragglers = parsed.isna() & (values != "")
+    if stragglers.any():
+        parsed[stragglers] = values[stragglers].map(_parse_date)
+    return parsed
+
+
+def _bulk_parse_float(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("float64")
+    # Strings: drop thousands separators; nan/na/null/none and junk become NaN
+    return pd.to_numeric(values.astype(str).str.strip().str.replace(",", "", regex=False), errors="coerce")
+
+
+def load_security_prices_from_frame(
+    frame: pd.DataFrame,
+    price_source_id: int = DEFAULT_PRICE_SOURCE_ID,
+    default_currency: str = "USD",
+    addl_notes: str | None = "CSV Loader",
+    include_private: bool = False,
+) -> Dict[str, Any]:
+    """
+    Vectorized loader: validate and upsert a frame with loader headers (see module docstring).
+    Returns the same summary dict as load_security_prices_from_list_of_dicts.
+    """
+    # Imported here: price_frame_ingest depends on DEFAULT_PRICE_SOURCE_ID from this module
+    from source_code.utils import price_frame_ingest
+
+    frame = frame.rename(columns=_canonical_columns(list(frame.columns)))
+    n = len(frame)
+    blank = pd.Series("", index=frame.index)
+    raw_dates = frame["Date"].fillna("").astype(str) if "Date" in frame else blank
+    tickers = frame["Ticker"].fillna("").astype(str).str.strip().str.upper() if "Ticker" in frame else blank
+
+    clean = pd.DataFrame({"Date": _bulk_parse_dates(raw_dates), "Ticker": tickers})
+    for col in _NUMERIC_COLUMNS:
+        clean[col] = _bulk_parse_float(frame[col]) if col in frame else float("nan")
+
+    bad = clean["Date"].isna() | (clean["Ticker"] == "") | clean["Close"].isna()
+    bad_rows = frame.index[bad][:20]
+    # Line numbers as in the row mode: the header is line 1
+    skipped_bad_data: List[Tuple[int, str]] = [
+        (int(i) + 2, "Missing/invalid required fields (date/ticker/close). "
+                     f"Raw: date='{raw_dates[i].strip()}', ticker='{tickers[i]}'")
+        for i in bad_rows
+    ]
+    clean = clean[~bad]
+    clean["Date"] = pd.to_datetime(clean["Date"])
+
+    ingest = price_frame_ingest.ingest_price_frame(
+        clean, price_source_id=price_source_id, addl_notes=addl_notes or "",
+        default_currency=default_currency, include_private=include_private,
+    )
+    unknown = ingest["skipped_unknown_ticker"]
+    summary = {
+        "read": n,
+        "prepared": int((~clean["Ticker"].isin(unknown)).sum()),
+        "total": ingest["total"],
+        "inserted": ingest["inserted"],
+        "updated": ingest["updated"],
+        "skipped_unknown_ticker": unknown,
+        "skipped_unknown_ticker_count": len(unknown),
+        "skipped_bad_data": skipped_bad_data,
+    }
+    if not ingest["total"]:
+        summary["message"] = "No valid rows to upsert"
+
+    print("Security Price Loader Summary:")
+    print(summary)
+    return summary
+
+
+def _merge_summaries(total: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    unknown = sorted(set(total["skipped_unknown_ticker"]) | set(part["skipped_unknown_ticker"]))
+    merged = {key: total[key] + part[key] for key in ("read", "prepared", "total", "inserted", "updated")}
+    merged.update(skipped_unknown_ticker=unknown, skipped_unknown_ticker_count=len(unknown),
+                  skipped_bad_data=(total["skipped_bad_data"] + part["skipped_bad_data"])[:20])
+    if not merged["total"]:
+        merged["message"] = "No valid rows to upsert"
+    return merged
+
+
 def load_security_prices_from_file(
     file_path: str,
     price_source_id: int = DEFAULT_PRICE_SOURCE_ID,
     default_currency: str = "USD",
     addl_notes: str | None = "CSV Loader",
     include_private: bool = False,
+    mode: str = "vectorized",
+    batch_rows: int = FILE_BATCH_ROWS,
+    progress: Optional[ProgressCallback] = None,
 ) -> Dict[str, Any]:
+    """
+    Load security prices from the CSV at file_path and upsert into security_price_dtl.
+    mode is "vectorized" (bulk column parsing + COPY per `batch_rows` rows, default) or
+    "rows" (per-row models). In vectorized mode `progress` receives
+    {"batches", "rows_read", "rows_saved"} after every batch.
+    """
+    if mode not in ("vectorized", "rows"):
+        raise ValueError(f"Unknown loader mode {mode!r}; use 'vectorized' or 'rows'")
+    empty = {"read": 0, "prepared": 0, "total": 0, "inserted": 0}
+
+    if mode == "vectorized":
+        summary: Optional[Dict[str, Any]] = None
+        try:
+            # Every column as text: the loader parses dates and numbers itself. Batches keep a
+            # continuous row index, so reported line numbers match the file; a key repeated in a
+            # later batch is upserted again and the last occurrence still wins.
+            with pd.read_csv(file_path, dtype=str, keep_default_na=False, encoding="utf-8-sig",
+                             chunksize=max(1, batch_rows)) as reader:
+                for batches, frame in enumerate(reader, start=1):
+                    part = load_security_prices_from_frame(frame, price_source_id, default_currency, addl_notes,
+                                                           include_private)
+                    summary = part if summary is None else _merge_summaries(summary, part)
+                    if progress is not None:
+                        progress({"batches": batches, "rows_read": summary["read"], "rows_saved": summary["total"]})
+        except pd.errors.EmptyDataError:
+            return empty
+        return summary if summary is not None else empty
+
     # build a list of dicts
     rows: List[Dict[str, str]] = []
     with open(file_path, "r", newline="", encoding="utf-8-sig") as f:
         reader = csv.DictReader(f)
         if not reader.fieldnames:
-            return {
-                "read": 0,
-                "prepared": 0,
-                "total": 0,
-                "inserted": 0,
-            }
+            return empty
         for row in reader:
             rows.append(row)
 
-    return rows
+    return load_security_prices_from_list_of_dicts(rows, price_source_id, default_currency, addl_notes,
+                                                   include_private)
 
 
 def load_security_prices_from_list_of_dicts(
@@ -130,8 +298,8 @@ def load_security_prices_from_list_of_dicts(
     include_private: bool = False,
 ) -> Dict[str, Any]:
     """
-    Load security prices from CSV at file_path and upsert into security_price_dtl.
-    Returns a summary dict with counts and samples.
+    Load security prices from CSV rows (DictReader dicts) one row at a time and upsert
+    into security_price_dtl. Returns a summary dict with counts and samples.
     """
     ticker_map = _load_ticker_map(include_private=include_private)
 
@@ -235,7 +403,8 @@ def load_security_prices_from_list_of_dicts(
     return summary
 
 
-__all__ = ["load_security_prices_from_file", "DEFAULT_PRICE_SOURCE_ID"]
+__all__ = ["load_security_prices_from_file", "load_security_prices_from_frame",
+           "load_security_prices_from_list_of_dicts", "DEFAULT_PRICE_SOURCE_ID"]
 
 
 if __name__ == "__main__":
@@ -246,6 +415,8 @@ if __name__ == "__main__":
     parser.add_argument("--currency", default="USD", help="Default price currency if security has none (default: USD)")
     parser.add_argument("--notes", default="CSV Loader", help="Additional notes stored with each price row")
     parser.add_argument("--include-private", action="store_true", help="Include private securities when resolving tickers")
+    parser.add_argument("--mode", choices=["vectorized", "rows"], default="vectorized",
+                        help="Bulk column parsing with COPY, or the per-row loader (default: vectorized)")
 
     args = parser.parse_args()
     summary = load_security_prices_from_file(
@@ -254,6 +425,7 @@ if __name__ == "__main__":
         default_currency=args.currency,
         addl_notes=args.notes,
         include_private=args.include_private,
+        mode=args.mode,
     )
     # Pretty print summary
     import json
@@ -0,0 +1,204 @@
+"""
+Rule-based exchange trading calendars for price date math.
+
+A calendar is a weekmask plus a list of holiday rules; each rule maps a year to
+the holiday date (or None when it does not apply that year). Holidays are
+expanded once for the supported year range into a numpy busdaycalendar, so
+is_session / sessions_in_range / previous_session work on whole arrays of
+dates with numpy's business-day functions.
+
+NYSE is registered by default. Other exchanges can be added with
+register_calendar(TradingCalendar("XLON", [...rules...])).
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+HolidayRule = Callable[[int], Optional[date]]
+DateLike = Union[date, str, np.datetime64]
+
+FIRST_YEAR = 1970
+LAST_YEAR = 2100
+
+
+# ---- rule helpers -------------------------------------------------------
+
+def nth_weekday(month: int, weekday: int, n: int) -> HolidayRule:
+    """n-th `weekday` (Mon=0) of `month`; n=-1 for the last one."""
+    def rule(year: int) -> date:
+        if n > 0:
+            first = date(year, month, 1)
+            return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+        last = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)) - timedelta(days=1)
+        return last - timedelta(days=(last.weekday() - weekday) % 7)
+    return rule
+
+
+def fixed(month: int, day: int, observed: bool = True, saturday_to_friday: bool = True) -> HolidayRule:
+    """
+    Fixed-date holiday. When observed, Sunday moves to Monday and Saturday to the
+    preceding Friday (unless saturday_to_friday is False, then it is not observed).
+    """
+    def rule(year: int) -> Optional[date]:
+        d = date(year, month, day)
+        if not observed:
+            return d
+        if d.weekday() == 6:
+            return d + timedelta(days=1)
+        if d.weekday() == 5:
+            return d - timedelta(days=1) if saturday_to_friday else None
+        return d
+    return rule
+
+
+def easter_sunday(year: int) -> date:
+    # Anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def easter_offset(days: int) -> HolidayRule:
+    return lambda year: easter_sunday(year) + timedelta(days=days)
+
+
+def since(first_year: int, rule: HolidayRule) -> HolidayRule:
+    """Apply `rule` only from `first_year` on."""
+    return lambda year: rule(year) if year >= first_year else None
+
+
+# ---- calendar -----------------------------------------------------------
+
+def _to_datetime64(dates) -> np.ndarray:
+    return np.asarray(dates, dtype="datetime64[D]")
+
+
+class TradingCalendar:
+    def __init__(self, name: str, rules: Sequence[HolidayRule], weekmask: str = "1111100",
+                 extra_holidays: Iterable[date] = ()):
+        self.name = name
+        self.rules = list(rules)
+        self.weekmask = weekmask
+        self.extra_holidays = list(extra_holidays)
+        self._busdaycal: Optional[np.busdaycalendar] = None
+        self._lock = Lock()
+
+    def holidays(self, start_year: int = FIRST_YEAR, end_year: int = LAST_YEAR) -> List[date]:
+        days = set(d for d in self.extra_holidays if start_year <= d.year <= end_year)
+        for year in range(start_year, end_year + 1):
+            for rule in self.rules:
+                d = rule(year)
+                if d is not None and d.weekday() < 5:
+                    days.add(d)
+        return sorted(days)
+
+    @property
+    def busdaycal(self) -> np.busdaycalendar:
+        if self._busdaycal is None:
+            with self._lock:
+                if self._busdaycal is None:
+                    self._busdaycal = np.busdaycalendar(weekmask=self.weekmask,
+                                                        holidays=_to_datetime64(self.holidays()))
+        return self._busdaycal
+
+    def is_session(self, dates: Union[DateLike, Sequence[DateLike], np.ndarray]):
+        """True where the date is a trading session; accepts one date or an array of dates."""
+        result = np.is_busday(_to_datetime64(dates), busdaycal=self.busdaycal)
+        return bool(result) if np.ndim(result) == 0 else result
+
+    def sessions_in_range(self, start: DateLike, end: DateLike) -> np.ndarray:
+        """Sessions in [start, end] as a sorted datetime64[D] array."""
+        lo, hi = _to_datetime64(start), _to_datetime64(end)
+        if hi < lo:
+            return np.array([], dtype="datetime64[D]")
+        days = np.arange(lo, hi + 1, dtype="datetime64[D]")
+        return days[np.is_busday(days, busdaycal=self.busdaycal)]
+
+    def session_count(self, start: DateLike, end: DateLike) -> int:
+        """Number of sessions in [start, end]."""
+        lo, hi = _to_datetime64(start), _to_datetime64(end)
+        return max(0, int(np.busday_count(lo, hi + 1, busdaycal=self.busdaycal)))
+
+    def previous_session(self, d: DateLike) -> date:
+        """Latest session strictly before `d`."""
+        prev = np.busday_offset(_to_datetime64(d) - 1, 0, roll="backward", busdaycal=self.busdaycal)
+        return prev.astype(date)
+
+    def next_session(self, d: DateLike) -> date:
+        """Earliest session strictly after `d`."""
+        nxt = np.busday_offset(_to_datetime64(d) + 1, 0, roll="forward", busdaycal=self.busdaycal)
+        return nxt.astype(date)
+
+    def rollback(self, d: DateLike) -> date:
+        """`d` itself when it is a session, otherwise the previous session."""
+        return np.busday_offset(_to_datetime64(d), 0, roll="backward", busdaycal=self.busdaycal).astype(date)
+
+
+NYSE = TradingCalendar("NYSE", [
+    fixed(1, 1, saturday_to_friday=False),  # New Year's Day; not moved back into the prior year
+    since(1998, nth_weekday(1, 0, 3)),      # Martin Luther King Jr. Day
+    nth_weekday(2, 0, 3),                   # Washington's Birthday
+    easter_offset(-2),                      # Good Friday
+    nth_weekday(5, 0, -1),                  # Memorial Day
+    since(2022, fixed(6, 19)),              # Juneteenth
+    fixed(7, 4),                            # Independence Day
+    nth_weekday(9, 0, 1),                   # Labor Day
+    nth_weekday(11, 3, 4),                  # Thanksgiving
+    fixed(12, 25),                          # Christmas
+], extra_holidays=[
+    date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),  # September 11
+    date(2004, 6, 11),   # Reagan funeral
+    date(2007, 1, 2),    # Ford funeral
+    date(2012, 10, 29), date(2012, 10, 30),  # Hurricane Sandy
+    date(2018, 12, 5),   # G. H. W. Bush funeral
+    date(2025, 1, 9),    # Carter funeral
+])
+
+_calendars: Dict[str, TradingCalendar] = {"NYSE": NYSE}
+
+
+def register_calendar(calendar: TradingCalendar) -> None:
+    _calendars[calendar.name.upper()] = calendar
+
+
+def get_calendar(exchange: str = "NYSE") -> TradingCalendar:
+    try:
+        return _calendars[exchange.upper()]
+    except KeyError:
+        raise ValueError(f"No trading calendar registered for {exchange!r}")
+
+
+__all__ = ["TradingCalendar", "NYSE", "get_calendar", "register_calendar",
+           "nth_weekday", "fixed", "easter_offset", "easter_sunday", "since"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List trading sessions or holidays for an exchange")
+    parser.add_argument("start", type=date.fromisoformat)
+    parser.add_argument("end", type=date.fromisoformat)
+    parser.add_argument("--exchange", default="NYSE")
+    parser.add_argument("--holidays", action="store_true", help="List holidays instead of sessions")
+    args = parser.parse_args()
+
+    cal = get_calendar(args.exchange)
+    if args.holidays:
+        for h in cal.holidays(args.start.year, args.end.year):
+            if args.start <= h <= args.end:
+                print(h.isoformat())
+    else:
+        for s in cal.sessions_in_range(args.start, args.end):
+            print(s)
@@ -0,0 +1,51 @@
+"""
+Content hashes for idempotent transaction imports.
+
+A transaction's hash is a SHA-256 over its natural fields (portfolio, security,
+platform, date, type, quantity, price and amount). Statements legitimately contain
+identical rows (e.g. two equal buys on one day), so the n-th identical row of an
+import also hashes its ordinal n; re-importing the same or an overlapping
+statement reproduces the same hashes and only new rows are inserted.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, List, Optional, Sequence
+
+from source_code.models.models import TransactionDtl
+
+
+def _num(value) -> str:
+    # Normalize floats so 10, 10.0 and 10.0000000001 hash identically
+    return f"{float(value or 0):.6f}"
+
+
+def natural_key(txn: TransactionDtl) -> str:
+    return "|".join((
+        str(txn.portfolio_id),
+        str(txn.security_id),
+        str(txn.external_platform_id),
+        txn.transaction_date.isoformat(),
+        str(txn.transaction_type).upper(),
+        _num(txn.transaction_qty),
+        _num(txn.transaction_price),
+        _num(txn.total_inv_amt),
+    ))
+
+
+def content_hashes(txns: Sequence[TransactionDtl], occurrences: Optional[Dict[str, int]] = None) -> List[str]:
+    """
+    Hash each transaction's natural key plus its occurrence ordinal.
+    Pass the same `occurrences` dict for every batch of one import so ordinals
+    continue across batches.
+    """
+    seen = occurrences if occurrences is not None else {}
+    hashes: List[str] = []
+    for txn in txns:
+        key = natural_key(txn)
+        seen[key] = seen.get(key, 0) + 1
+        hashes.append(hashlib.sha256(f"{key}#{seen[key]}".encode("utf-8")).hexdigest())
+    return hashes
+
+
+__all__ = ["content_hashes", "natural_key"]
@@ -0,0 +1,284 @@
+"""
+Streaming CSV import pipeline for transactions.
+
+The uploaded file is read incrementally (row by row from the underlying binary
+stream), rows are validated and resolved in chunks of `chunk_size`, and every
+chunk is written with one multi-row INSERT (transaction_crud.insert_many) and
+committed on its own. Only the current chunk and a bounded sample of errors are
+held in memory, so very large broker exports import with flat memory.
+
+Rows are content-hashed; rows already present from an earlier import of the same
+or an overlapping statement are counted as skipped instead of inserted again.
+
+Two row layouts are supported (headers are case-insensitive, spaces allowed):
+- by id:   portfolio_id, security_id, external_platform_id, transaction_date,
+           transaction_type, transaction_qty, transaction_price, [total_inv_amt], [fees...]
+- by name: portfolio_name, security_ticker, external_platform_name, transaction_date,
+           transaction_type, transaction_qty, transaction_price, [total_inv_amt], [fees...]
+
+Parquet uploads use the by-id layout (load_transactions_from_parquet); rows are
+read one row-group batch at a time and go through the same chunked pipeline.
+
+All loaders return the same compact summary:
+{"read", "inserted", "skipped", "excluded", "chunks", "failed_chunks", "errors": [{"row", "reason"}, ...], "errors_truncated"}
+"""
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+from datetime import datetime, date as _date
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from source_code.crud.external_platform_crud_operations import external_platform_crud
+from source_code.crud.portfolio_crud_operations import portfolio_crud
+from source_code.crud.security_crud_operations import security_crud
+from source_code.crud.transaction_crud_operations import transaction_crud
+from source_code.models.models import TransactionDtlInput
+from source_code.utils import columnar_io
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_ERROR_SAMPLES = 20
+
+BY_ID_REQUIRED = {
+    "portfolio_id", "security_id", "external_platform_id", "transaction_date", "transaction_type",
+    "transaction_qty", "transaction_price",
+}
+BY_NAME_REQUIRED = {
+    "portfolio_name", "security_ticker", "external_platform_name",
+    "transaction_date", "transaction_type", "transaction_qty", "transaction_price",
+}
+FEE_FIELDS = (
+    "transaction_fee", "transaction_fee_percent", "carry_fee", "carry_fee_percent",
+    "management_fee", "management_fee_percent", "external_manager_fee", "external_manager_fee_percent",
+)
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class CsvHeaderError(ValueError):
+    """Raised when the CSV is empty or misses required headers."""
+
+
+def _normalize_header(h: str) -> str:
+    return (h or "").strip().lower().replace(" ", "_")
+
+
+def open_csv_stream(binary_file: BinaryIO, required: set[str]) -> csv.DictReader:
+    """
+    Wrap a binary file object in a DictReader that decodes lazily (utf-8 with optional BOM).
+    Headers are normalized once, so rows can be read with plain lower_snake_case keys.
+    """
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    if not reader.fieldnames:
+        raise CsvHeaderError("Empty file")
+    reader.fieldnames = [_normalize_header(h) for h in reader.fieldnames]
+    missing = required - set(reader.fieldnames)
+    if missing:
+        raise CsvHeaderError(f"Missing required CSV headers: {', '.join(sorted(missing))}")
+    return reader
+
+
+def _iter_chunks(reader: Iterable[Dict[str, str]], chunk_size: int,
+                 first_row: int = 2) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    chunk: List[Tuple[int, Dict[str, str]]] = []
+    # CSV header is line 1, so data rows start at 2
+    for row_num, row in enumerate(reader, start=first_row):
+        chunk.append((row_num, row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _val(row: Dict[str, str], key: str) -> str:
+    return (row.get(key) or "").strip()
+
+
+def _num(row: Dict[str, str], key: str, default: float = 0.0) -> float:
+    v = _val(row, key)
+    return float(v) if v else default
+
+
+def _common_fields(row: Dict[str, str]) -> Dict[str, Any]:
+    ttype = _val(row, "transaction_type")
+    if not ttype:
+        raise ValueError("transaction_type required")
+    qty = float(_val(row, "transaction_qty"))
+    price = float(_val(row, "transaction_price"))
+    tdate_str = _val(row, "transaction_date")
+    tdate = datetime.strptime(tdate_str, "%Y-%m-%d").date() if tdate_str else _date.today()
+    fields: Dict[str, Any] = {
+        "transaction_date": tdate,
+        "transaction_type": ttype,
+        "transaction_qty": qty,
+        "transaction_price": price,
+        "total_inv_amt": _num(row, "total_inv_amt", qty * price),
+    }
+    for f in FEE_FIELDS:
+        fields[f] = _num(row, f)
+    return fields
+
+
+def _parse_by_id_row(row: Dict[str, str], _maps: Any = None) -> TransactionDtlInput:
+    try:
+        return TransactionDtlInput(
+            portfolio_id=int(_val(row, "portfolio_id")),
+            security_id=int(_val(row, "security_id")),
+            external_platform_id=int(_val(row, "external_platform_id")),
+            **_common_fields(row),
+        )
+    except ValueError:
+        raise ValueError("invalid value(s)")
+
+
+def _load_name_maps() -> Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
+    # Reference tables are small; load once per import and resolve each chunk against them
+    portfolio_map = {p.name.strip().lower(): p.portfolio_id for p in portfolio_crud.list_all()}
+    security_map = {s.ticker.strip().lower(): s.security_id for s in security_crud.list_all()}
+    platform_map = {e.name.strip().lower(): e.external_platform_id for e in external_platform_crud.list_all()}
+    return portfolio_map, security_map, platform_map
+
+
+def _parse_by_name_row(row: Dict[str, str], maps: Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]) -> TransactionDtlInput:
+    portfolio_map, security_map, platform_map = maps
+    portfolio_name = _val(row, "portfolio_name")
+    security_ticker = _val(row, "security_ticker")
+    external_platform_name = _val(row, "external_platform_name")
+    try:
+        if not (portfolio_name and security_ticker and external_platform_name):
+            raise ValueError("Missing required fields")
+        fields = _common_fields(row)
+    except ValueError:
+        raise ValueError("invalid or missing required value(s)")
+
+    reasons: List[str] = []
+    pid = portfolio_map.get(portfolio_name.lower())
+    if pid is None:
+        reasons.append("portfolio not found")
+    sid = security_map.get(security_ticker.lower())
+    if sid is None:
+        reasons.append("security not found")
+    eid = platform_map.get(external_platform_name.lower())
+    if eid is None:
+        reasons.append("external platform not found")
+    if reasons:
+        raise ValueError(", ".join(reasons))
+    return TransactionDtlInput(portfolio_id=pid, security_id=sid, external_platform_id=eid, **fields)
+
+
+def _run_pipeline(
+    reader: Iterable[Dict[str, str]],
+    parse_row: Callable[[Dict[str, str], Any], TransactionDtlInput],
+    maps: Any,
+    chunk_size: int,
+    progress: Optional[ProgressCallback],
+    first_row: int = 2,
+) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {
+        "read": 0,
+        "inserted": 0,
+        "skipped": 0,
+        "excluded": 0,
+        "chunks": 0,
+        "failed_chunks": 0,
+        "errors": [],
+        "errors_truncated": False,
+    }
+
+    def add_error(row_ref: Any, reason: str) -> None:
+        if len(summary["errors"]) < MAX_ERROR_SAMPLES:
+            summary["errors"].append({"row": row_ref, "reason": reason})
+        else:
+            summary["errors_truncated"] = True
+
+    # Occurrence ordinals of identical rows continue across chunks so hashes are stable per file
+    occurrences: Dict[str, int] = {}
+    for chunk in _iter_chunks(reader, max(1, int(chunk_size)), first_row):
+        summary["chunks"] += 1
+        summary["read"] += len(chunk)
+        valid: List[TransactionDtlInput] = []
+        for row_num, row in chunk:
+            try:
+                valid.append(parse_row(row, maps))
+            except ValueError as e:
+                summary["excluded"] += 1
+                add_error(row_num, str(e))
+        if valid:
+            try:
+                inserted = transaction_crud.insert_many(valid, occurrences)
+                summary["inserted"] += len(inserted)
+                summary["skipped"] += len(valid) - len(inserted)
+            except Exception as e:
+                # The chunk is committed atomically, so a failure excludes all of its valid rows
+                summary["failed_chunks"] += 1
+                summary["excluded"] += len(valid)
+                add_error(f"{chunk[0][0]}-{chunk[-1][0]}", f"chunk insert failed: {e}")
+        print(f"[transaction import] chunk {summary['chunks']}: read={summary['read']} "
+              f"inserted={summary['inserted']} skipped={summary['skipped']} excluded={summary['excluded']}")
+        if progress is not None:
+            progress({k: v for k, v in summary.items() if k != "errors"})
+    return summary
+
+
+def load_transactions_from_stream(
+    binary_file: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """Import a CSV keyed by portfolio_id/security_id/external_platform_id."""
+    reader = open_csv_stream(binary_file, BY_ID_REQUIRED)
+    return _run_pipeline(reader, _parse_by_id_row, None, chunk_size, progress)
+
+
+def load_transactions_by_name_from_stream(
+    binary_file: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """Import a CSV keyed by portfolio_name/security_ticker/external_platform_name."""
+    reader = open_csv_stream(binary_file, BY_NAME_REQUIRED)
+    return _run_pipeline(reader, _parse_by_name_row, _load_name_maps(), chunk_size, progress)
+
+
+def load_transactions_from_parquet(
+    binary_file: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """Import a Parquet file keyed by portfolio_id/security_id/external_platform_id (rows numbered from 1)."""
+    try:
+        rows = columnar_io.iter_parquet_records(binary_file, BY_ID_REQUIRED, as_text=True)
+        first = next(rows, None)
+    except columnar_io.ColumnarFormatError as e:
+        raise CsvHeaderError(str(e))
+    if first is None:
+        raise CsvHeaderError("Empty file")
+    return _run_pipeline(itertools.chain([first], rows), _parse_by_id_row, None, chunk_size, progress, first_row=1)
+
+
+__all__ = [
+    "load_transactions_from_stream",
+    "load_transactions_by_name_from_stream",
+    "load_transactions_from_parquet",
+    "CsvHeaderError",
+    "DEFAULT_CHUNK_SIZE",
+]
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Stream a transactions CSV into transaction_dtl")
+    parser.add_argument("csv_path", help="Path to the CSV file")
+    parser.add_argument("--by-name", action="store_true", help="Rows use portfolio_name/security_ticker/external_platform_name")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per committed chunk")
+    args = parser.parse_args()
+
+    loader = load_transactions_by_name_from_stream if args.by_name else load_transactions_from_stream
+    with open(args.csv_path, "rb") as f:
+        result = loader(f, chunk_size=args.chunk_size)
+    print(json.dumps(result, indent=2, default=str))
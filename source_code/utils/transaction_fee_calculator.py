@@ -0,0 +1,69 @@
+"""
+Derive transaction amounts and percent-based fees at ingest time.
+
+Rules (applied to a whole batch with array math):
+- total_inv_amt: the entered amount when present and non-zero, otherwise qty * price.
+- transaction_fee / external_manager_fee: when the matching *_percent is non-zero the
+  fee is total_inv_amt * (percent / 100) rounded to 2 decimals half away from zero; a zero
+  percent keeps the entered flat fee. The product is rounded from its 15-significant-digit
+  decimal form, as the SQL cast of double precision to numeric does, so 100.5 * 1% gives
+  1.01 in both places rather than the binary float's 1.00.
+
+The same rules are expressed in SQL by TransactionCRUD.recalculate_fees_all so
+historic rows can be brought in line with newly ingested ones.
+"""
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import List, Sequence
+
+import numpy as np
+
+from source_code.models.models import TransactionDtlInput
+
+# (fee field, percent field) pairs derived from the transaction amount
+PERCENT_FEE_FIELDS = (
+    ("transaction_fee", "transaction_fee_percent"),
+    ("external_manager_fee", "external_manager_fee_percent"),
+)
+
+
+def _column(items: Sequence[TransactionDtlInput], field: str) -> np.ndarray:
+    # None becomes NaN so missing values can be masked
+    return np.array([getattr(it, field, None) for it in items], dtype=float)
+
+
+_CENT = Decimal("0.01")
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    # ROUND((x)::numeric, 2): float8 -> numeric keeps 15 significant digits, then half away from zero
+    return np.array([float(Decimal(format(v, ".15g")).quantize(_CENT, ROUND_HALF_UP)) if np.isfinite(v) else v
+                     for v in np.asarray(values, dtype=float)], dtype=float)
+
+
+def apply_computed_amounts(items: Sequence[TransactionDtlInput]) -> List[TransactionDtlInput]:
+    """
+    Return copies of `items` with total_inv_amt, transaction_fee and
+    external_manager_fee filled in from quantities, prices and percent fields.
+    """
+    if not items:
+        return []
+    qty = _column(items, "transaction_qty")
+    price = _column(items, "transaction_price")
+    entered_total = _column(items, "total_inv_amt")
+    total = np.where(np.isnan(entered_total) | (entered_total == 0), qty * price, entered_total)
+
+    updates = {"total_inv_amt": total}
+    for fee_field, pct_field in PERCENT_FEE_FIELDS:
+        pct = np.nan_to_num(_column(items, pct_field))
+        entered_fee = np.nan_to_num(_column(items, fee_field))
+        updates[fee_field] = np.where(pct != 0, _round2(total * (pct / 100.0)), entered_fee)
+
+    return [
+        it.model_copy(update={name: float(values[i]) for name, values in updates.items()})
+        for i, it in enumerate(items)
+    ]
+
+
+__all__ = ["apply_computed_amounts", "PERCENT_FEE_FIELDS"]
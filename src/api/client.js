@@ -104,6 +104,25 @@ export const api = {
     const queryString = params.toString();
     return request(`/security-prices${queryString ? `?${queryString}` : ""}`, { method: "GET" });
   },
+  // Several tickers in one request; returns { series: { TICKER: { security_id, dates, <fields> } }, missing }
+  // bucket ('week' | 'month') aggregates OHLC per period; points caps each series (LTTB downsampling)
+  getPriceSeries: (tickers, fromDate, toDate, fields = ["price"], { bucket, points } = {}) => {
+    const params = new URLSearchParams({ tickers: tickers.join(','), fields: fields.join(',') });
+    if (fromDate) params.append('from', fromDate);
+    if (toDate) params.append('to', toDate);
+    if (bucket) params.append('bucket', bucket);
+    if (points) params.append('points', String(points));
+    return request(`/security-prices/series?${params.toString()}`, { method: "GET" });
+  },
+  // Server-side return/risk metrics; returns { analytics: { TICKER: { cumulative_return, annualized_volatility, ... } }, missing }
+  getPriceAnalytics: (tickers, fromDate, toDate, { window, riskFreeRate, includeSeries = false } = {}) => {
+    const params = new URLSearchParams({ tickers: tickers.join(','), include_series: String(includeSeries) });
+    if (fromDate) params.append('from', fromDate);
+    if (toDate) params.append('to', toDate);
+    if (window) params.append('window', String(window));
+    if (riskFreeRate != null) params.append('risk_free_rate', String(riskFreeRate));
+    return request(`/security-prices/analytics?${params.toString()}`, { method: "GET" });
+  },
   getSecurityPrice: (id) => request(`/security-prices/${id}`, { method: "GET" }),
   createSecurityPrice: (payload) => request("/security-prices/", { method: "POST", body: JSON.stringify(payload) }),
   updateSecurityPrice: (id, payload) => request(`/security-prices/${id}`, { method: "PUT", body: JSON.stringify(payload) }),
@@ -119,15 +138,46 @@ export const api = {
     // Backend expects POST /api/security-prices/download-date-range
     return request(`/security-prices/download-date-range`, { method: "POST", body: JSON.stringify(payload) });
   },
+  // Checkpointed backfill; pass runId to resume. Runs as a background job.
+  backfillPrices: ({ fromDate, toDate, tickers, runId } = {}) => {
+    const payload = {};
+    if (fromDate) payload.from_date = fromDate;
+    if (toDate) payload.to_date = toDate;
+    if (tickers && tickers.length) payload.tickers = tickers;
+    if (runId) payload.run_id = runId;
+    return request(`/security-prices/backfill?background=true`, { method: "POST", body: JSON.stringify(payload) });
+  },
+  getBackfillStatus: (runId) => request(`/security-prices/backfill/${runId}`, { method: "GET" }),
+
+  // Background jobs (routes called with ?background=true return { job_id, job_type, status })
+  listJobs: () => request("/jobs", { method: "GET" }),
+  getJob: (id) => request(`/jobs/${id}`, { method: "GET" }),
 
   // Transactions
   listTransactions: () => request("/transactions", { method: "GET" }),
   listTransactionsFull: () => request("/transactions", { method: "GET" }),
+  // Server-side totals; groupBy is a subset of ["portfolio", "security", "platform", "month", "type"]
+  getTransactionSummary: (groupBy, filters = {}) => {
+    const params = new URLSearchParams();
+    if (groupBy && groupBy.length) params.append('group_by', groupBy.join(','));
+    Object.entries(filters).forEach(([k, v]) => { if (v != null && v !== '') params.append(k, v); });
+    const qs = params.toString();
+    return request(`/transactions/summary${qs ? `?${qs}` : ""}`, { method: "GET" });
+  },
+  getPositionSeries: (portfolioId, securityId, bucket = "day", fromDate, toDate) => {
+    const params = new URLSearchParams({ portfolio_id: portfolioId, security_id: securityId, bucket });
+    if (fromDate) params.append('from_date', fromDate);
+    if (toDate) params.append('to_date', toDate);
+    return request(`/transactions/position-series?${params.toString()}`, { method: "GET" });
+  },
   getTransaction: (id) => request(`/transactions/${id}`, { method: "GET" }),
   getTransactionFormData: () => request("/transactions/form-data", { method: "GET" }),
   createTransaction: (payload) => request("/transactions/", { method: "POST", body: JSON.stringify(payload) }),
   updateTransaction: (id, payload) => request(`/transactions/${id}`, { method: "PUT", body: JSON.stringify(payload) }),
   deleteTransaction: (id) => request(`/transactions/${id}`, { method: "DELETE" }),
+  // Linked copies of many transactions; overrides: { portfolio_id, security_id, external_platform_id, transaction_price }
+  duplicateTransactionsBulk: (transactionIds, overrides = {}) =>
+    request("/transactions/bulk-duplicate", { method: "POST", body: JSON.stringify({ transaction_ids: transactionIds, ...overrides }) }),
   // Maintenance
   recalculateTransactionFees: () => request("/transactions/recalculate-fees", { method: "POST" }),
   // Performance comparison
@@ -27,6 +27,8 @@ const COLORS = [
   "#10b981", // emerald
 ];
 
+const CHART_MAX_POINTS = 1000;
+
 export default function SecurityPriceChange() {
   const [securities, setSecurities] = React.useState([]);
   const [ticker, setTicker] = React.useState(""); // primary ticker (kept for backward compat/metrics)
@@ -35,6 +37,7 @@ export default function SecurityPriceChange() {
   const [fromDate, setFromDate] = React.useState(defaultFromDateOneYear);
   const [toDate, setToDate] = React.useState(() => formatDate(new Date()));
   const [seriesByTicker, setSeriesByTicker] = React.useState({}); // { TICKER: [prices...] }
+  const [analytics, setAnalytics] = React.useState(null); // server-side metrics for the primary ticker
   const [loading, setLoading] = React.useState(false);
   const [error, setError] = React.useState("");
   const [mode, setMode] = React.useState("price"); // 'price' | 'performance'
@@ -86,19 +89,32 @@ export default function SecurityPriceChange() {
     setLoading(true);
     setError("");
     try {
-      const promises = allSelectedTickers.map((t) => api.listSecurityPricesWithFilters(fromDate, toDate, t));
-      const results = await Promise.all(promises);
+      // One request for all tickers; the columnar payload is expanded back into row objects
+      const fields = ["price", "open_px", "high_px", "low_px", "close_px", "adj_close_px", "volume"];
+      const primary = (ticker || "").trim().toUpperCase();
+      // Metrics are computed by the server; only the chart/table need the rows
+      const [result, stats] = await Promise.all([
+        // Long ranges are downsampled server-side so the chart payload stays bounded
+        api.getPriceSeries(allSelectedTickers, fromDate, toDate, fields, { points: CHART_MAX_POINTS }),
+        primary ? api.getPriceAnalytics([primary], fromDate, toDate).catch(() => null) : Promise.resolve(null),
+      ]);
+      setAnalytics(stats?.analytics?.[primary] || null);
+      const series = result?.series || {};
       const byTicker = {};
-      for (let i = 0; i < allSelectedTickers.length; i++) {
-        const t = allSelectedTickers[i];
-        const rows = Array.isArray(results[i]) ? results[i] : [];
-        // sort by date asc
-        byTicker[t] = rows.sort((a, b) => String(a.price_date).localeCompare(String(b.price_date)));
+      for (const t of allSelectedTickers) {
+        const s = series[String(t).trim().toUpperCase()];
+        // dates arrive sorted ascending
+        byTicker[t] = s ? s.dates.map((d, i) => {
+          const row = { security_id: s.security_id, price_date: d };
+          for (const f of fields) row[f] = s[f][i];
+          return row;
+        }) : [];
       }
       setSeriesByTicker(byTicker);
     } catch (e) {
       setError("Failed to load prices");
       setSeriesByTicker({});
+      setAnalytics(null);
     } finally {
       setLoading(false);
     }
@@ -109,41 +125,28 @@ export default function SecurityPriceChange() {
     if (allSelectedTickers.length > 0) loadData();
   }, [allSelectedTickers, fromDate, toDate]);
 
-  // Primary metrics (for main ticker only to keep UI simple)
   const primaryPrices = React.useMemo(() => seriesByTicker[ (ticker || "").trim().toUpperCase() ] || [], [seriesByTicker, ticker]);
+  // Primary metrics (for main ticker only to keep UI simple), from the analytics endpoint
   const metrics = React.useMemo(() => {
-    const prices = primaryPrices;
-    if (!prices || prices.length === 0) return null;
-    const sorted = prices; // already sorted
-    const first = sorted[0];
-    const last = sorted[sorted.length - 1];
-    const start = Number(first?.price ?? first?.close_px ?? 0);
-    const end = Number(last?.price ?? last?.close_px ?? 0);
-    const change = end - start;
-    const pct = start !== 0 ? (change / start) * 100 : null;
-    let high = -Infinity;
-    let low = Infinity;
-    for (const p of sorted) {
-      const v = Number(p.price ?? p.close_px ?? 0);
-      if (Number.isFinite(v)) {
-        if (v > high) high = v;
-        if (v < low) low = v;
-      }
-    }
-    if (high === -Infinity) high = null;
-    if (low === Infinity) low = null;
+    const a = analytics;
+    if (!a || !a.points) return null;
+    const change = a.end_price != null && a.start_price != null ? a.end_price - a.start_price : null;
+    const pct = (v) => (v == null ? null : v * 100);
     return {
-      startPrice: start || null,
-      endPrice: end || null,
-      absChange: Number.isFinite(change) ? change : null,
-      pctChange: pct,
-      high,
-      low,
-      days: sorted.length,
-      startDate: first?.price_date,
-      endDate: last?.price_date,
+      startPrice: a.start_price,
+      endPrice: a.end_price,
+      absChange: change,
+      pctChange: pct(a.cumulative_return),
+      high: a.high,
+      low: a.low,
+      volatility: pct(a.annualized_volatility),
+      maxDrawdown: pct(a.max_drawdown),
+      sharpe: a.sharpe_ratio,
+      days: a.points,
+      startDate: a.start_date,
+      endDate: a.end_date,
     };
-  }, [primaryPrices]);
+  }, [analytics]);
 
   // Build chart series in requested mode
   const chartSeries = React.useMemo(() => {
@@ -245,6 +248,9 @@ export default function SecurityPriceChange() {
             <Metric label="Change %" value={metrics.pctChange} suffix="%" />
             <Metric label="High" value={metrics.high} />
             <Metric label="Low" value={metrics.low} />
+            <Metric label="Volatility (ann.)" value={metrics.volatility} suffix="%" />
+            <Metric label="Max Drawdown" value={metrics.maxDrawdown} suffix="%" />
+            <Metric label="Sharpe Ratio" value={metrics.sharpe} />
           </div>
         )}
       </div>
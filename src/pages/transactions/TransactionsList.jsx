@@ -59,7 +59,8 @@ export default function TransactionsList() {
     try {
       const res = await api.recalculateTransactionFees();
       const updated = (res && typeof res.updated === "number") ? res.updated : 0;
-      setRecalcMessage(`Recalculated fees for ${updated} transactions.`);
+      const scanned = (res && typeof res.scanned === "number") ? res.scanned : updated;
+      setRecalcMessage(`Recalculated fees for ${updated} of ${scanned} transactions.`);
       trackEvent("recalculate_fees_success", { updated });
       await reloadTransactions();
     } catch (e) {
@@ -1,5 +1,14 @@
+import csv
+import io
+import os
+import re
+
 import pytest
 from fastapi import FastAPI
+
+# Market-data calls in tests hit fakes; do not rate limit them
+os.environ.setdefault("MARKET_DATA_RATE_PER_SEC", "0")
+
 from fastapi.testclient import TestClient
 
 # Import routers
@@ -10,9 +19,11 @@ from source_code.crud.holding_api_routes import router as holdings_router
 from source_code.crud.security_price_api_routes import router as security_prices_router
 from source_code.crud.transaction_api_routes import router as transactions_router
 from source_code.crud.external_platform_api_routes import router as external_platforms_router
+from source_code.crud.job_api_routes import router as jobs_router
 
 # We'll monkeypatch pg_db_conn_manager used by CRUD layers
 from source_code.config import pg_db_conn_manager
+from source_code.utils.price_series_store import price_series_store
 
 
 class MockDB:
@@ -57,6 +68,25 @@ class MockDB:
             return [row] if row else []
         return list(store.values())
 
+    def copy_to_stream(self, query: str, params: tuple | None = None, chunk_size: int = 64 * 1024):
+        # Render "SELECT <columns> FROM <table>" the way COPY ... CSV HEADER would
+        m = re.match(r'select (.+?) from (\w+)', query.strip(), re.I | re.S)
+        columns = [c.strip() for c in m.group(1).split(',')]
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for row in self.tables.get(m.group(2).lower(), {}).values():
+            writer.writerow(['' if row.get(c) is None else row.get(c) for c in columns])
+        yield out.getvalue().encode('utf-8')
+
+    def fetch_batches(self, query: str, params: tuple | None = None, batch_size: int = 50_000):
+        # Rows of "SELECT <columns> FROM <table>" as tuples; "x::float8 AS x" reads column x
+        m = re.match(r'select (.+?) from (\w+)', query.strip(), re.I | re.S)
+        columns = [re.split(r'\s+as\s+', c.strip(), flags=re.I)[-1] for c in m.group(1).split(',')]
+        rows = [tuple(row.get(c) for c in columns) for row in self.tables.get(m.group(2).lower(), {}).values()]
+        for i in range(0, len(rows), batch_size):
+            yield rows[i:i + batch_size]
+
     def execute_query(self, sql: str, params: tuple | None = None) -> int:
         sql_low = sql.lower()
         # handle inserts/updates/deletes per table heuristically
@@ -286,6 +316,7 @@ def app():
     app.include_router(security_prices_router)
     app.include_router(transactions_router)
     app.include_router(external_platforms_router)
+    app.include_router(jobs_router)
     return app
 
 
@@ -314,9 +345,14 @@ def mock_db(monkeypatch):
         'external_platform_id': 401, 'name': 'BrokerX', 'platform_type': 'Trading Platform', 'created_ts': None, 'last_updated_ts': None
     }
 
+    # Cached price series must not leak between tests
+    price_series_store.clear()
+
     # Monkeypatch functions
     monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', mock.fetch_data)
     monkeypatch.setattr(pg_db_conn_manager, 'execute_query', mock.execute_query)
+    monkeypatch.setattr(pg_db_conn_manager, 'copy_to_stream', mock.copy_to_stream)
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_batches', mock.fetch_batches)
 
     # Expose mock for tests that need to inject view rows
     yield mock
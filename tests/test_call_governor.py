@@ -0,0 +1,138 @@
+import pytest
+
+from source_code.utils import call_governor, security_data_by_yfinance
+from source_code.utils.call_governor import (
+    CallGovernor, CircuitBreaker, CircuitOpenError, RateLimitedError, TokenBucket, is_retryable,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_sec=2, burst=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_after=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+    clock.now = 10
+    assert breaker.allow()       # single trial call
+    assert not breaker.allow()
+    breaker.record_failure()     # failed trial reopens
+    assert breaker.state == 'open'
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_retries_with_backoff_then_succeeds():
+    sleeps = []
+    gov = CallGovernor('t1', rate_per_sec=0, max_retries=3, backoff_base=1, backoff_max=4, sleep=sleeps.append)
+    outcomes = [RateLimitedError('slow down'), TimeoutError('timed out'), 'ok']
+
+    def flaky():
+        result = outcomes.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert gov.call(flaky) == 'ok'
+    assert len(sleeps) == 2 and 0 <= sleeps[0] <= 1 and 0 <= sleeps[1] <= 2
+    m = gov.metrics()
+    assert m['retries'] == 2 and m['succeeded'] == 1 and m['circuit'] == 'closed'
+
+
+def test_non_retryable_fails_fast_and_trips_breaker():
+    gov = CallGovernor('t2', rate_per_sec=0, max_retries=3, failure_threshold=2, reset_after=60, sleep=lambda s: None)
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError('bad ticker')
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            gov.call(broken)
+    with pytest.raises(CircuitOpenError):
+        gov.call(broken)
+    assert len(calls) == 2
+    assert gov.metrics()['rejected'] == 1 and gov.metrics()['failed'] == 2
+
+
+def test_half_open_trial_retries_without_jamming_breaker():
+    clock = FakeClock()
+    gov = CallGovernor('t3', rate_per_sec=0, max_retries=1, sleep=lambda s: None)
+    gov.breaker = CircuitBreaker(failure_threshold=1, reset_after=10, clock=clock)
+    gov.breaker.record_failure()
+    clock.now = 10
+
+    def rate_limited():
+        raise RateLimitedError('429')
+
+    # The trial's retry reuses its slot; exhausting retries reopens the breaker instead of leaving it half-open
+    with pytest.raises(RateLimitedError):
+        gov.call(rate_limited)
+    assert gov.breaker.state == 'open'
+    assert gov.metrics()['retries'] == 1 and gov.metrics()['rejected'] == 0
+
+    clock.now = 20
+    outcomes = [RateLimitedError('429'), 'ok']
+
+    def recovers():
+        result = outcomes.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert gov.call(recovers) == 'ok'
+    assert gov.breaker.state == 'closed'
+    assert gov.call(lambda: 'healthy') == 'healthy'
+
+def test_is_retryable():
+    assert is_retryable(Exception('HTTP Error 429: Too Many Requests'))
+    assert is_retryable(ConnectionError())
+    assert not is_retryable(KeyError('x'))
+    assert not is_retryable(CircuitOpenError('open'))
+
+
+def test_download_retries_rate_limited_chunk(monkeypatch):
+    import pandas as pd
+    calls = []
+
+    def download(tickers, **kwargs):
+        calls.append(tickers)
+        if len(calls) == 1:
+            monkeypatch.setattr(security_data_by_yfinance.yf.shared, '_ERRORS', {'AAA': "YFRateLimitError('Too Many Requests. Rate limited.')"})
+            return pd.DataFrame()
+        idx = pd.to_datetime(['2024-03-04'])
+        return pd.concat({'AAA': pd.DataFrame({'Close': [1.0]}, index=idx)}, axis=1)
+
+    monkeypatch.setattr(security_data_by_yfinance.yf, 'download', download)
+    gov = CallGovernor('t3', rate_per_sec=0, max_retries=2, sleep=lambda s: None)
+    frame = security_data_by_yfinance.download_history_frame(['AAA'], '2024-03-04', '2024-03-04', governor=gov)
+    assert len(calls) == 2 and frame['Close'].tolist() == [1.0]
+
+
+def test_metrics_endpoint(client):
+    call_governor.get_governor('yfinance')
+    r = client.get('/api/security-prices/provider-metrics')
+    assert r.status_code == 200
+    assert any(m['name'] == 'yfinance' for m in r.json())
@@ -0,0 +1,132 @@
+import io
+from datetime import date, datetime
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.ipc as pa_ipc  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+from source_code.config import pg_db_conn_manager  # noqa: E402
+from source_code.crud.holding_crud_operations import holding_crud  # noqa: E402
+from source_code.crud.transaction_crud_operations import transaction_crud  # noqa: E402
+from source_code.utils import columnar_io  # noqa: E402
+from source_code.utils.price_series_store import price_series_store  # noqa: E402
+
+
+def _parquet_bytes(table) -> bytes:
+    buf = io.BytesIO()
+    pq.write_table(table, buf)
+    return buf.getvalue()
+
+
+def test_holdings_parquet_export_is_typed(client, mock_db):
+    mock_db.tables['holding_dtl'][1] = {
+        'holding_id': 1, 'holding_dt': date(2024, 1, 2), 'portfolio_id': 201, 'security_id': 301,
+        'quantity': 10.0, 'price': 12.5, 'avg_price': 11.0, 'market_value': 125.0,
+        'security_price_dt': date(2024, 1, 2), 'holding_cost_amt': 110.0, 'unreal_gain_loss_amt': 15.0,
+        'unreal_gain_loss_perc': 13.6, 'created_ts': datetime(2024, 1, 2, 9, 30), 'last_updated_ts': None,
+    }
+    r = client.get('/api/holdings/export.parquet')
+    assert r.status_code == 200
+    assert r.headers['content-type'] == 'application/vnd.apache.parquet'
+    assert 'filename="holdings.parquet"' in r.headers['content-disposition']
+    table = pq.read_table(io.BytesIO(r.content))
+    assert table.schema.field('holding_dt').type == pa.date32()
+    assert table.schema.field('portfolio_id').type == pa.int64()
+    assert table.schema.field('market_value').type == pa.float64()
+    row = table.to_pylist()[0]
+    assert row['holding_dt'] == date(2024, 1, 2) and row['quantity'] == 10.0
+    assert row['created_ts'] == datetime(2024, 1, 2, 9, 30) and row['last_updated_ts'] is None
+
+
+def test_arrow_stream_export_in_batches(monkeypatch, mock_db):
+    for i in range(5):
+        mock_db.tables['transaction_dtl'][i] = {'transaction_id': i, 'transaction_date': date(2024, 1, i + 1),
+                                                'transaction_type': 'BUY', 'transaction_qty': float(i)}
+    body = b''.join(columnar_io.iter_export('transactions', 'arrow', batch_size=2))
+    batches = list(pa_ipc.open_stream(body))
+    assert [b.num_rows for b in batches] == [2, 2, 1]
+    table = pa.Table.from_batches(batches)
+    assert table.column('transaction_id').to_pylist() == [0, 1, 2, 3, 4]
+    assert table.column('portfolio_id').null_count == 5
+
+
+def test_empty_export_is_still_a_valid_file(client):
+    r = client.get('/api/security-prices/export.arrow')
+    assert r.status_code == 200
+    assert r.headers['content-type'] == 'application/vnd.apache.arrow.stream'
+    table = pa_ipc.open_stream(r.content).read_all()
+    assert table.num_rows == 0 and 'price_date' in table.schema.names
+
+
+def test_exports_report_missing_pyarrow(client, monkeypatch):
+    monkeypatch.setattr(columnar_io, 'pa', None)
+    r = client.get('/api/holdings/export.parquet')
+    assert r.status_code == 501
+    assert 'pyarrow' in r.json()['detail']
+    # Uploads share the same mapping, including the transactions import that may run as a job
+    for url in ('/api/security-prices/upload.parquet', '/api/transactions/upload.parquet'):
+        r = client.post(url, files={'file': ('x.parquet', b'PAR1', 'application/octet-stream')})
+        assert r.status_code == 501, url
+    r = client.post('/api/holdings/upload.parquet', files={'file': ('x.csv', b'a,b', 'text/csv')})
+    assert r.status_code == 400
+
+
+def test_price_parquet_upload_uses_copy_merge(client, monkeypatch):
+    copied = []
+
+    def copy_and_merge(staging_ddl, copy_sql, data, merge_sql):
+        copied.extend(data.read().splitlines())
+        return len(copied)
+
+    monkeypatch.setattr(pg_db_conn_manager, 'copy_and_merge', copy_and_merge)
+    monkeypatch.setattr(price_series_store, 'invalidate', lambda *ids: None)
+    upload = _parquet_bytes(pa.table({
+        'security_id': pa.array([301, 301, None], pa.int64()),
+        'price_date': pa.array([date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 3)], pa.date32()),
+        'price': [10.0, 11.0, 12.0],
+        'volume': [100.0, None, 5.0],
+    }))
+    r = client.post('/api/security-prices/upload.parquet?price_source_id=2',
+                    files={'file': ('prices.parquet', upload, 'application/octet-stream')})
+    assert r.status_code == 200
+    body = r.json()
+    assert body['read'] == 3 and body['inserted'] == 2 and body['skipped_bad_data_count'] == 1
+    first = copied[0].split(',')
+    # security_price_id, security_id, price_source_id, price_date, price
+    assert first[1:5] == ['301', '2', '2024-01-02', '10.0']
+
+
+def test_transaction_parquet_upload_runs_pipeline(client, monkeypatch):
+    saved = []
+    monkeypatch.setattr(transaction_crud, 'insert_many', lambda items, occurrences: saved.extend(items) or items)
+    upload = _parquet_bytes(pa.table({
+        'portfolio_id': [201, 201], 'security_id': [301, 301], 'external_platform_id': [401.0, None],
+        'transaction_date': pa.array([date(2024, 2, 1), date(2024, 2, 2)], pa.date32()),
+        'transaction_type': ['BUY', 'SELL'], 'transaction_qty': [5.0, 2.0], 'transaction_price': [10.0, 11.0],
+    }))
+    r = client.post('/api/transactions/upload.parquet',
+                    files={'file': ('txns.parquet', upload, 'application/octet-stream')})
+    assert r.status_code == 200
+    body = r.json()
+    assert body['read'] == 2 and body['inserted'] == 1 and body['excluded'] == 1
+    assert body['errors'][0]['row'] == 2
+    assert saved[0].external_platform_id == 401 and saved[0].transaction_date == date(2024, 2, 1)
+
+
+def test_holdings_parquet_upload_validates_and_saves(client, monkeypatch):
+    monkeypatch.setattr(holding_crud, 'save_many', lambda items: items)
+    upload = _parquet_bytes(pa.table({
+        'holding_id': [9], 'portfolio_id': [201], 'security_id': [301], 'quantity': [3.0],
+        'price': [7.0], 'market_value': [21.0], 'avg_price': pa.array([None], pa.float64()),
+    }))
+    r = client.post('/api/holdings/upload.parquet', files={'file': ('h.parquet', upload, 'application/octet-stream')})
+    assert r.status_code == 200 and r.json() == {'read': 1, 'saved': 1}
+
+    missing = _parquet_bytes(pa.table({'portfolio_id': [201]}))
+    r = client.post('/api/holdings/upload.parquet', files={'file': ('h.parquet', missing, 'application/octet-stream')})
+    assert r.status_code == 400 and 'security_id' in r.json()['detail']
+
+    r = client.post('/api/holdings/upload.parquet', files={'file': ('h.parquet', b'not parquet', 'application/octet-stream')})
+    assert r.status_code == 400
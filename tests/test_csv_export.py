@@ -0,0 +1,104 @@
+import gzip
+import time
+from contextlib import contextmanager
+
+from source_code.config import pg_db_conn_manager
+from source_code.config.pg_db_conn_manager import copy_to_stream as real_copy_to_stream
+from source_code.utils import csv_export
+
+
+def test_export_streams_csv_before_id_route(client):
+    r = client.get('/users/export.csv')
+    assert r.status_code == 200
+    assert r.headers['content-type'].startswith('text/csv')
+    assert 'filename="users.csv"' in r.headers['content-disposition']
+    lines = r.text.splitlines()
+    assert lines[0] == 'user_id,first_name,last_name,email,created_ts,last_updated_ts'
+    assert lines[1].startswith('101,Jane,Doe,jane@example.com')
+
+    # /export.csv used to be shadowed by /{holding_id}
+    r = client.get('/api/holdings/export.csv')
+    assert r.status_code == 200 and r.text.startswith('holding_id,holding_dt,')
+
+
+def test_export_gzip_download(client):
+    r = client.get('/api/securities/export.csv?gzip=true', headers={'Accept-Encoding': 'identity'})
+    assert r.status_code == 200
+    assert r.headers['content-type'] == 'application/gzip'
+    assert 'filename="securities.csv.gz"' in r.headers['content-disposition']
+    text = gzip.decompress(r.content).decode()
+    assert text.splitlines()[1].startswith('301,ABC,ABC Inc')
+
+
+def test_gzip_chunks_round_trip():
+    chunks = [b'a,b\n'] + [f'{i},{i * i}\n'.encode() for i in range(5000)]
+    assert gzip.decompress(b''.join(csv_export.gzip_chunks(iter(chunks)))) == b''.join(chunks)
+
+
+class _FakeCursor:
+    def __init__(self, rows, log):
+        self.rows, self.log = rows, log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, query, params):
+        return (query % tuple(repr(p) for p in params)).encode()
+
+    def copy_expert(self, sql, file):
+        self.log.append(sql)
+        file.write(b'n\n')
+        for i in range(self.rows):
+            file.write(f'{i}\n'.encode())
+
+
+class _FakeConn:
+    def __init__(self, rows, log):
+        self.rows, self.log = rows, log
+        self.closed = False
+
+    def cursor(self):
+        return _FakeCursor(self.rows, self.log)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+        self.log.append('closed')
+
+
+def _fake_pool(monkeypatch, rows):
+    log = []
+
+    @contextmanager
+    def get_db_connection():
+        yield _FakeConn(rows, log)
+
+    monkeypatch.setattr(pg_db_conn_manager, 'get_db_connection', get_db_connection)
+    return log
+
+
+def test_copy_to_stream_chunks_rows(monkeypatch):
+    log = _fake_pool(monkeypatch, 10_000)
+    chunks = list(real_copy_to_stream('SELECT n FROM t WHERE n > %s', (5,), chunk_size=1024))
+    assert log == ["COPY (SELECT n FROM t WHERE n > 5) TO STDOUT WITH (FORMAT csv, HEADER)"]
+    assert len(chunks) > 10 and all(len(c) >= 1024 for c in chunks[:-1])
+    body = b''.join(chunks).decode().splitlines()
+    assert body[0] == 'n' and body[-1] == '9999' and len(body) == 10_001
+
+
+def test_copy_to_stream_cancels_when_consumer_stops(monkeypatch):
+    log = _fake_pool(monkeypatch, 1_000_000)
+    stream = real_copy_to_stream('SELECT n FROM t', chunk_size=16)
+    assert next(stream).startswith(b'n\n')
+    stream.close()
+    # The worker notices the cancellation and discards the connection
+    for _ in range(50):
+        if 'closed' in log:
+            break
+        time.sleep(0.05)
+    assert 'closed' in log
@@ -0,0 +1,89 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pandas as pd
+
+from source_code.crud import security_price_api_routes
+from source_code.crud.security_crud_operations import security_crud
+from source_code.crud.security_price_crud_operations import security_price_crud
+from source_code.models.models import SecurityDtl
+from source_code.utils import security_data_by_yfinance
+
+
+def _fake_download(calls):
+    def download(tickers, start, end, interval, group_by, progress, threads, **kwargs):
+        calls.append(list(tickers))
+        idx = pd.to_datetime(['2024-03-04', '2024-03-05'])
+        frames = {}
+        for t in tickers:
+            if t == 'NODATA':
+                frames[t] = pd.DataFrame({'Open': [None, None], 'Close': [None, None]}, index=idx, dtype=float)
+            elif t == 'STALE':
+                # Only a row before the target date
+                frames[t] = pd.DataFrame({'Open': [5.0, None], 'High': [5.5, None], 'Low': [4.5, None], 'Close': [5.2, None],
+                                          'Adj Close': [5.1, None], 'Volume': [10.0, None]}, index=idx)
+            else:
+                frames[t] = pd.DataFrame({'Open': [1.0, 2.0], 'High': [1.5, 2.5], 'Low': [0.5, 1.5], 'Close': [1.2, 2.2],
+                                          'Adj Close': [1.1, 2.1], 'Volume': [100.0, 200.0]}, index=idx)
+        return pd.concat(frames, axis=1)
+    return download
+
+
+def test_history_frame_is_chunked_and_long(monkeypatch):
+    calls = []
+    monkeypatch.setattr(security_data_by_yfinance.yf, 'download', _fake_download(calls))
+    df = security_data_by_yfinance.download_history_frame(['ccc', 'AAA', 'BBB', 'NODATA'], '2024-03-04', '2024-03-05',
+                                                          chunk_size=2, max_workers=2)
+    assert sorted(len(c) for c in calls) == [2, 2]
+    assert list(df.columns[:2]) == ['Date', 'Ticker']
+    # All-NaN rows for tickers without data are dropped; ordered by date then ticker
+    assert list(df['Ticker']) == ['AAA', 'BBB', 'CCC', 'AAA', 'BBB', 'CCC']
+
+
+def test_yf_download_calls_never_overlap(monkeypatch):
+    active, peak, threads_used = [0], [0], []
+    fake = _fake_download([])
+
+    def download(tickers, start, end, interval, group_by, progress, threads, **kwargs):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        threads_used.append(threads)
+        time.sleep(0.01)
+        active[0] -= 1
+        return fake(tickers, start, end, interval, group_by, progress, threads, **kwargs)
+
+    monkeypatch.setattr(security_data_by_yfinance.yf, 'download', download)
+    batches = [[f'T{i}{j}' for j in range(4)] for i in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        frames = list(pool.map(lambda b: security_data_by_yfinance.download_history_frame(
+            b, '2024-03-04', '2024-03-05', chunk_size=2, max_workers=3), batches))
+    # yf.download shares module-level result buffers, so calls are serialized
+    assert peak[0] == 1
+    assert set(threads_used) == {3}
+    for batch, frame in zip(batches, frames):
+        assert sorted(set(frame['Ticker'])) == batch and len(frame) == 8
+
+
+def test_download_prices_by_date_writes_one_batch(monkeypatch):
+    calls, batches = [], []
+    monkeypatch.setattr(security_data_by_yfinance.yf, 'download', _fake_download(calls))
+    securities = [SecurityDtl(security_id=i, ticker=t, name=t, company_name=t, security_currency='usd')
+                  for i, t in enumerate(['AAA', 'STALE', 'NODATA', 'BBB'], start=1)]
+    monkeypatch.setattr(security_crud, 'list_all_public', lambda: securities)
+    monkeypatch.setattr(security_price_crud, 'batch_upsert',
+                        lambda items: batches.append(items) or {'inserted': len(items), 'updated': 0, 'total': len(items)})
+
+    result = security_price_api_routes.download_prices_by_date(date(2024, 3, 5))
+    assert result['attempted'] == 4 and result['saved'] == 2 and result['skipped'] == 2
+    assert len(batches) == 1
+    by_id = {p.security_id: p for p in batches[0]}
+    assert by_id[1].price == 2.2 and by_id[1].volume == 200.0 and by_id[1].price_currency == 'USD'
+    # STALE only has an earlier close, which is not copied forward to the requested date
+    assert set(by_id) == {1, 4}
+    assert all(p.price_date == date(2024, 3, 5) for p in batches[0])
+
+    # Weekends and holidays are not sessions: nothing is fetched or stored
+    result = security_price_api_routes.download_prices_by_date(date(2024, 3, 9))
+    assert result['saved'] == 0 and 'not a trading session' in result['errors'][0]
+    assert len(calls) == 1 and len(batches) == 1
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from source_code.config import pg_db_conn_manager
+
+
+def _fake_db(monkeypatch, ids, watermark=None, fail_update_after=None):
+    """Serve the key-range bounds from `ids`; record UPDATE params and watermark writes."""
+    bounds, updates, watermarks = [], [], []
+
+    def fake_fetch(sql, params=None, as_dicts=True):
+        assert 'transaction_fee_recalc_state' in sql
+        return [{'last_success_ts': watermark}] if watermark else []
+
+    def fake_returning(sql, params=None):
+        assert 'limit %s' in sql.lower()
+        lower_id, limit = params[0], params[-1]
+        page = [i for i in ids if i > lower_id][:limit]
+        bounds.append((sql, params))
+        return [{'upper_id': page[-1] if page else None, 'n': len(page)}]
+
+    def fake_statements(statements, autocommit=False):
+        sql, params = statements[0]
+        if 'transaction_fee_recalc_state' in sql:
+            watermarks.append(params[0])
+            return 1
+        assert 'is distinct from' in sql.lower()
+        if fail_update_after is not None and params[1] == fail_update_after:
+            raise RuntimeError('deadlock detected')
+        updates.append(params)
+        return 1
+
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', fake_fetch)
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_returning', fake_returning)
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_statements', fake_statements)
+    return bounds, updates, watermarks
+
+
+def test_recalculate_fees_walks_key_ranges_and_skips_unchanged(client, monkeypatch):
+    bounds, updates, watermarks = _fake_db(monkeypatch, [10, 20, 30, 40, 50])
+
+    r = client.post('/api/transactions/recalculate-fees?chunk_size=2')
+    assert r.status_code == 200, r.text
+    assert r.json() == {'updated': 3, 'scanned': 5, 'chunks': 3, 'failed_chunks': [], 'changed_since': None}
+    # Each UPDATE is bounded to one (lower, upper] primary key range
+    assert [(p[1], p[2]) for p in updates] == [(-1, 20), (20, 40), (40, 50)]
+    # No watermark yet, so every row was scanned; the clean run stores its start time
+    assert 'last_updated_ts' not in bounds[0][0] and len(watermarks) == 1
+
+
+def test_recalculate_fees_changed_since_filters_ranges(client, monkeypatch):
+    bounds, _, watermarks = _fake_db(monkeypatch, [], watermark=datetime(2024, 1, 1))
+    r = client.post('/api/transactions/recalculate-fees?changed_since=2024-05-01T00:00:00')
+    assert r.status_code == 200
+    assert r.json()['scanned'] == 0
+    sql, params = bounds[0]
+    assert 'last_updated_ts >= %s' in sql
+    assert params[1] == datetime(2024, 5, 1)
+    # An explicit window may skip older rows, so it does not move the watermark
+    assert watermarks == []
+
+
+def test_recalculate_fees_defaults_to_watermark_and_reports_failed_ranges(client, monkeypatch):
+    bounds, updates, watermarks = _fake_db(monkeypatch, [10, 20, 30], watermark=datetime(2024, 6, 1),
+                                           fail_update_after=10)
+    r = client.post('/api/transactions/recalculate-fees?chunk_size=1')
+    assert r.status_code == 200
+    body = r.json()
+    assert bounds[0][1][1] == datetime(2024, 6, 1)
+    assert body['changed_since'] == '2024-06-01T00:00:00'
+    assert body['failed_chunks'] == [{'after_id': 10, 'through_id': 20, 'error': 'deadlock detected'}]
+    # The walk continues past the failed range, but the watermark stays put for a retry
+    assert [(p[1], p[2]) for p in updates] == [(-1, 10), (20, 30)]
+    assert body['updated'] == 2 and body['chunks'] == 3
+    assert watermarks == []
+
+    _, _, watermarks = _fake_db(monkeypatch, [10], watermark=datetime(2024, 6, 1))
+    r = client.post('/api/transactions/recalculate-fees?full=true')
+    assert r.json()['changed_since'] is None and len(watermarks) == 1
@@ -0,0 +1,120 @@
+import io
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from source_code.config import pg_db_conn_manager
+from source_code.crud.job_crud_operations import job_crud
+from source_code.crud.security_crud_operations import security_crud
+from source_code.crud.transaction_crud_operations import transaction_crud
+from source_code.models.models import JobDtl, SecurityDtl
+from source_code.utils import job_runner, price_frame_ingest, security_data_by_yfinance
+from source_code.utils.price_providers import get_provider
+
+
+class _InlineExecutor:
+    # Runs submitted work immediately so tests can assert on the final job state
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+def _fake_jobs(monkeypatch):
+    jobs = {}
+    now = datetime(2024, 1, 1)
+
+    def create(job_type, params=None):
+        job = JobDtl(job_id=len(jobs) + 1, job_type=job_type, status='queued', params=params,
+                     created_ts=now, last_updated_ts=now)
+        jobs[job.job_id] = job
+        return job
+
+    def set_fields(pk, **fields):
+        jobs[pk] = jobs[pk].model_copy(update=fields)
+        return 1
+
+    monkeypatch.setattr(job_crud, 'create', create)
+    monkeypatch.setattr(job_crud, 'get_job', lambda pk: jobs.get(pk))
+    monkeypatch.setattr(job_crud, 'mark_running', lambda pk: set_fields(pk, status='running', started_ts=now))
+    monkeypatch.setattr(job_crud, 'update_progress', lambda pk, progress: set_fields(pk, progress=progress))
+    monkeypatch.setattr(job_crud, 'mark_succeeded', lambda pk, result: set_fields(pk, status='succeeded', result=result, finished_ts=now))
+    monkeypatch.setattr(job_crud, 'mark_failed', lambda pk, error: set_fields(pk, status='failed', error=error, finished_ts=now))
+    monkeypatch.setattr(job_runner, '_get_executor', lambda: _InlineExecutor())
+    return jobs
+
+
+def test_background_csv_import_reports_progress_and_result(client, mock_db, monkeypatch):
+    jobs = _fake_jobs(monkeypatch)
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_values', lambda sql, values, template=None, fetch=False: [{'transaction_id': v[0]} for v in values])
+    spooled = []
+    real_spool = job_runner.spool_upload
+    monkeypatch.setattr(job_runner, 'spool_upload', lambda f, suffix='': spooled.append(real_spool(f, suffix)) or spooled[-1])
+    body = (
+        "portfolio_id,security_id,external_platform_id,transaction_date,transaction_type,transaction_qty,transaction_price\n"
+        "201,301,401,2024-01-01,B,1,10\n"
+        "201,301,401,2024-01-02,B,2,10\n"
+        "201,301,401,2024-01-03,S,1,10\n"
+    ).encode("utf-8")
+
+    r = client.post('/api/transactions/bulk-csv?background=true&chunk_size=2',
+                    files={'file': ('tx.csv', io.BytesIO(body), 'text/csv')})
+    assert r.status_code == 202, r.text
+    accepted = r.json()
+    assert accepted['status'] == 'queued'
+    assert accepted['job_type'] == 'transactions_csv_import'
+
+    r = client.get(f"/api/jobs/{accepted['job_id']}")
+    assert r.status_code == 200
+    job = r.json()
+    assert job['status'] == 'succeeded'
+    assert job['result']['inserted'] == 3
+    assert job['progress']['chunks'] == 2
+    # The spooled upload is removed once the job finishes
+    assert spooled and not os.path.exists(spooled[0])
+    assert jobs[accepted['job_id']].params['chunk_size'] == 2
+
+
+def test_failed_background_job_records_error(client, monkeypatch):
+    _fake_jobs(monkeypatch)
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(transaction_crud, 'recalculate_fees_all', boom)
+    r = client.post('/api/transactions/recalculate-fees?background=true')
+    assert r.status_code == 202
+    job = client.get(f"/api/jobs/{r.json()['job_id']}").json()
+    assert job['status'] == 'failed'
+    assert 'database unavailable' in job['error']
+
+
+def test_job_lookup_and_list_validation(client, monkeypatch):
+    _fake_jobs(monkeypatch)
+    assert client.get('/api/jobs/999').status_code == 404
+    assert client.get('/api/jobs?status=bogus').status_code == 400
+
+
+def test_background_price_download_reports_chunk_progress(client, monkeypatch):
+    _fake_jobs(monkeypatch)
+    snapshots = []
+    monkeypatch.setattr(job_crud, 'update_progress', lambda pk, progress: snapshots.append(progress) or 1)
+
+    def download(tickers, start, end, **kwargs):
+        idx = pd.to_datetime(['2024-03-04'])
+        return pd.concat({t: pd.DataFrame({'Open': [1.0], 'Close': [2.0]}, index=idx) for t in tickers}, axis=1)
+
+    monkeypatch.setattr(security_data_by_yfinance.yf, 'download', download)
+    monkeypatch.setattr(get_provider('yfinance'), 'chunk_size', 1)
+    securities = [SecurityDtl(security_id=i, ticker=t, name=t, company_name=t, security_currency='USD')
+                  for i, t in enumerate(['AAA', 'BBB', 'CCC'], start=1)]
+    monkeypatch.setattr(security_crud, 'list_all_by_ticker', lambda tickers, public_only=True: securities)
+    monkeypatch.setattr(security_crud, 'list_all_public', lambda: securities)
+    monkeypatch.setattr(price_frame_ingest, 'copy_price_table', lambda table: len(table))
+
+    r = client.post('/api/security-prices/download-date-range?background=true',
+                    json={'tickers': ['AAA', 'BBB', 'CCC'], 'from_date': '2024-03-04', 'to_date': '2024-03-04'})
+    assert r.status_code == 202
+    downloads = [s for s in snapshots if s['stage'] == 'download']
+    assert [s['chunks_done'] for s in downloads] == [1, 2, 3] and downloads[-1]['tickers_total'] == 3
+    assert snapshots[-1] == {'stage': 'ingest', 'rows': 3, 'tickers': 3}
+    assert client.get(f"/api/jobs/{r.json()['job_id']}").json()['status'] == 'succeeded'
@@ -0,0 +1,33 @@
+from datetime import date
+
+from source_code.config import pg_db_conn_manager
+
+
+def test_position_series_buckets_with_window_functions(client, monkeypatch):
+    captured = {}
+
+    def fake_fetch(sql, params=None, as_dicts=True):
+        captured['sql'], captured['params'] = sql, params
+        return [
+            {'period_start': date(2024, 1, 1), 'as_of_date': date(2024, 1, 20), 'quantity': 15,
+             'invested_amount': 160, 'avg_cost': 10.6667},
+            {'period_start': date(2024, 2, 1), 'as_of_date': date(2024, 2, 3), 'quantity': 10,
+             'invested_amount': 100, 'avg_cost': 10.6667},
+        ]
+
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', fake_fetch)
+    r = client.get('/api/transactions/position-series?portfolio_id=201&security_id=301&bucket=month&from_date=2024-01-01')
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [p['quantity'] for p in body] == [15, 10]
+    sql = ' '.join(captured['sql'].split())
+    assert "date_trunc('month', transaction_date)::date AS period_start" in sql
+    assert 'OVER w' in sql and 'DISTINCT ON (period_start)' in sql
+    # from_date is applied after the window so running totals keep earlier history
+    assert sql.index('WHERE transaction_date >= %s') > sql.index('FROM running')
+    assert captured['params'] == (201, 301, date(2024, 1, 1))
+
+
+def test_position_series_rejects_unknown_bucket(client):
+    r = client.get('/api/transactions/position-series?portfolio_id=201&security_id=301&bucket=hour')
+    assert r.status_code == 400
@@ -0,0 +1,62 @@
+import math
+from datetime import date
+
+import numpy as np
+import pytest
+
+from source_code.config import pg_db_conn_manager
+from source_code.utils import price_analytics
+from source_code.utils.price_series_store import PriceSeries, price_series_store
+
+DAYS = [date(2024, 1, d) for d in (2, 3, 4, 5, 8, 9)]
+PRICES = [100.0, 110.0, float('nan'), 99.0, 88.0, 121.0]
+
+
+def _ordinals(days):
+    return np.array([d.toordinal() for d in days])
+
+
+def test_compute_metrics_matches_closed_forms():
+    m = price_analytics.compute_metrics(_ordinals(DAYS), PRICES, window=2)
+    px = np.array([100.0, 110.0, 99.0, 88.0, 121.0])
+    returns = px[1:] / px[:-1] - 1
+    assert m['points'] == 5 and m['start_date'] == date(2024, 1, 2) and m['end_date'] == date(2024, 1, 9)
+    assert m['cumulative_return'] == pytest.approx(0.21)
+    assert (m['high'], m['low']) == (121.0, 88.0)
+    assert m['max_drawdown'] == pytest.approx(88 / 110 - 1)
+    assert (m['max_drawdown_peak_date'], m['max_drawdown_trough_date']) == (date(2024, 1, 3), date(2024, 1, 8))
+    assert m['annualized_volatility'] == pytest.approx(np.std(np.diff(np.log(px)), ddof=1) * math.sqrt(252))
+    assert m['sharpe_ratio'] == pytest.approx(returns.mean() / returns.std(ddof=1) * math.sqrt(252))
+    # The NaN price is dropped, so returns are between consecutive valid points
+    assert m['series']['dates'][1] == date(2024, 1, 5)
+    assert m['series']['daily_return'] == pytest.approx(list(returns))
+    assert m['rolling']['dates'] == [date(2024, 1, 5), date(2024, 1, 8), date(2024, 1, 9)]
+    assert m['rolling']['return'] == pytest.approx([-0.01, 0.88 / 1.1 - 1, 121 / 99 - 1])
+    assert len(m['rolling']['volatility']) == 3
+
+
+def test_compute_metrics_short_series():
+    m = price_analytics.compute_metrics(_ordinals(DAYS[:1]), [50.0], include_series=False)
+    assert m['cumulative_return'] == 0.0 and m['max_drawdown'] == 0.0
+    assert m['annualized_volatility'] is None and m['sharpe_ratio'] is None and 'series' not in m
+
+
+def test_analytics_endpoint_reads_price_store(client, monkeypatch):
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data',
+                        lambda sql, params=None, as_dicts=True: [{'ticker': 'AAA', 'security_id': 7}])
+    store = {7: PriceSeries(7, _ordinals(DAYS), price=np.array(PRICES))}
+    monkeypatch.setattr(price_series_store, 'get', lambda sid: store[sid])
+
+    r = client.get('/api/security-prices/analytics?tickers=aaa,ZZZ&from=2024-01-03&include_series=false&window=2')
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body['missing'] == ['ZZZ']
+    aaa = body['analytics']['AAA']
+    assert aaa['security_id'] == 7 and aaa['points'] == 4 and aaa['start_date'] == '2024-01-03'
+    assert aaa['cumulative_return'] == pytest.approx(0.1)
+    assert 'series' not in aaa and aaa['rolling']['window'] == 2
+
+
+def test_analytics_rejects_unknown_field(client):
+    r = client.get('/api/security-prices/analytics?tickers=AAA&field=secret')
+    assert r.status_code == 400
@@ -0,0 +1,74 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from source_code.crud.price_backfill_crud_operations import price_backfill_crud
+from source_code.utils import price_backfill, price_frame_ingest
+from source_code.utils.price_providers import YFinanceProvider
+
+
+@pytest.fixture
+def checkpoints(monkeypatch):
+    """In-memory price_backfill_unit_dtl keyed by (run_id, unit_no)."""
+    table = {}
+
+    def create_units(units):
+        for u in units:
+            table.setdefault((u.run_id, u.unit_no), u.model_copy())
+        return len(units)
+
+    def update(run_id, unit_no, **changes):
+        table[(run_id, unit_no)] = table[(run_id, unit_no)].model_copy(update=changes)
+        return 1
+
+    monkeypatch.setattr(price_backfill_crud, 'create_units', create_units)
+    monkeypatch.setattr(price_backfill_crud, 'list_units',
+                        lambda run_id: [u for (r, _), u in sorted(table.items()) if r == run_id])
+    monkeypatch.setattr(price_backfill_crud, 'mark_running', lambda r, n: update(r, n, status='running'))
+    monkeypatch.setattr(price_backfill_crud, 'mark_done', lambda r, n, rows: update(r, n, status='done', rows_saved=rows))
+    monkeypatch.setattr(price_backfill_crud, 'mark_failed', lambda r, n, err: update(r, n, status='failed', error=err))
+    return table
+
+
+def test_plan_units_skips_windows_without_sessions():
+    # 2024-03-30/31 is a weekend; with 2-day windows it produces no units
+    units = price_backfill.plan_units(1, ['b', 'A', 'C'], date(2024, 3, 28), date(2024, 4, 2), chunk_size=2, window_days=2)
+    assert [(u.from_date.day, u.to_date.day, u.tickers) for u in units] == [
+        (28, 29, ['A', 'B']), (28, 29, ['C']), (1, 2, ['A', 'B']), (1, 2, ['C'])]
+    assert [u.unit_no for u in units] == [1, 2, 3, 4]
+
+
+def test_backfill_checkpoints_and_resumes(checkpoints, monkeypatch):
+    calls = []
+    fail = {'C'}
+
+    def fake_download(tickers, start, end, **kwargs):
+        calls.append((tuple(tickers), start))
+        if fail & set(tickers):
+            raise RuntimeError('throttled')
+        return pd.DataFrame({'Date': [pd.Timestamp(start)] * len(tickers), 'Ticker': tickers, 'Close': [1.0] * len(tickers)})
+
+    monkeypatch.setattr(YFinanceProvider, 'fetch_history', lambda self, *args, **kwargs: fake_download(*args, **kwargs))
+    monkeypatch.setattr(price_frame_ingest, 'ingest_price_frame', lambda frame, **kw: {'total': len(frame)})
+
+    first = price_backfill.run_backfill(date(2024, 3, 4), date(2024, 3, 15), ['A', 'B', 'C'],
+                                        chunk_size=2, window_days=7, max_workers=2)
+    assert first['units_total'] == 4 and first['units_done'] == 2 and first['units_failed'] == 2
+    assert first['rows_saved'] == 4 and 'rows_per_sec' in first
+    assert not first['resumed']
+
+    status = price_backfill.run_status(first['run_id'])
+    assert status['by_status'] == {'done': 2, 'failed': 2}
+
+    calls.clear()
+    fail.clear()
+    second = price_backfill.run_backfill(run_id=first['run_id'], max_workers=2)
+    assert sorted(calls) == [(('C',), '2024-03-04'), (('C',), '2024-03-11')]
+    assert second['units_done'] == 4 and second['units_failed'] == 0 and second['resumed']
+
+
+def test_backfill_routes(client, checkpoints):
+    assert client.get('/api/security-prices/backfill/123').status_code == 404
+    r = client.post('/api/security-prices/backfill', json={'run_id': 123})
+    assert r.status_code == 400
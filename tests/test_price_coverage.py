@@ -0,0 +1,61 @@
+from datetime import date
+
+import pandas as pd
+
+from source_code.config import pg_db_conn_manager
+from source_code.crud import security_price_api_routes
+from source_code.crud.security_crud_operations import security_crud
+from source_code.models.models import SecurityDtl
+from source_code.utils import price_coverage, price_frame_ingest
+from source_code.utils.price_providers import YFinanceProvider
+
+
+def _covered(rows):
+    return lambda query, params=None, as_dicts=True: [{'security_id': s, 'price_date': d} for s, d in rows]
+
+
+def test_missing_spans_skip_weekends_and_covered_sessions(monkeypatch):
+    # Mon 2024-03-04 .. Fri 2024-03-15; security 1 has Tue-Thu of week one, security 2 has everything
+    week = [date(2024, 3, d) for d in (4, 5, 6, 7, 8, 11, 12, 13, 14, 15)]
+    rows = [(1, date(2024, 3, d)) for d in (5, 6, 7)] + [(2, d) for d in week]
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', _covered(rows))
+
+    spans = price_coverage.missing_spans([1, 2, 3], date(2024, 3, 4), date(2024, 3, 15))
+    assert 2 not in spans
+    assert spans[1] == [(date(2024, 3, 4), date(2024, 3, 4)), (date(2024, 3, 8), date(2024, 3, 15))]
+    assert spans[3] == [(date(2024, 3, 4), date(2024, 3, 15))]
+
+    merged = price_coverage.missing_spans([1], date(2024, 3, 4), date(2024, 3, 15), merge_within=3)
+    assert merged[1] == [(date(2024, 3, 4), date(2024, 3, 15))]
+
+
+def test_plan_groups_tickers_sharing_a_span():
+    last = (date(2024, 3, 15), date(2024, 3, 15))
+    plan = price_coverage.plan_fetches({'MSFT': [last], 'AAPL': [last], 'NEW': [(date(2024, 3, 4), date(2024, 3, 15))]})
+    assert plan == [(date(2024, 3, 4), date(2024, 3, 15), ['NEW']), (date(2024, 3, 15), date(2024, 3, 15), ['AAPL', 'MSFT'])]
+
+
+def test_missing_only_sync_fetches_and_loads_only_gaps(monkeypatch):
+    securities = [SecurityDtl(security_id=1, ticker='AAA', name='A', company_name='A', security_currency='USD'),
+                  SecurityDtl(security_id=2, ticker='BBB', name='B', company_name='B', security_currency='USD')]
+    monkeypatch.setattr(security_crud, 'list_all_public', lambda: securities)
+    # AAA is missing only Friday; BBB is fully covered
+    rows = [(1, date(2024, 3, d)) for d in (11, 12, 13, 14)] + [(2, date(2024, 3, d)) for d in (11, 12, 13, 14, 15)]
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', _covered(rows))
+
+    calls, loaded = [], []
+
+    def fake_download(tickers, start, end, **kwargs):
+        calls.append((tickers, start, end))
+        return pd.DataFrame({'Date': pd.to_datetime(['2024-03-15']), 'Ticker': ['AAA'], 'Open': [1.0], 'High': [1.0],
+                             'Low': [1.0], 'Close': [1.0], 'Volume': [5.0]})
+
+    monkeypatch.setattr(YFinanceProvider, 'fetch_history', lambda self, *args, **kwargs: fake_download(*args, **kwargs))
+    monkeypatch.setattr(price_frame_ingest, 'copy_price_table', lambda table: loaded.append(table) or len(table))
+
+    req = security_price_api_routes.DownloadPricesRequest(from_date=date(2024, 3, 11), to_date=date(2024, 3, 17),
+                                                          incl_missing_securities_only=True)
+    result = security_price_api_routes._download_date_range(req)
+    assert calls == [(['AAA'], '2024-03-15', '2024-03-15')]
+    assert loaded[0]['security_id'].tolist() == [1]
+    assert result['tickers'] == ['AAA']
@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from source_code.config import pg_db_conn_manager
+from source_code.utils import price_downsample
+
+
+def _days(n, start=date(2024, 1, 1)):
+    return [start + timedelta(days=i) for i in range(n)]
+
+
+def test_month_buckets_aggregate_ohlc():
+    days = [date(2024, 1, 30), date(2024, 1, 31), date(2024, 2, 1), date(2024, 2, 2)]
+    dates, cols = price_downsample.downsample_columns(days, {
+        'open_px': [1.0, 2.0, 3.0, 4.0], 'high_px': [5.0, None, 7.0, 6.0], 'low_px': [0.5, 0.4, None, None],
+        'price': [1.5, 2.5, 3.5, None], 'volume': [10.0, 20.0, None, None],
+    }, bucket='month')
+    assert dates == [date(2024, 1, 31), date(2024, 2, 2)]
+    assert cols == {'open_px': [1.0, 3.0], 'high_px': [5.0, 7.0], 'low_px': [0.4, None],
+                    'price': [2.5, None], 'volume': [30.0, None]}
+
+
+def test_week_buckets_start_on_monday():
+    # 2024-01-07 is a Sunday, 2024-01-08 a Monday
+    dates, cols = price_downsample.downsample_columns(_days(9), {'price': list(map(float, range(9)))}, bucket='week')
+    assert dates == [date(2024, 1, 7), date(2024, 1, 9)]
+    assert cols['price'] == [6.0, 8.0]
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    y = np.zeros(1000)
+    y[400], y[700] = 50.0, -40.0
+    idx = price_downsample.lttb_indices(np.arange(1000), y, 20)
+    assert len(idx) == 20 and idx[0] == 0 and idx[-1] == 999
+    assert 400 in idx and 700 in idx
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_series_endpoint_downsamples(client, monkeypatch):
+    days = _days(500)
+    rows = [{'ticker': 'AAA', 'security_id': 1, 'price_date': d, 'price': float(i), 'volume': 1.0}
+            for i, d in enumerate(days)]
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', lambda sql, params=None, as_dicts=True: rows)
+
+    r = client.get('/api/security-prices/series?tickers=AAA&fields=price,volume&points=50')
+    assert r.status_code == 200, r.text
+    aaa = r.json()['series']['AAA']
+    assert aaa['source_points'] == 500 and len(aaa['dates']) == 50 == len(aaa['volume'])
+    assert aaa['dates'][0] == '2024-01-01' and aaa['price'][-1] == 499.0
+
+    r = client.get('/api/security-prices/series?tickers=AAA&fields=price,volume&bucket=Month')
+    aaa = r.json()['series']['AAA']
+    assert len(aaa['dates']) == 17 and aaa['volume'][0] == 31.0
+
+    assert client.get('/api/security-prices/series?tickers=AAA&bucket=hour').status_code == 400
+    assert client.get('/api/security-prices/series?tickers=AAA&points=1').status_code == 400
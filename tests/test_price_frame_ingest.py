@@ -0,0 +1,77 @@
+from datetime import date, datetime, timezone
+
+import pandas as pd
+
+from source_code.config import pg_db_conn_manager
+from source_code.crud.security_crud_operations import security_crud
+from source_code.models.models import SecurityDtl
+from source_code.utils import price_frame_ingest
+from source_code.utils.price_series_store import price_series_store
+
+
+def _frame():
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2024-03-04', '2024-03-04', '2024-03-05', '2024-03-05', '2024-03-05']),
+        'Ticker': [' aaa', 'ZZZ', 'AAA', 'BBB', 'AAA'],
+        'Open': [1.0, 2.0, 3.0, None, 3.1],
+        'Close': [1.5, 2.0, 3.5, None, 3.6],
+        'Volume': [100.0, 1.0, 200.4, 5.0, None],
+        'Adj Close': [1.4, 2.0, 3.4, 1.0, 3.5],
+    })
+
+
+def test_frame_maps_to_price_columns():
+    table, skipped = price_frame_ingest.frame_to_price_table(_frame(), {'AAA': 1, 'BBB': 2}, {'AAA': 'CAD'},
+                                                             price_source_id=7, addl_notes='Yahoo')
+    assert list(table.columns) == price_frame_ingest.PRICE_COLUMNS
+    # Unknown ticker and missing close are skipped; the duplicate (AAA, 2024-03-05) keeps the last row
+    assert table[['security_id', 'price_date', 'price']].values.tolist() == [[1, date(2024, 3, 4), 1.5], [1, date(2024, 3, 5), 3.6]]
+    assert table['price_currency'].tolist() == ['CAD', 'CAD'] and set(table['price_source_id']) == {7}
+    assert table['volume'].isna().tolist() == [False, True]
+    assert table['security_price_id'].is_unique
+    assert skipped == {'read': 5, 'skipped_unknown_ticker': ['ZZZ'], 'skipped_bad_data_count': 1}
+
+
+def test_ingest_streams_copy_buffer(monkeypatch):
+    securities = [SecurityDtl(security_id=1, ticker='AAA', name='A', company_name='A', security_currency='usd'),
+                  SecurityDtl(security_id=2, ticker='BBB', name='B', company_name='B', security_currency='USD')]
+    monkeypatch.setattr(security_crud, 'list_all_public', lambda: securities)
+    captured = {}
+
+    def copy_and_merge(staging_ddl, copy_sql, data, merge_sql):
+        captured.update(ddl=staging_ddl, copy=copy_sql, body=data.read(), merge=merge_sql)
+        return 2
+
+    monkeypatch.setattr(pg_db_conn_manager, 'copy_and_merge', copy_and_merge)
+    invalidated = []
+    monkeypatch.setattr(price_series_store, 'invalidate', lambda *ids: invalidated.extend(ids))
+
+    summary = price_frame_ingest.ingest_price_frame(_frame())
+    assert summary['total'] == 2 and summary['skipped_unknown_ticker'] == ['ZZZ']
+    assert captured['copy'].startswith('COPY security_price_stage (security_price_id, security_id')
+    assert 'ON CONFLICT (security_id, price_source_id, price_date)' in captured['merge']
+    lines = captured['body'].splitlines()
+    assert len(lines) == 2
+    fields = lines[1].split(',')
+    assert fields[1:5] == ['1', str(price_frame_ingest.DEFAULT_PRICE_SOURCE_ID), '2024-03-05', '3.6']
+    assert fields[10] == '\\N' and fields[12] == 'Yahoo' and fields[13] == 'USD'
+    assert invalidated == [1]
+
+
+def test_copy_writes_audit_timestamps_with_utc_offset(monkeypatch):
+    captured = {}
+
+    def copy_and_merge(staging_ddl, copy_sql, data, merge_sql):
+        captured.update(ddl=staging_ddl, body=data.read())
+        return 1
+
+    monkeypatch.setattr(pg_db_conn_manager, 'copy_and_merge', copy_and_merge)
+    monkeypatch.setattr(price_series_store, 'invalidate', lambda *ids: None)
+    monkeypatch.setattr(price_frame_ingest.domain_utils, 'get_current_date_time',
+                        lambda: datetime(2024, 3, 5, 21, 30, 0, 5, tzinfo=timezone.utc))
+    table, _ = price_frame_ingest.frame_to_price_table(_frame(), {'AAA': 1})
+    price_frame_ingest.copy_price_table(table.head(1))
+    fields = captured['body'].strip().split(',')
+    # Same UTC instant as the psycopg2 writers send; staged as timestamptz so the offset is applied
+    assert fields[-2:] == ['2024-03-05 21:30:00.000005+00:00'] * 2
+    assert 'ALTER COLUMN created_ts TYPE timestamptz' in captured['ddl']
@@ -0,0 +1,119 @@
+from datetime import date
+
+import pytest
+
+from source_code.config import pg_db_conn_manager
+from source_code.utils import price_partitions
+
+
+def _catalog(monkeypatch, partitions):
+    """Answer the pg_class / pg_inherits lookups for a partitioned security_price_dtl."""
+
+    def fetch_data(sql, params=None):
+        if 'FROM pg_class' in sql:
+            return [{'relkind': 'p'}]
+        if 'FROM pg_inherits' in sql:
+            return partitions
+        return []
+
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', fetch_data)
+
+
+def _record_statements(monkeypatch, rowcount=0):
+    calls = []
+
+    def execute_statements(statements, autocommit=False):
+        calls.append((statements, autocommit))
+        return rowcount
+
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_statements', execute_statements)
+    return calls
+
+
+def _range(name, start, end):
+    return {'name': name, 'bound': f"FOR VALUES FROM ('{start}') TO ('{end}')", 'approx_rows': 10}
+
+
+def test_plan_partitions_month_and_year():
+    plan = price_partitions.plan_partitions(date(2023, 12, 15), date(2024, 1, 2), 'month')
+    assert plan == [('security_price_dtl_m202312', date(2023, 12, 1), date(2024, 1, 1)),
+                    ('security_price_dtl_m202401', date(2024, 1, 1), date(2024, 2, 1))]
+    plan = price_partitions.plan_partitions(date(2023, 6, 1), date(2024, 6, 1), 'year')
+    assert [name for name, _, _ in plan] == ['security_price_dtl_y2023', 'security_price_dtl_y2024']
+    with pytest.raises(ValueError):
+        price_partitions.plan_partitions(date(2024, 1, 1), date(2024, 2, 1), 'week')
+
+
+def test_ensure_creates_missing_years_and_moves_default_rows(monkeypatch):
+    year = date.today().year
+    _catalog(monkeypatch, [
+        {'name': 'security_price_dtl_default', 'bound': 'DEFAULT', 'approx_rows': -1},
+        _range(f'security_price_dtl_y{year}', f'{year}-01-01', f'{year + 1}-01-01'),
+    ])
+    calls = _record_statements(monkeypatch)
+    result = price_partitions.ensure_partitions(ahead=2)
+    assert result['granularity'] == 'year'
+    assert result['created'] == [f'security_price_dtl_y{year + 1}', f'security_price_dtl_y{year + 2}']
+    statements, autocommit = calls[0]
+    assert not autocommit
+    assert statements[0] == (f'CREATE TABLE security_price_dtl_y{year + 1} '
+                             '(LIKE security_price_dtl INCLUDING DEFAULTS)')
+    move_sql, params = statements[1]
+    assert 'DELETE FROM security_price_dtl_default' in move_sql
+    assert params == (date(year + 1, 1, 1), date(year + 2, 1, 1))
+    assert statements[2].endswith(f"ATTACH PARTITION security_price_dtl_y{year + 1} "
+                                  f"FOR VALUES FROM ('{year + 1}-01-01') TO ('{year + 2}-01-01')")
+
+
+def test_ensure_requires_partitioned_table(monkeypatch):
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', lambda sql, params=None: [{'relkind': 'r'}])
+    with pytest.raises(ValueError, match='not partitioned'):
+        price_partitions.ensure_partitions()
+
+
+def test_migrate_copies_per_range_then_swaps(monkeypatch):
+    def fetch_data(sql, params=None):
+        if 'FROM pg_class' in sql:
+            return [{'relkind': 'r'}]
+        return [{'first_date': date(date.today().year - 1, 3, 4)}]
+
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', fetch_data)
+    calls = _record_statements(monkeypatch, rowcount=5)
+    progress = []
+    result = price_partitions.migrate('year', ahead=1, progress=progress.append)
+
+    setup = calls[0][0]
+    assert setup[0].endswith('PARTITION BY RANGE (price_date)')
+    assert 'PRIMARY KEY (security_price_id, price_date)' in setup[1]
+    assert 'security_price_dtl_default PARTITION OF security_price_dtl_new DEFAULT' in setup[4]
+    # last year, this year, next year, then the default partition
+    copies = calls[1:-1]
+    assert len(copies) == 4 and progress[-1]['ranges_done'] == 4
+    assert result['rows_copied'] == 20 and result['partitions'] == 4
+
+    swap = calls[-1][0]
+    assert swap[0] == 'LOCK TABLE security_price_dtl IN SHARE ROW EXCLUSIVE MODE'
+    assert 'ON CONFLICT (security_id, price_source_id, price_date) DO UPDATE' in swap[1][0]
+    assert 'ALTER TABLE security_price_dtl_new RENAME TO security_price_dtl' in swap
+
+
+def test_detach_old_partitions(monkeypatch):
+    ranges = [_range('security_price_dtl_y2014', '2014-01-01', '2015-01-01'),
+              _range('security_price_dtl_y2015', '2015-01-01', '2016-01-01')]
+    _catalog(monkeypatch, ranges)
+    calls = _record_statements(monkeypatch)
+    assert price_partitions.detach_partitions(date(2015, 1, 1)) == {'detached': ['security_price_dtl_y2014']}
+    assert calls == [(['ALTER TABLE security_price_dtl DETACH PARTITION security_price_dtl_y2014 CONCURRENTLY'],
+                      True)]
+
+    # PostgreSQL rejects DETACH ... CONCURRENTLY while a DEFAULT partition exists
+    _catalog(monkeypatch, [{'name': 'security_price_dtl_default', 'bound': 'DEFAULT', 'approx_rows': 0}] + ranges)
+    calls = _record_statements(monkeypatch)
+    price_partitions.detach_partitions(date(2015, 1, 1))
+    assert calls == [(['ALTER TABLE security_price_dtl DETACH PARTITION security_price_dtl_y2014'], False)]
+
+
+def test_partitions_endpoint(client):
+    r = client.get('/api/security-prices/partitions')
+    assert r.status_code == 200
+    assert r.json() == {'partitioned': False, 'partitions': []}
@@ -0,0 +1,62 @@
+from datetime import date
+
+import pytest
+
+from source_code.crud import security_price_api_routes
+from source_code.crud.security_crud_operations import security_crud
+from source_code.crud.security_price_crud_operations import security_price_crud
+from source_code.models.models import SecurityDtl
+from source_code.utils import price_providers
+from source_code.utils.price_providers import FileProvider, get_provider, register_provider
+
+
+@pytest.fixture
+def price_file(tmp_path):
+    path = tmp_path / 'prices.csv'
+    path.write_text(
+        "Date,Ticker,Open,High,Low,Close,Volume,Adj Close\n"
+        "2024-03-04,aaa,1,1,1,10.0,100,10.0\n"
+        "2024-03-05,AAA,1,1,1,11.0,100,11.0\n"
+        "2024-03-05,BBB,1,1,1,20.0,100,20.0\n"
+        "2024-03-06,BBB,1,1,1,21.0,100,21.0\n"
+    )
+    return str(path)
+
+
+def test_file_provider_history_and_quotes(price_file):
+    provider = FileProvider(price_file)
+    frame = provider.fetch_history(['aaa', 'BBB'], '2024-03-05', '2024-03-05')
+    assert list(frame['Ticker']) == ['AAA', 'BBB']
+    assert list(frame.columns) == price_providers.HISTORY_COLUMNS
+    quotes = provider.fetch_quotes(['AAA', 'BBB', 'ZZZ'])
+    assert quotes['AAA']['price'] == 11.0 and quotes['BBB']['as_of'] == date(2024, 3, 6)
+    assert 'ZZZ' not in quotes
+
+
+def test_file_provider_directory_and_env(price_file, monkeypatch, tmp_path):
+    monkeypatch.setenv('PRICE_PROVIDER_FILE_PATH', str(tmp_path))
+    assert FileProvider().fetch_history(['BBB'], '2024-03-01', '2024-03-31')['Close'].tolist() == [20.0, 21.0]
+    with pytest.raises(FileNotFoundError):
+        FileProvider(str(tmp_path / 'missing')).fetch_history(['AAA'], '2024-03-01', '2024-03-31')
+
+
+def test_registry(monkeypatch):
+    assert {'yfinance', 'yahooquery', 'file'} <= set(price_providers.available_providers())
+    monkeypatch.setenv('PRICE_PROVIDER', 'yfinance')
+    assert get_provider() is get_provider('YFINANCE')
+    assert get_provider().governor is get_provider('yfinance').governor
+    with pytest.raises(ValueError):
+        get_provider('nope')
+
+
+def test_download_by_date_uses_selected_provider(price_file, monkeypatch):
+    register_provider('test-file', lambda: FileProvider(price_file))
+    securities = [SecurityDtl(security_id=1, ticker='AAA', name='A', company_name='A', security_currency='USD'),
+                  SecurityDtl(security_id=2, ticker='BBB', name='B', company_name='B', security_currency='USD')]
+    monkeypatch.setattr(security_crud, 'list_all_public', lambda: securities)
+    saved = []
+    monkeypatch.setattr(security_price_crud, 'batch_upsert', lambda items: saved.extend(items) or {'total': len(items)})
+
+    result = security_price_api_routes.download_prices_by_date(date(2024, 3, 5), provider='test-file')
+    assert result['saved'] == 2
+    assert sorted((p.security_id, p.close_px) for p in saved) == [(1, 11.0), (2, 20.0)]
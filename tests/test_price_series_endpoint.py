@@ -0,0 +1,33 @@
+from datetime import date
+
+from source_code.config import pg_db_conn_manager
+
+
+def test_series_resolves_all_tickers_in_one_query(client, monkeypatch):
+    calls = []
+
+    def fake_fetch(sql, params=None, as_dicts=True):
+        calls.append((sql, params))
+        return [
+            {'ticker': 'AAA', 'security_id': 1, 'price_date': date(2024, 1, 2), 'price': 10, 'close_px': 10.1},
+            {'ticker': 'AAA', 'security_id': 1, 'price_date': date(2024, 1, 3), 'price': 11, 'close_px': None},
+            {'ticker': 'BBB', 'security_id': 2, 'price_date': date(2024, 1, 2), 'price': 20, 'close_px': 20.5},
+        ]
+
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', fake_fetch)
+    r = client.get('/api/security-prices/series?tickers=aaa,BBB,ZZZ,aaa&from=2024-01-01&to=2024-01-31&fields=price,close_px')
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body['series']['AAA'] == {'security_id': 1, 'dates': ['2024-01-02', '2024-01-03'],
+                                     'price': [10.0, 11.0], 'close_px': [10.1, None]}
+    assert body['series']['BBB']['price'] == [20.0]
+    assert body['missing'] == ['ZZZ']
+    assert len(calls) == 1
+    sql, params = calls[0]
+    assert '= ANY(%s)' in sql
+    assert params == (['AAA', 'BBB', 'ZZZ'], date(2024, 1, 1), date(2024, 1, 31))
+
+
+def test_series_rejects_unknown_fields(client):
+    r = client.get('/api/security-prices/series?tickers=AAA&fields=price,secret')
+    assert r.status_code == 400
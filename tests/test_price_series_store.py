@@ -0,0 +1,63 @@
+from datetime import date
+
+import numpy as np
+
+from source_code.models.models import SecurityPriceDtlInput
+from source_code.utils.price_series_store import PriceSeries, PriceSeriesStore
+
+
+def _rows(*points):
+    return [{'price_date': d, 'price': p, 'close_px': p, 'volume': 100} for d, p in points]
+
+
+def test_series_slices_and_as_of_lookups():
+    s = PriceSeries.from_rows(1, _rows((date(2024, 1, 3), 11.0), (date(2024, 1, 2), 10.0), (date(2024, 1, 5), 12.0),
+                                       (date(2024, 1, 3), 11.5)))
+    assert s.dates.dtype == np.int32 and s.price.dtype == np.float64
+    # Sorted by date; the later row wins for a repeated date
+    assert [p for _, p in s.iter_points()] == [10.0, 11.5, 12.0]
+    assert [d for d, _ in s.slice(date(2024, 1, 3), date(2024, 1, 4)).iter_points()] == [date(2024, 1, 3)]
+    assert s.as_of(date(2024, 1, 4)) == (date(2024, 1, 3), 11.5)
+    assert s.as_of(date(2024, 1, 1)) is None
+    assert np.isnan(s.open_px).all()
+
+
+def test_store_loads_lazily_evicts_lru_and_merges_upserts():
+    loads = []
+
+    def loader(security_id):
+        loads.append(security_id)
+        return PriceSeries.from_rows(security_id, _rows((date(2024, 1, 2), 10.0 + security_id)))
+
+    one_series_bytes = loader(0).nbytes
+    loads.clear()
+    store = PriceSeriesStore(max_bytes=2 * one_series_bytes, loader=loader)
+    store.get(1)
+    store.get(2)
+    store.get(1)
+    assert loads == [1, 2]
+    store.get(3)  # over budget: evicts 2, the least recently used
+    assert store.stats()['securities'] == 2
+    store.get(2)
+    assert loads == [1, 2, 3, 2]
+
+    store.apply_upserts([SecurityPriceDtlInput(security_id=2, price_source_id=9, price_date=date(2024, 1, 3), price=20.0)])
+    assert store.get(2).as_of(date(2024, 1, 9)) == (date(2024, 1, 3), 20.0)
+    assert loads == [1, 2, 3, 2]
+
+    store.invalidate(2)
+    store.get(2)
+    assert loads[-1] == 2 and len(loads) == 5
+
+
+def test_load_racing_with_a_write_is_not_cached():
+    store = PriceSeriesStore(max_bytes=10_000, loader=None)
+
+    def loader(security_id):
+        # A write lands while the (stale) load is in flight
+        store.invalidate(security_id)
+        return PriceSeries.from_rows(security_id, _rows((date(2024, 1, 2), 1.0)))
+
+    store._loader = loader
+    store.get(7)
+    assert store.stats()['securities'] == 0
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from source_code.utils import security_data_by_yahooquery, security_data_by_yfinance
+
+
+@pytest.fixture
+def cache_env(monkeypatch, tmp_path):
+    monkeypatch.setenv('PROVIDER_CACHE_ENABLED', 'true')
+    monkeypatch.setenv('PROVIDER_CACHE_PATH', str(tmp_path / 'cache.sqlite'))
+    monkeypatch.delenv('PROVIDER_CACHE_OFFLINE', raising=False)
+    return monkeypatch
+
+
+def _patch_download(monkeypatch):
+    calls = []
+
+    def download(tickers, start, end, **kwargs):
+        calls.append(list(tickers))
+        idx = pd.to_datetime(['2024-03-04', '2024-03-05'])
+        return pd.concat({t: pd.DataFrame({'Open': [1.0, 2.0], 'Close': [1.5, 2.5]}, index=idx) for t in tickers if t != 'GONE'}
+                         | {t: pd.DataFrame({'Open': [None, None], 'Close': [None, None]}, index=idx, dtype=float)
+                            for t in tickers if t == 'GONE'}, axis=1)
+
+    monkeypatch.setattr(security_data_by_yfinance.yf, 'download', download)
+    return calls
+
+
+def test_history_served_from_cache_on_rerun(cache_env):
+    calls = _patch_download(cache_env)
+    first = security_data_by_yfinance.download_history_frame(['AAA', 'BBB', 'GONE'], '2024-03-04', '2024-03-05')
+    assert calls == [['AAA', 'BBB', 'GONE']]
+
+    second = security_data_by_yfinance.download_history_frame(['AAA', 'BBB', 'CCC', 'GONE'], '2024-03-04', '2024-03-05')
+    # Only tickers without cached data go to the network (empty results are not cached)
+    assert calls[1] == ['CCC', 'GONE']
+    pd.testing.assert_frame_equal(second[second['Ticker'] != 'CCC'].reset_index(drop=True), first, check_dtype=False)
+    assert second['Date'].dtype.kind == 'M'
+
+
+def test_offline_mode_never_calls_provider(cache_env):
+    calls = _patch_download(cache_env)
+    security_data_by_yfinance.download_history_frame(['AAA'], '2024-03-04', '2024-03-05')
+    cache_env.setenv('PROVIDER_CACHE_OFFLINE', '1')
+    frame = security_data_by_yfinance.download_history_frame(['AAA', 'NEW'], '2024-03-04', '2024-03-05')
+    assert len(calls) == 1
+    assert set(frame['Ticker']) == {'AAA'}
+
+
+def test_recent_spans_expire(cache_env):
+    calls = _patch_download(cache_env)
+    cache_env.setenv('PROVIDER_CACHE_RECENT_TTL_SEC', '-1')
+    recent = (date.today() - timedelta(days=1)).isoformat()
+    security_data_by_yfinance.download_history_frame(['AAA'], '2024-03-04', recent)
+    security_data_by_yfinance.download_history_frame(['AAA'], '2024-03-04', recent)
+    assert len(calls) == 2
+
+
+def test_yahooquery_payloads_cached(cache_env):
+    created = []
+
+    class FakeTicker:
+        def __init__(self, symbols, asynchronous=True):
+            created.append(list(symbols))
+            self.price = {s: {'shortName': s, 'longName': s + ' Inc', 'currency': 'USD'} for s in symbols}
+            self.asset_profile = self.financial_data = self.key_stats = self.summary_detail = {s: {} for s in symbols}
+
+    cache_env.setattr(security_data_by_yahooquery, 'Ticker', FakeTicker)
+    security_data_by_yahooquery.get_security_data(['AAA', 'BBB'])
+    data = security_data_by_yahooquery.get_security_data(['AAA', 'BBB', 'CCC'])
+    assert created == [['AAA', 'BBB'], ['CCC']]
+    assert data['price']['AAA']['longName'] == 'AAA Inc' and set(data['price']) == {'AAA', 'BBB', 'CCC'}
@@ -0,0 +1,89 @@
+from datetime import date
+
+import pandas as pd
+
+from source_code.config import pg_db_conn_manager
+from source_code.crud.holding_crud_operations import holding_crud
+from source_code.crud.security_price_crud_operations import security_price_crud
+from source_code.models.models import SecurityPriceDtl, SecurityPriceDtlInput
+from source_code.utils import price_frame_ingest
+from source_code.utils.price_series_store import price_series_store
+
+
+def _record_sql(monkeypatch):
+    calls = []
+
+    def execute_query(sql, params=None):
+        calls.append((sql.strip(), params))
+        return 1
+
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_query', execute_query)
+    return calls
+
+
+def test_save_and_delete_keep_latest_current(monkeypatch):
+    calls = _record_sql(monkeypatch)
+    monkeypatch.setattr(price_series_store, 'apply_upserts', lambda items: None)
+    monkeypatch.setattr(price_series_store, 'invalidate', lambda *ids: None)
+    saved = security_price_crud.save(SecurityPriceDtlInput(security_id=301, price_source_id=1,
+                                                           price_date=date(2024, 3, 1), price=10.0))
+    sql, params = calls[-1]
+    assert sql.startswith('INSERT INTO security_latest_price')
+    assert 'WHERE EXCLUDED.price_date >= security_latest_price.price_date' in sql
+    assert params == ([301], date(2024, 3, 1))
+
+    monkeypatch.setattr(security_price_crud, 'get_security', lambda pk: saved)
+    assert security_price_crud.delete(saved.security_price_id)
+    sql, params = calls[-1]
+    # A delete can move the latest row back in time, so the security is rebuilt
+    assert sql.startswith('DELETE FROM security_latest_price')
+    assert params == {'ids': [301]}
+
+
+def test_copy_ingest_advances_from_earliest_date(monkeypatch):
+    advanced = []
+    monkeypatch.setattr(pg_db_conn_manager, 'copy_and_merge', lambda *args: 3)
+    monkeypatch.setattr(security_price_crud, 'advance_latest', lambda ids, since: advanced.append((ids, since)))
+    monkeypatch.setattr(price_series_store, 'invalidate', lambda *ids: None)
+    table = pd.DataFrame({c: [1.0, 1.0, 1.0] for c in price_frame_ingest.PRICE_COLUMNS})
+    table['security_id'] = [301, 301, 302]
+    table['price_date'] = [date(2024, 3, 4), date(2024, 3, 1), date(2024, 3, 5)]
+    price_frame_ingest.copy_price_table(table)
+    assert advanced == [([301, 302], date(2024, 3, 1))]
+
+
+def test_recalc_uses_latest_price_without_loading_history(monkeypatch, mock_db):
+    mock_db.tables['transaction_dtl'][1] = {
+        'transaction_id': 1, 'portfolio_id': 201, 'security_id': 301, 'transaction_date': date(2024, 1, 2),
+        'transaction_type': 'BUY', 'transaction_qty': 4.0, 'transaction_price': 10.0,
+    }
+    latest = SecurityPriceDtl(security_price_id=1, security_id=301, price_source_id=1,
+                              price_date=date(2024, 3, 1), price=12.5)
+    monkeypatch.setattr(security_price_crud, 'get_latest_prices', lambda ids: {301: latest})
+
+    def no_history(security_id):
+        raise AssertionError('price history should not be loaded')
+
+    monkeypatch.setattr(price_series_store, 'get', no_history)
+    calls = _record_sql(monkeypatch)
+    assert holding_crud.recalc_for_date(date(2024, 3, 8))['inserted'] == 1
+    params = next(p for sql, p in calls if sql.startswith('INSERT INTO holding_dtl'))
+    # (holding_id, holding_dt, portfolio_id, security_id, quantity, price, avg_price, market_value, security_price_dt, ...)
+    assert params[5] == 12.5 and params[7] == 50.0 and params[8] == date(2024, 3, 1)
+
+
+def test_latest_endpoint_reads_latest_table(client, monkeypatch):
+    queries = []
+
+    def fetch_data(sql, params=None):
+        queries.append(sql)
+        return [{'ticker': 'ABC', 'security_price_id': 7, 'security_id': 301, 'price_source_id': 1,
+                 'price_date': date(2024, 3, 1), 'price': 12.5}]
+
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', fetch_data)
+    r = client.get('/api/security-prices/latest?tickers=abc, xyz')
+    assert r.status_code == 200
+    body = r.json()
+    assert body['prices']['ABC']['price'] == 12.5 and body['prices']['ABC']['price_date'] == '2024-03-01'
+    assert body['missing'] == ['XYZ']
+    assert 'FROM security_latest_price' in queries[0] and 'security_price_dtl' not in queries[0]
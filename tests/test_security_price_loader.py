@@ -0,0 +1,82 @@
+import pytest
+
+from source_code.config import pg_db_conn_manager
+from source_code.crud.security_crud_operations import security_crud
+from source_code.crud.security_price_crud_operations import security_price_crud
+from source_code.models.models import SecurityDtl
+from source_code.utils import security_price_loader
+from source_code.utils.price_series_store import price_series_store
+
+CSV = """Date,Ticker,Open,High,Low,Close,Volume,Adj Close
+2024-01-02 00:00:00,aa,32.8,33.2,32.3,32.59,3838000.0,nan
+2024-01-03 00:00:00,AA,"1,032.5",33.0,32.0,"1,033.25",100,32.1
+2024-01-03 00:00:00,ZZZ,1,1,1,1,1,1
+,AA,1,1,1,1,1,1
+2024-01-04 00:00:00,AA,1,1,1,n/a,1,1
+01/05/2024,BB,2,2,2,2.5,10,2.4
+"""
+
+
+@pytest.fixture
+def price_file(tmp_path, monkeypatch):
+    securities = [SecurityDtl(security_id=1, ticker='AA', name='A', company_name='A', security_currency='USD'),
+                  SecurityDtl(security_id=2, ticker='BB', name='B', company_name='B', security_currency='CAD')]
+    monkeypatch.setattr(security_crud, 'list_all_public', lambda: securities)
+    monkeypatch.setattr(price_series_store, 'invalidate', lambda *ids: None)
+    path = tmp_path / 'prices.csv'
+    path.write_text(CSV)
+    return str(path)
+
+
+def test_vectorized_mode_copies_clean_rows(price_file, monkeypatch):
+    copied = {}
+
+    def copy_and_merge(staging_ddl, copy_sql, data, merge_sql):
+        copied['lines'] = data.read().splitlines()
+        return len(copied['lines'])
+
+    monkeypatch.setattr(pg_db_conn_manager, 'copy_and_merge', copy_and_merge)
+    summary = security_price_loader.load_security_prices_from_file(price_file)
+
+    assert summary['read'] == 6 and summary['prepared'] == 3 and summary['total'] == 3
+    assert summary['skipped_unknown_ticker'] == ['ZZZ']
+    assert [line for line, _ in summary['skipped_bad_data']] == [5, 6]
+    rows = [line.split(',') for line in copied['lines']]
+    assert [(r[1], r[3], r[4]) for r in rows] == [('1', '2024-01-02', '32.59'), ('1', '2024-01-03', '1033.25'),
+                                                 ('2', '2024-01-05', '2.5')]
+    assert rows[0][9] == '\\N' and rows[1][9] == '32.1' and rows[2][13] == 'CAD'
+
+
+def test_vectorized_mode_loads_in_batches_with_progress(price_file, monkeypatch):
+    copies = []
+
+    def copy_and_merge(staging_ddl, copy_sql, data, merge_sql):
+        copies.append(data.read().splitlines())
+        return len(copies[-1])
+
+    monkeypatch.setattr(pg_db_conn_manager, 'copy_and_merge', copy_and_merge)
+    progress = []
+    summary = security_price_loader.load_security_prices_from_file(price_file, batch_rows=4, progress=progress.append)
+
+    # Same summary as one pass; line numbers stay file-relative across batches
+    assert [len(c) for c in copies] == [2, 1]
+    assert summary['read'] == 6 and summary['prepared'] == 3 and summary['total'] == 3
+    assert summary['skipped_unknown_ticker'] == ['ZZZ']
+    assert [line for line, _ in summary['skipped_bad_data']] == [5, 6]
+    assert progress == [{'batches': 1, 'rows_read': 4, 'rows_saved': 2},
+                        {'batches': 2, 'rows_read': 6, 'rows_saved': 3}]
+
+def test_rows_mode_keeps_summary_shape(price_file, monkeypatch):
+    saved = []
+    monkeypatch.setattr(security_price_crud, 'batch_upsert',
+                        lambda inputs: saved.extend(inputs) or {'inserted': len(inputs), 'updated': 0, 'total': len(inputs)})
+    summary = security_price_loader.load_security_prices_from_file(price_file, mode='rows')
+
+    assert summary['read'] == 6 and summary['total'] == 3 and len(saved) == 3
+    assert summary['skipped_unknown_ticker'] == ['ZZZ']
+    assert [line for line, _ in summary['skipped_bad_data']] == [5, 6]
+
+
+def test_unknown_mode_is_rejected(price_file):
+    with pytest.raises(ValueError):
+        security_price_loader.load_security_prices_from_file(price_file, mode='fast')
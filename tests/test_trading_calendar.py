@@ -0,0 +1,41 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from source_code.utils.trading_calendar import NYSE, TradingCalendar, fixed, get_calendar, register_calendar
+
+
+def test_nyse_holidays_2024():
+    assert NYSE.holidays(2024, 2024) == [
+        date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29), date(2024, 5, 27),
+        date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2), date(2024, 11, 28), date(2024, 12, 25),
+    ]
+
+
+def test_observed_rules():
+    # July 4 2026 is a Saturday -> observed Friday; Christmas 2022 Sunday -> Monday
+    assert not NYSE.is_session(date(2026, 7, 3))
+    assert not NYSE.is_session(date(2022, 12, 26))
+    # New Year 2022 fell on a Saturday and is not moved back to Dec 31 2021
+    assert NYSE.is_session(date(2021, 12, 31))
+    # Juneteenth only from 2022
+    assert NYSE.is_session(date(2021, 6, 18))
+
+
+def test_vectorized_helpers():
+    days = np.array(['2024-03-28', '2024-03-29', '2024-03-30', '2024-04-01'], dtype='datetime64[D]')
+    assert NYSE.is_session(days).tolist() == [True, False, False, True]
+    sessions = NYSE.sessions_in_range(date(2024, 3, 25), date(2024, 4, 2))
+    assert len(sessions) == NYSE.session_count(date(2024, 3, 25), date(2024, 4, 2)) == 6
+    assert NYSE.previous_session(date(2024, 4, 1)) == date(2024, 3, 28)
+    assert NYSE.next_session(date(2024, 3, 28)) == date(2024, 4, 1)
+    assert NYSE.rollback(date(2024, 3, 30)) == date(2024, 3, 28)
+    assert NYSE.rollback(date(2024, 3, 28)) == date(2024, 3, 28)
+
+
+def test_register_custom_calendar():
+    register_calendar(TradingCalendar("TEST", [fixed(3, 1, observed=False)]))
+    assert not get_calendar("test").is_session(date(2024, 3, 1))
+    with pytest.raises(ValueError):
+        get_calendar("NOPE")
@@ -0,0 +1,37 @@
+from datetime import date, datetime
+
+from source_code.config import pg_db_conn_manager
+
+
+def test_bulk_duplicate_is_one_set_based_insert(client, monkeypatch):
+    calls = []
+
+    def fake_execute_returning(sql, params=None):
+        calls.append((sql, params))
+        now = datetime(2024, 1, 1)
+        # Source 11 had no price for the target security and was not copied
+        return [{
+            'transaction_id': params['new_ids'][0], 'portfolio_id': 201, 'security_id': 302, 'external_platform_id': 401,
+            'transaction_date': date(2024, 1, 2), 'transaction_type': 'B', 'transaction_qty': 2.5, 'transaction_price': 40.0,
+            'transaction_fee': 0, 'transaction_fee_percent': 0, 'carry_fee': 0, 'carry_fee_percent': 0,
+            'management_fee': 0, 'management_fee_percent': 0, 'external_manager_fee': 0, 'external_manager_fee_percent': 0,
+            'total_inv_amt': 100.0, 'rel_transaction_id': 10, 'created_ts': now, 'last_updated_ts': now,
+        }]
+
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_returning', fake_execute_returning)
+    r = client.post('/api/transactions/bulk-duplicate', json={'transaction_ids': [10, 11, 10], 'security_id': 302})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [t['rel_transaction_id'] for t in body['created']] == [10]
+    assert [s['transaction_id'] for s in body['skipped']] == [11]
+    assert len(calls) == 1
+    sql, params = calls[0]
+    assert 'INSERT INTO transaction_dtl' in sql and 'RETURNING' in sql and 'LATERAL' in sql
+    assert params['source_ids'] == [10, 11]
+    assert len(params['new_ids']) == 2 and params['new_ids'][0] < params['new_ids'][1]
+    assert params['security_id'] == 302 and params['price'] is None
+
+
+def test_bulk_duplicate_requires_ids(client):
+    r = client.post('/api/transactions/bulk-duplicate', json={'transaction_ids': []})
+    assert r.status_code == 400
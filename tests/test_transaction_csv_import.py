@@ -0,0 +1,134 @@
+import io
+from datetime import date, datetime
+
+from source_code.config import pg_db_conn_manager
+from source_code.crud.external_platform_crud_operations import external_platform_crud
+from source_code.crud.transaction_crud_operations import transaction_crud
+from source_code.models.models import ExternalPlatformDtl, TransactionDtlInput
+from source_code.utils import domain_utils, transaction_csv_loader
+
+
+def _capture_batches(monkeypatch):
+    batches = []
+
+    def fake_execute_values(sql, values, template=None, fetch=False):
+        batches.append(list(values))
+        return [{'transaction_id': v[0]} for v in values] if fetch else len(values)
+
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_values', fake_execute_values)
+    return batches
+
+
+def test_by_name_csv_commits_in_chunks_and_summarizes_errors(client, mock_db, monkeypatch):
+    batches = _capture_batches(monkeypatch)
+    now = datetime(2024, 1, 1)
+    mock_db.tables['portfolio_dtl'][201].update({'open_date': date(2024, 1, 1), 'created_ts': now, 'last_updated_ts': now})
+    mock_db.tables['security_dtl'][301].update({'created_ts': now, 'last_updated_ts': now})
+    # MockDB does not route external_platform_dtl reads; serve the platform directly
+    monkeypatch.setattr(external_platform_crud, 'list_all',
+                        lambda: [ExternalPlatformDtl(external_platform_id=401, name='BrokerX', platform_type='Trading Platform')])
+    lines = ["Portfolio_Name,Security_Ticker,External_Platform_Name,Transaction_Date,Transaction_Type,Transaction_Qty,Transaction_Price"]
+    for i in range(5):
+        lines.append(f"Core,ABC,BrokerX,2024-01-0{i + 1},B,{i + 1},10")
+    lines.append("Core,NOPE,BrokerX,2024-01-09,B,1,10")
+    lines.append("Core,ABC,BrokerX,2024-01-10,B,abc,10")
+    body = ("\n".join(lines) + "\n").encode("utf-8")
+
+    r = client.post('/api/transactions/bulk-by-name-csv?chunk_size=2',
+                    files={'file': ('tx.csv', io.BytesIO(body), 'text/csv')})
+    assert r.status_code == 200, r.text
+    summary = r.json()
+    assert summary['read'] == 7
+    assert summary['inserted'] == 5
+    assert summary['excluded'] == 2
+    assert summary['chunks'] == 4
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert {e['row'] for e in summary['errors']} == {7, 8}
+    assert 'security not found' in summary['errors'][0]['reason']
+
+
+def test_by_id_csv_missing_headers_is_rejected(client, monkeypatch):
+    _capture_batches(monkeypatch)
+    body = b"portfolio_id,security_id\n1,2\n"
+    r = client.post('/api/transactions/bulk-csv', files={'file': ('tx.csv', io.BytesIO(body), 'text/csv')})
+    assert r.status_code == 400
+    assert 'Missing required CSV headers' in r.json()['detail']
+
+
+def test_failed_chunk_is_reported_and_progress_is_emitted(monkeypatch):
+    calls = {'n': 0}
+
+    def flaky_execute_values(sql, values, template=None, fetch=False):
+        calls['n'] += 1
+        if calls['n'] == 1:
+            raise RuntimeError("boom")
+        return [{'transaction_id': v[0]} for v in values]
+
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_values', flaky_execute_values)
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', lambda sql, params=None, as_dicts=True: [])
+    body = (
+        "portfolio_id,security_id,external_platform_id,transaction_date,transaction_type,transaction_qty,transaction_price\n"
+        "201,301,401,2024-01-01,B,1,10\n"
+        "201,301,401,2024-01-02,B,1,10\n"
+        "201,301,401,2024-01-03,S,1,10\n"
+    ).encode("utf-8")
+    progress = []
+    summary = transaction_csv_loader.load_transactions_from_stream(io.BytesIO(body), chunk_size=2, progress=progress.append)
+    assert summary['inserted'] == 1
+    assert summary['excluded'] == 2
+    assert summary['failed_chunks'] == 1
+    assert summary['errors'][0]['row'] == '2-3'
+    assert [p['chunks'] for p in progress] == [1, 2]
+
+
+def test_reimport_skips_rows_already_present(monkeypatch):
+    stored = set()
+
+    def fake_fetch(sql, params=None, as_dicts=True):
+        assert 'content_hash = any(%s)' in sql.lower()
+        return [{'content_hash': h} for h in params[0] if h in stored]
+
+    def fake_execute_values(sql, values, template=None, fetch=False):
+        assert 'on conflict (content_hash) do nothing' in ' '.join(sql.lower().split())
+        stored.update(v[-1] for v in values)
+        return [{'transaction_id': v[0]} for v in values]
+
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', fake_fetch)
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_values', fake_execute_values)
+    header = "portfolio_id,security_id,external_platform_id,transaction_date,transaction_type,transaction_qty,transaction_price\n"
+    first = header + "201,301,401,2024-01-01,B,1,10\n201,301,401,2024-01-01,B,1,10\n"
+    # Overlapping statement: the two identical rows again plus one new row
+    second = header + "201,301,401,2024-01-01,B,1,10\n201,301,401,2024-01-01,B,1,10\n201,301,401,2024-01-02,S,1,11\n"
+
+    summary = transaction_csv_loader.load_transactions_from_stream(io.BytesIO(first.encode()), chunk_size=1)
+    assert (summary['inserted'], summary['skipped']) == (2, 0)
+    summary = transaction_csv_loader.load_transactions_from_stream(io.BytesIO(second.encode()), chunk_size=1)
+    assert (summary['inserted'], summary['skipped']) == (1, 2)
+    assert len(stored) == 3
+
+
+def test_json_bulk_keeps_repeated_trades(client, monkeypatch):
+    batches = _capture_batches(monkeypatch)
+
+    def no_hash_lookup(sql, params=None, as_dicts=True):
+        raise AssertionError('entered transactions are not checked against earlier imports')
+
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', no_hash_lookup)
+    buy = {'portfolio_id': 201, 'security_id': 301, 'external_platform_id': 401, 'transaction_date': '2024-01-01',
+           'transaction_type': 'B', 'transaction_qty': 1, 'transaction_price': 10}
+    # The same buy posted twice is two trades
+    for _ in range(2):
+        r = client.post('/api/transactions/bulk', json=[buy])
+        assert r.status_code == 200 and len(r.json()) == 1
+    assert [row[-1] for batch in batches for row in batch] == [None, None]
+
+
+def test_single_save_never_reuses_a_reserved_bulk_id(monkeypatch):
+    saved_ids = []
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_query', lambda sql, params=None: saved_ids.append(params[0]) or 1)
+    # A background import reserves a block reaching past the current clock
+    block = domain_utils.get_timestamp_ids(100_000)
+    transaction_crud.save(TransactionDtlInput(portfolio_id=201, security_id=301, external_platform_id=401,
+                                              transaction_date=date(2024, 1, 1), transaction_type='B',
+                                              transaction_qty=1, transaction_price=10))
+    assert saved_ids[0] > block[-1]
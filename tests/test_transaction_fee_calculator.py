@@ -0,0 +1,51 @@
+from source_code.config import pg_db_conn_manager
+from source_code.models.models import TransactionDtlInput
+from source_code.utils.transaction_fee_calculator import apply_computed_amounts
+
+
+def _txn(**kw):
+    base = dict(portfolio_id=201, security_id=301, external_platform_id=401, transaction_type='B',
+                transaction_qty=10, transaction_price=12.5)
+    base.update(kw)
+    return TransactionDtlInput(**base)
+
+
+def test_percent_fees_and_amounts_are_derived_per_batch():
+    out = apply_computed_amounts([
+        _txn(transaction_fee_percent=1.0, external_manager_fee_percent=0.5),
+        _txn(total_inv_amt=1000.0, transaction_fee=7.0),
+        _txn(total_inv_amt=None, transaction_fee_percent=0.333),
+    ])
+    assert out[0].total_inv_amt == 125.0
+    assert out[0].transaction_fee == 1.25
+    assert out[0].external_manager_fee == 0.63  # 0.625 rounds half away from zero
+    # Zero percent keeps the flat fee that was entered
+    assert out[1].total_inv_amt == 1000.0
+    assert out[1].transaction_fee == 7.0
+    assert out[2].total_inv_amt == 125.0
+    assert out[2].transaction_fee == 0.42
+
+
+def test_half_cent_fees_round_like_numeric():
+    # 100.5 * 1% is 1.00499999... as a binary float; PostgreSQL's numeric ROUND gives 1.01
+    out = apply_computed_amounts([
+        _txn(total_inv_amt=100.5, transaction_fee_percent=1.0),
+        _txn(total_inv_amt=200.5, transaction_fee_percent=1.0, external_manager_fee_percent=-1.0),
+    ])
+    assert out[0].transaction_fee == 1.01
+    assert out[1].transaction_fee == 2.01 and out[1].external_manager_fee == -2.01
+
+def test_bulk_insert_stores_computed_fees(client, monkeypatch):
+    batches = []
+    monkeypatch.setattr(pg_db_conn_manager, 'execute_values',
+                        lambda sql, values, template=None, fetch=False: batches.append(values) or [{'transaction_id': v[0]} for v in values])
+    payload = [
+        {'portfolio_id': 201, 'security_id': 301, 'external_platform_id': 401, 'transaction_date': '2024-01-02',
+         'transaction_type': 'B', 'transaction_qty': 4, 'transaction_price': 25, 'transaction_fee_percent': 2},
+    ]
+    r = client.post('/api/transactions/bulk', json=payload)
+    assert r.status_code == 200, r.text
+    body = r.json()[0]
+    assert body['total_inv_amt'] == 100.0
+    assert body['transaction_fee'] == 2.0
+    assert len(batches) == 1
@@ -0,0 +1,42 @@
+from datetime import date
+
+from source_code.config import pg_db_conn_manager
+
+
+def test_summary_uses_grouping_sets_and_listing_filters(client, monkeypatch):
+    captured = {}
+
+    def fake_fetch(sql, params=None, as_dicts=True):
+        captured['sql'], captured['params'] = sql, params
+        return [
+            {'portfolio_id': 201, 'portfolio_name': 'Core', 'security_id': None, 'security_ticker': None,
+             'external_platform_id': None, 'external_platform_name': None, 'month': None, 'transaction_type': None,
+             'g_portfolio': 0, 'g_month': 1, 'transaction_count': 2, 'total_qty': 15, 'net_qty': 5,
+             'gross_amount': 150, 'total_fee': 1.5, 'net_amount': 148.5},
+            {'portfolio_id': None, 'portfolio_name': None, 'security_id': None, 'security_ticker': None,
+             'external_platform_id': None, 'external_platform_name': None, 'month': None, 'transaction_type': None,
+             'g_portfolio': 1, 'g_month': 1, 'transaction_count': 2, 'total_qty': 15, 'net_qty': 5,
+             'gross_amount': 150, 'total_fee': 1.5, 'net_amount': 148.5},
+            {'portfolio_id': None, 'portfolio_name': None, 'security_id': None, 'security_ticker': None,
+             'external_platform_id': None, 'external_platform_name': None, 'month': date(2024, 1, 1), 'transaction_type': None,
+             'g_portfolio': 1, 'g_month': 0, 'transaction_count': 2, 'total_qty': 15, 'net_qty': 5,
+             'gross_amount': 150, 'total_fee': 1.5, 'net_amount': 148.5},
+        ]
+
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', fake_fetch)
+    r = client.get('/api/transactions/summary?group_by=portfolio,month&user_id=101&from_date=2024-01-01&transaction_type=Sell')
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [row['level'] for row in body] == ['portfolio', 'month', 'total']
+    assert body[0]['portfolio_name'] == 'Core'
+    assert body[0]['net_amount'] == 148.5
+    sql = ' '.join(captured['sql'].split())
+    assert 'GROUPING SETS ((portfolio_id, portfolio_name), (month), ())' in sql
+    assert 'user_id = %s' in sql and 'transaction_date >= %s' in sql
+    assert captured['params'] == (101, 'S', date(2024, 1, 1))
+
+
+def test_summary_rejects_unknown_dimension(client, monkeypatch):
+    monkeypatch.setattr(pg_db_conn_manager, 'fetch_data', lambda *a, **k: [])
+    r = client.get('/api/transactions/summary?group_by=portfolio,color')
+    assert r.status_code == 400